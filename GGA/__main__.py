@@ -0,0 +1,52 @@
+import argparse
+import sys
+
+from GGA import backfill, crawl
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m GGA', description='Georgia General Assembly API tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    crawler = commands.add_parser('crawl', help='Crawl sessions into NDJSON or a SQLite mirror, resumably')
+    crawler.add_argument('--session', type=int, action='append',
+                         help='Session id to crawl (repeatable, all sessions by default)')
+    crawler.add_argument('--output', '-o', default='gga.ndjson',
+                         help='Output file; .db/.sqlite paths are written as a GGA.mirror store (default gga.ndjson)')
+    crawler.add_argument('--format', choices=['ndjson', 'sqlite'],
+                         help='Output format, inferred from --output when omitted')
+    crawler.add_argument('--checkpoint', help='Checkpoint file (default <output>.checkpoint)')
+    crawler.add_argument('--workers', type=int, default=None, help='Detail requests in flight at once')
+    crawler.add_argument('--quiet', '-q', action='store_true', help='No progress output')
+    crawler.set_defaults(run=crawl.main)
+
+    backfiller = commands.add_parser('backfill', help='Crawl sessions with a pool of worker processes, resumably')
+    backfiller.add_argument('--session', type=int, action='append',
+                            help='Session id to backfill (repeatable, all sessions by default)')
+    backfiller.add_argument('--output', '-o', default='gga.ndjson',
+                            help='Output file; .db/.sqlite paths are written as a GGA.mirror store (default gga.ndjson)')
+    backfiller.add_argument('--format', choices=['ndjson', 'sqlite'],
+                            help='Output format, inferred from --output when omitted')
+    backfiller.add_argument('--checkpoint', help='Checkpoint file (default <output>.checkpoint)')
+    backfiller.add_argument('--processes', '-p', type=int, default=None,
+                            help='Worker processes (default: one per core)')
+    backfiller.add_argument('--workers', type=int, default=None, help='Detail requests in flight per process')
+    backfiller.add_argument('--shard-size', type=int, default=None,
+                            help='Split sessions into shards of this many bills (default: one shard per session)')
+    backfiller.add_argument('--memory-limit', type=int, default=None, help='Address space cap per process, in MB')
+    backfiller.add_argument('--max-tasks-per-child', type=int, default=None,
+                            help='Replace each worker process after this many shards (Python 3.11+)')
+    backfiller.add_argument('--rate-limit', type=float, default=None,
+                            help='Requests per second across all worker processes')
+    backfiller.add_argument('--quiet', '-q', action='store_true', help='No progress output')
+    backfiller.set_defaults(run=backfill.main)
+    return parser
+
+
+def main(argv = None):
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,521 @@
+import asyncio
+import time
+from typing import Union
+from urllib.parse import urlparse
+
+from zeep import AsyncClient
+from zeep.transports import AsyncTransport
+
+from GGA import clients, instrument
+from GGA.cache import EntityCache
+from GGA.gga import Session, Member, Author, Legislation, Committee, Vote, _name_key, _session_id
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class NotLoadedError(AttributeError):
+    """
+    A detail attribute of an async entity was read before `await entity.fetch()`.
+    """
+
+
+class _Unavailable:
+    # Inherited synchronous API the async classes can't serve without blocking the event loop
+    def __init__(self, hint: str = ''):
+        self.hint = hint
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner = None):
+        raise AttributeError(f"{owner.__name__}.{self.name} is not available on the async classes{self.hint}")
+
+
+class Limiter:
+    """
+    Caps in-flight requests with a semaphore and, optionally, spaces out request starts to `rate_limit` per second per host.
+    """
+
+    def __init__(self, concurrency: int = 10, rate_limit: float = None):
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._next_start = {}
+
+    async def acquire(self, host: str = None):
+        await self._semaphore.acquire()
+        try:
+            if self.rate_limit:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + 1 / self.rate_limit
+                if start > now:
+                    await asyncio.sleep(start - now)
+        except BaseException:
+            # Cancelled while waiting for its turn: give the permit back
+            self._semaphore.release()
+            raise
+
+    def release(self):
+        self._semaphore.release()
+
+
+def _entity(cls, entity_id, session, assembly, **kwargs):
+    """
+    Return the entity from the assembly's identity map, creating (and registering) a stub when it isn't known yet.
+    """
+    key = (cls._kind, entity_id, _session_id(session))
+    entity = assembly.entities.get(key)
+    if type(entity) is not cls:
+        entity = cls(entity_id, session=session, assembly=assembly, **kwargs)
+        assembly.entities.put(key, entity)
+    return entity
+
+
+async def _fetch_all(entities):
+    await asyncio.gather(*(entity.fetch() for entity in entities))
+    return entities
+
+
+async def _iter_fetched(entities):
+    # Yields entities as their detail calls complete; pending calls are cancelled if the caller stops early
+    tasks = [asyncio.ensure_future(entity.fetch()) for entity in entities]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class AsyncGeneralAssembly:
+    """
+    Async counterpart of GeneralAssembly. Use as `async with AsyncGeneralAssembly() as assembly:`.
+    """
+
+    def __init__(self,
+                 verbose: bool = False,
+                 concurrency: int = 10,
+                 rate_limit: float = None):
+        if httpx is None:
+            raise RuntimeError("AsyncGeneralAssembly requires zeep's async extras, e.g. `pip install zeep[async]`")
+        self.verbose = verbose
+        self.limiter = Limiter(concurrency=concurrency,
+                               rate_limit=rate_limit)
+        self._http = httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency))
+        self._clients = {}
+        self._client_locks = {}
+        self._years = None
+        self._sessions = None
+        self.entities = EntityCache()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    async def get_client(self, keyword: str) -> AsyncClient:
+        client = self._clients.get(keyword)
+        if client is None:
+            lock = self._client_locks.setdefault(keyword, asyncio.Lock())
+            async with lock:
+                client = self._clients.get(keyword)
+                if client is None:
+                    # WSDL loading is synchronous in zeep, keep it off the event loop
+                    transport = AsyncTransport(client=self._http,
+                                               cache=clients.get_wsdl_cache())
+                    client = await asyncio.to_thread(AsyncClient,
+                                                     clients._make_client_url(keyword=keyword),
+                                                     transport=transport)
+                    self._clients[keyword] = client
+        return client
+
+    async def call(self, keyword: str, operation: str, *args):
+        client = await self.get_client(keyword)
+        host = urlparse(clients.base).netloc
+        await self.limiter.acquire(host)
+        try:
+            event = instrument.begin(keyword, operation, args)
+            try:
+                result = await getattr(client.service, operation)(*args)
+            except BaseException as e:
+                instrument.finish(event, e)
+                raise
+        finally:
+            self.limiter.release()
+        instrument.finish(event)
+        return result
+
+    async def years(self):
+        if not self._years:
+            self._years = await self.call('Session', 'GetYears')
+        return self._years
+
+    async def sessions(self):
+        if not self._sessions:
+            self._sessions = []
+            for year in await self.years():
+                session_data = year['Session']
+                session_data['Year'] = year['Number']
+                self._sessions.append(AsyncSession(session_id=session_data['Id'],
+                                                   assembly=self,
+                                                   data=session_data,
+                                                   verbose=self.verbose)
+                                      )
+        return self._sessions
+
+    async def get_session(self, session_name: str = None, session_id = None):
+        if not session_id and not session_name:
+            return None
+        for session in await self.sessions():
+            if session_id and session.id == session_id:
+                return session
+            elif session_name and session.description == session_name:
+                return session
+        return None
+
+    async def get_legislation_by_type_and_number(self, bill_type, bill_number):
+        data = await self.call('Legislation', 'GetLegislationDetailByDescription', bill_type, bill_number)
+        return _entity(AsyncLegislation, data['Id'],
+                       session=None,
+                       assembly=self,
+                       verbose=self.verbose).hydrate(data)
+
+
+class _AsyncEntity:
+    # SOAP operation returning this entity's details
+    _operation = None
+
+    def _operation_args(self):
+        return (self.id,)
+
+    def _entities(self):
+        return self.assembly.entities
+
+    async def fetch(self):
+        if self._hydrated:
+            return self
+        twin = self.assembly.entities.peek(self._key())
+        if twin is not None and twin is not self and twin._hydrated:
+            # Already loaded through another object: copy its details instead of calling the service
+            super().hydrate()
+            return self
+        # Concurrent fetches of the same entity share one detail call
+        fetching = self.__dict__.get('_fetching')
+        if fetching is None:
+            fetching = self._fetching = asyncio.ensure_future(self._fetch())
+            self._waiters = 0
+        self._waiters += 1
+        try:
+            await asyncio.shield(fetching)
+        finally:
+            self._waiters -= 1
+            if fetching.done() or not self._waiters:
+                # Nobody is waiting on it any more (e.g. every caller was cancelled): don't leave it running
+                fetching.cancel()
+                if self.__dict__.get('_fetching') is fetching:
+                    self._fetching = None
+        return self
+
+    async def _fetch(self):
+        data = await self.assembly.call(self.keyword, self._operation, *self._operation_args())
+        if not self._hydrated:
+            super().hydrate(data)
+
+    def hydrate(self, data = None):
+        if data is None and not self._hydrated:
+            raise NotLoadedError(f"{self.__class__.__name__} {self.id} is not loaded yet, use `await .fetch()`")
+        return super().hydrate(data)
+
+
+class _AsyncMemberAPI:
+    legislation = _Unavailable(", use the sync Member.legislation")
+    sessions = _Unavailable(", use the sync Member.sessions")
+
+    async def committees(self, hydrate: bool = True):
+        await self.fetch()
+        committees = [_entity(AsyncCommittee, committee['Committee']['Id'],
+                              session=self.session,
+                              assembly=self.assembly,
+                              verbose=self.verbose,
+                              data=committee['Committee'])
+                      for committee in self.latestSession['CommitteeMemberships']['CommitteeMembership']]
+        return await _fetch_all(committees) if hydrate else committees
+
+
+class AsyncSession(Session):
+    refresh_legislation = _Unavailable(", `await session.legislation()` always re-pulls the list")
+    sponsor_index = _Unavailable(", use the sync Session.sponsor_index")
+    legislation_by_sponsor = _Unavailable(", use the sync Session.legislation_by_sponsor")
+    search_legislation = _Unavailable(", use the sync Session.search_legislation")
+
+    def __init__(self,
+                 session_id,
+                 assembly: AsyncGeneralAssembly,
+                 data = None,
+                 verbose: bool = False):
+        super().__init__(session_id=session_id,
+                         data=data,
+                         verbose=verbose,
+                         assembly=assembly)
+
+    async def get_schedules(self, chamber, refresh: bool = False):
+        if chamber not in ['House', 'Senate']:
+            raise Exception("Specify either 'House' or 'Senate' when grabbing schedule.")
+        if refresh or chamber not in self._schedules:
+            data = await self.assembly.call('Session', 'GetSessionSchedule', self.id, chamber)
+            self._schedules[chamber] = self._make_schedules(chamber=chamber, schedule_data=data)
+            self._calendars.pop(chamber, None)
+        return self._schedules[chamber]
+
+    async def calendar(self, chamber: str):
+        return self._calendar_from(chamber, await self.get_schedules(chamber))
+
+    async def _members_summary_async(self):
+        # Fills the sync summary cache, so the shared lookups (Session._members_lookup) never call the service
+        if None not in self._member_summaries:
+            self._member_summaries[None] = await self.assembly.call('Members', 'GetMembersBySession', self.id)
+        return self._member_summaries[None]
+
+    async def _committees_summary_async(self):
+        if self._committee_summaries is None:
+            self._committee_summaries = await self.assembly.call('Committees', 'GetCommitteesBySession', self.id)
+        return self._committee_summaries
+
+    async def get_member(self, member_name: str = None, member_id = None):
+        # member_name may be "First Last" or "Last, First", in any case
+        if not member_id and not member_name:
+            return None
+        await self._members_summary_async()
+        by_id, by_name = self._members_lookup()
+        member = by_id.get(member_id) if member_id else by_name.get(_name_key(member_name))
+        if member is None:
+            return None
+        return _entity(AsyncMember, member['Id'],
+                       session=self,
+                       assembly=self.assembly,
+                       verbose=self.verbose,
+                       short_data=member)
+
+    async def get_committee(self, committee_id = None, committee_name: str = None):
+        # committee_name matches the committee name or code, in any case
+        if not committee_id and not committee_name:
+            return None
+        await self._committees_summary_async()
+        by_id, by_name = self._committees_lookup()
+        committee = by_id.get(committee_id) if committee_id else by_name.get(_name_key(committee_name))
+        if committee is None:
+            return None
+        return await _entity(AsyncCommittee, committee['Id'],
+                             session=self,
+                             assembly=self.assembly,
+                             verbose=self.verbose,
+                             data=committee).fetch()
+
+    async def get_chamber_members(self, chamber: str):
+        if chamber not in ['Senate', 'House']:
+            raise Exception("Please indicate 'House' or 'Senate' when getting chamber members.")
+        return [_entity(AsyncMember, member['Id'],
+                        session=self,
+                        assembly=self.assembly,
+                        verbose=self.verbose,
+                        short_data=member)
+                for member in await self.assembly.call('Members', 'GetMembersByTypeAndSession',
+                                                       ('Senator' if chamber == 'Senate' else 'Representative'),
+                                                       self.id)]
+
+    async def all_members(self, hydrate: bool = False):
+        members = [_entity(AsyncMember, member['Id'],
+                           session=self,
+                           assembly=self.assembly,
+                           verbose=self.verbose,
+                           short_data=member)
+                   for member in await self.assembly.call('Members', 'GetMembersBySession', self.id)]
+        return await _fetch_all(members) if hydrate else members
+
+    async def iter_members(self):
+        async for member in _iter_fetched(await self.all_members()):
+            yield member
+
+    async def legislation(self, hydrate: bool = True):
+        legislation = [_entity(AsyncLegislation, legis['Id'],
+                               session=self,
+                               assembly=self.assembly,
+                               verbose=self.verbose,
+                               data=legis)
+                       for legis in await self.assembly.call('Legislation', 'GetLegislationForSession', self.id)]
+        return await _fetch_all(legislation) if hydrate else legislation
+
+    async def iter_legislation(self):
+        async for legis in _iter_fetched(await self.legislation(hydrate=False)):
+            yield legis
+
+    async def committees(self, hydrate: bool = True):
+        committees = [_entity(AsyncCommittee, committee['Id'],
+                              session=self,
+                              assembly=self.assembly,
+                              verbose=self.verbose,
+                              data=committee)
+                      for committee in await self.assembly.call('Committees', 'GetCommitteesBySession', self.id)]
+        return await _fetch_all(committees) if hydrate else committees
+
+    async def iter_committees(self):
+        async for committee in _iter_fetched(await self.committees(hydrate=False)):
+            yield committee
+
+
+class AsyncMember(_AsyncEntity, _AsyncMemberAPI, Member):
+    _operation = 'GetMember'
+
+    def __init__(self,
+                 member_id,
+                 session: Union[AsyncSession, None],
+                 assembly: AsyncGeneralAssembly,
+                 verbose: bool = False,
+                 short_data = None):
+        super().__init__(member_id=member_id,
+                         session=session,
+                         verbose=verbose,
+                         short_data=short_data)
+        self.assembly = assembly
+
+
+class AsyncAuthor(_AsyncEntity, _AsyncMemberAPI, Author):
+    _operation = 'GetMember'
+
+    def __init__(self,
+                 author_type,
+                 member_id,
+                 session: Union[AsyncSession, None],
+                 assembly: AsyncGeneralAssembly,
+                 verbose: bool = False,
+                 short_data = None):
+        super().__init__(author_type=author_type,
+                         member_id=member_id,
+                         session=session,
+                         verbose=verbose,
+                         short_data=short_data)
+        self.assembly = assembly
+
+    def _member(self):
+        return _entity(AsyncMember, self.id,
+                       session=self.session,
+                       assembly=self.assembly,
+                       verbose=self.verbose)
+
+    async def fetch(self):
+        # Like Author, only the underlying member is shared through the identity map
+        if not self._hydrated:
+            self._copy_details(await self._member().fetch())
+            self._hydrated = True
+        return self
+
+    def _load(self, data = None):
+        member = self._member()
+        member.hydrate(data)
+        self._copy_details(member)
+        self._hydrated = True
+
+
+class AsyncLegislation(_AsyncEntity, Legislation):
+    _operation = 'GetLegislationDetail'
+
+    def __init__(self,
+                 legislation_id,
+                 session: Union[AsyncSession, None],
+                 assembly: AsyncGeneralAssembly,
+                 verbose: bool = False,
+                 data = None):
+        super().__init__(legislation_id=legislation_id,
+                         session=session,
+                         verbose=verbose,
+                         data=data)
+        self.assembly = assembly
+
+    async def votes(self, hydrate: bool = True):
+        votes = [_entity(AsyncVote, vote['VoteId'],
+                         session=self.session,
+                         legislation=self,
+                         assembly=self.assembly,
+                         verbose=self.verbose,
+                         data=vote)
+                 for vote in await self.assembly.call('Votes', 'GetVotesForLegislation', self.id)]
+        return await _fetch_all(votes) if hydrate else votes
+
+    async def iter_votes(self):
+        async for vote in _iter_fetched(await self.votes(hydrate=False)):
+            yield vote
+
+    async def authors(self, hydrate: bool = False):
+        await self.fetch()
+        authors = [AsyncAuthor(author_type=author['Type'],
+                               member_id=author['MemberId'],
+                               session=self.session,
+                               assembly=self.assembly,
+                               verbose=self.verbose)
+                   for author in self.json['Authors']['Sponsorship']]
+        return await _fetch_all(authors) if hydrate else authors
+
+    async def committees(self, hydrate: bool = True):
+        await self.fetch()
+        committees = [_entity(AsyncCommittee, committee['Id'],
+                              session=self.session,
+                              assembly=self.assembly,
+                              verbose=self.verbose,
+                              data=committee)
+                      for committee in self.json['Committees']['CommitteeListing']]
+        return await _fetch_all(committees) if hydrate else committees
+
+
+class AsyncCommittee(_AsyncEntity, Committee):
+    _operation = 'GetCommitteeForSession'
+
+    def __init__(self,
+                 committee_id,
+                 session: AsyncSession,
+                 assembly: AsyncGeneralAssembly,
+                 verbose: bool = False,
+                 data = None):
+        super().__init__(committee_id=committee_id,
+                         session=session,
+                         verbose=verbose,
+                         data=data)
+        self.assembly = assembly
+
+    def _operation_args(self):
+        return (self.id, self.session.id)
+
+    async def members(self, hydrate: bool = False):
+        await self.fetch()
+        members = [_entity(AsyncMember, member['Member']['Id'],
+                           session=self.session,
+                           assembly=self.assembly,
+                           verbose=self.verbose,
+                           short_data=member['Member'])
+                   for member in self.json['Members']['CommitteeMember']]
+        return await _fetch_all(members) if hydrate else members
+
+
+class AsyncVote(_AsyncEntity, Vote):
+    _operation = 'GetVote'
+
+    def __init__(self,
+                 vote_id,
+                 session: Union[AsyncSession, None],
+                 legislation,
+                 assembly: AsyncGeneralAssembly,
+                 verbose: bool = False,
+                 data = None):
+        super().__init__(vote_id=vote_id,
+                         session=session,
+                         legislation=legislation,
+                         verbose=verbose,
+                         data=data)
+        self.assembly = assembly
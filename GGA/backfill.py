@@ -0,0 +1,280 @@
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from zeep import helpers
+
+from GGA import clients, crawl
+from GGA.gga import GeneralAssembly, Session
+from GGA.transport import RateLimiter, TransportPolicy
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+
+class Shard:
+    """
+    One unit of backfill work, crawled by a worker process into its own part file.
+    kind: 'session' (everything), 'people' (members, committees and the bill listing) or 'legislation'
+    (a slice of the bill listing, by id, with the bills' votes)
+    """
+    __slots__ = ('kind', 'session_id', 'legislation', 'name')
+
+    def __init__(self, kind: str, session_id, legislation = None):
+        self.kind = kind
+        self.session_id = session_id
+        # Serialized GetLegislationForSession entries of a 'legislation' shard
+        self.legislation = legislation
+        if kind == 'legislation':
+            self.name = f"{session_id}-{legislation[0]['Id']}-{legislation[-1]['Id']}"
+        else:
+            self.name = f"{session_id}-{kind}"
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.name}>"
+
+    def run(self, crawler: crawl.Crawler, session: Session):
+        if self.kind == 'session':
+            crawler.crawl_session(session)
+            return
+        if self.kind == 'people':
+            crawler.crawl_people(session)
+            crawler.crawl_listing(session)
+        else:
+            crawler.crawl_legislation(session, self.legislation)
+        crawler.save(force=True)
+
+
+def plan(sessions, shard_size: int = None):
+    """
+    Shards for sessions: one per session, or with shard_size a 'people' shard plus 'legislation' shards of at most
+    shard_size bills each (sorted by id) per session.
+    """
+    shards = []
+    for session in sessions:
+        if not shard_size:
+            shards.append(Shard('session', session.id))
+            continue
+        shards.append(Shard('people', session.id))
+        # Plain data, so the slices can be pickled to the workers
+        listing = helpers.serialize_object(session._call('GetLegislationForSession', session.id,
+                                                         keyword='Legislation') or [])
+        listing = sorted(listing, key=lambda legis: legis['Id'])
+        for start in range(0, len(listing), shard_size):
+            shards.append(Shard('legislation', session.id, listing[start:start + shard_size]))
+    return shards
+
+
+def _init_worker(memory_limit: int = None, rate_limit: float = None):
+    # Forked workers must not share the parent's pooled clients and their connections
+    clients.reset_clients()
+    if rate_limit:
+        # This worker's share of the backfill's rate limit; each process throttles on its own
+        policy = clients.transport_policy or clients.configure_transport_policy(TransportPolicy())
+        policy.limiter = RateLimiter(rate_limit, policy.limiter.burst if policy.limiter else 1)
+    if memory_limit:
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+
+
+def _run_shard(shard: Shard, part: str, output_format: str, workers: int = None):
+    # Worker process: crawl the shard into its part file, resuming from the part's own checkpoint
+    state = crawl.Checkpoint(f"{part}.checkpoint")
+    writer = crawl.writer_for(part, output_format=output_format, offset=state.offset if state.resumed else None)
+    crawler = crawl.Crawler(writer, state, workers=workers)
+    try:
+        shard.run(crawler, Session(shard.session_id, assembly=crawler.assembly))
+    finally:
+        writer.close()
+    return crawler.progress.snapshot()
+
+
+def _remove(path: str):
+    for name in (path, f"{path}-wal", f"{path}-shm"):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+class Backfill:
+    """
+    Crawls shards in a pool of worker processes, so parsing responses is spread over every core instead of
+    contending for one GIL. Each worker has its own client pool and writes its shard to a part file under
+    <output>.parts; the parent merges finished parts into the single output (NDJSON, or a GGA.mirror store) and
+    checkpoints which shards are done, so an interrupted backfill resumes where it stopped.
+    processes: worker processes (all cores by default); workers: requests in flight per process
+    memory_limit: address space cap per worker process in bytes (RLIMIT_AS, POSIX only) -- a worker that hits it
+    fails its shard instead of taking the machine down
+    max_tasks_per_child: replace each worker after this many shards, to return memory to the system (Python 3.11+)
+    rate_limit: requests per second across all workers (by default the rate limit of clients.transport_policy);
+    each worker process throttles itself to its share of it
+    """
+
+    def __init__(self,
+                 output: str,
+                 output_format: str = None,
+                 checkpoint: str = None,
+                 processes: int = None,
+                 workers: int = None,
+                 shard_size: int = None,
+                 memory_limit: int = None,
+                 max_tasks_per_child: int = None,
+                 rate_limit: float = None,
+                 progress: crawl.Progress = None):
+        if memory_limit and resource is None:
+            raise RuntimeError("memory_limit needs the resource module, which this platform does not have")
+        if max_tasks_per_child and sys.version_info < (3, 11):
+            raise RuntimeError("max_tasks_per_child needs Python 3.11 or later")
+        self.output = output
+        self.output_format = crawl.output_format_for(output, output_format)
+        self.checkpoint = crawl.Checkpoint(checkpoint or f"{output}.checkpoint")
+        self.processes = processes or os.cpu_count() or 1
+        self.workers = workers
+        self.shard_size = shard_size
+        self.memory_limit = memory_limit
+        self.max_tasks_per_child = max_tasks_per_child
+        if rate_limit is None and clients.transport_policy and clients.transport_policy.limiter:
+            rate_limit = clients.transport_policy.limiter.rate
+        self.rate_limit = rate_limit
+        self.progress = progress or crawl.Progress()
+        self.parts = f"{output}.parts"
+
+    def part(self, shard: Shard):
+        return os.path.join(self.parts, f"{shard.name}.{'db' if self.output_format == 'sqlite' else 'ndjson'}")
+
+    def _merge(self, writer, part: str):
+        if not os.path.exists(part):
+            return
+        if self.output_format == 'sqlite':
+            writer.mirror.merge(part)
+        else:
+            with open(part, 'rb') as f:
+                shutil.copyfileobj(f, writer.file)
+
+    def _finish(self, writer, shard: Shard, snapshot):
+        # Order matters for crash safety: the merged output and the checkpoint recording the merge are saved before
+        # the part goes away, so a crash in between never loses the part's rows or merges them twice
+        part = self.part(shard)
+        self._merge(writer, part)
+        offset = writer.flush()
+        if snapshot['errors']:
+            # Merged, but the shard runs again for what failed; _clean() resets the part if we stop before that
+            self.checkpoint.done(shard.session_id, 'merged').add(shard.name)
+        else:
+            self.checkpoint.done(shard.session_id, 'shards').add(shard.name)
+        self.checkpoint.save(offset)
+        _remove(part)
+        if snapshot['errors']:
+            self._reset_part(shard)
+            self.checkpoint.done(shard.session_id, 'merged').discard(shard.name)
+            self.checkpoint.save(offset)
+        else:
+            _remove(f"{part}.checkpoint")
+
+    def _reset_part(self, shard: Shard):
+        # Keep the part's checkpoint (the next run only refetches what failed), pointing at a fresh part file
+        crawl.Checkpoint(f"{self.part(shard)}.checkpoint").save(None)
+
+    def _clean(self, shards):
+        # Parts left behind by a run that stopped between saving the checkpoint and removing them
+        for shard in shards:
+            part = self.part(shard)
+            if shard.name in self.checkpoint.done(shard.session_id, 'shards'):
+                _remove(part)
+                _remove(f"{part}.checkpoint")
+            elif shard.name in self.checkpoint.done(shard.session_id, 'merged'):
+                _remove(part)
+                self._reset_part(shard)
+                self.checkpoint.done(shard.session_id, 'merged').discard(shard.name)
+                # Saved before the shard runs again, so its new part isn't mistaken for this one next time
+                self.checkpoint.save(self.checkpoint.offset)
+
+    def run(self, session_ids = None):
+        assembly = GeneralAssembly()
+        sessions = assembly.sessions
+        self.progress.advance(requests=1)
+        if session_ids:
+            sessions = [session for session in sessions if session.id in session_ids]
+            missing = set(session_ids) - {session.id for session in sessions}
+            if missing:
+                raise ValueError(f"Unknown session id(s): {', '.join(str(session_id) for session_id in missing)}")
+        shards = plan(sessions, shard_size=self.shard_size)
+        pending = [shard for shard in shards
+                   if shard.name not in self.checkpoint.done(shard.session_id, 'shards')]
+        self.progress.start_phase('shards', total=len(shards), done=len(shards) - len(pending))
+        os.makedirs(self.parts, exist_ok=True)
+        self._clean(shards)
+
+        options = {'max_tasks_per_child': self.max_tasks_per_child} if self.max_tasks_per_child else {}
+        processes = min(self.processes, max(len(pending), 1))
+        writer = crawl.writer_for(self.output, output_format=self.output_format,
+                                  offset=self.checkpoint.offset if self.checkpoint.resumed else None)
+        try:
+            with ProcessPoolExecutor(max_workers=processes,
+                                     initializer=_init_worker,
+                                     initargs=(self.memory_limit, self.rate_limit / processes if self.rate_limit else None),
+                                     **options) as executor:
+                futures = {executor.submit(_run_shard, shard, self.part(shard), self.output_format, self.workers): shard
+                           for shard in pending}
+                for future in as_completed(futures):
+                    shard = futures[future]
+                    try:
+                        snapshot = future.result()
+                    except Exception as e:
+                        # e.g. MemoryError, or the worker died; its part is merged on a later run
+                        print(f"Shard {shard.name} failed: {e!r}", file=sys.stderr)
+                        self.progress.advance(errors=1, units=1)
+                        continue
+                    self._finish(writer, shard, snapshot)
+                    self.progress.advance(entities=snapshot['entities'], requests=snapshot['requests'],
+                                          errors=snapshot['errors'], units=1)
+        finally:
+            self.checkpoint.save(writer.flush())
+            writer.close()
+        if os.path.isdir(self.parts) and not os.listdir(self.parts):
+            os.rmdir(self.parts)
+        return self.progress.snapshot()
+
+
+def backfill(output: str, session_ids = None, output_format: str = None, checkpoint: str = None,
+             processes: int = None, workers: int = None, shard_size: int = None, memory_limit: int = None,
+             max_tasks_per_child: int = None, rate_limit: float = None, report = None):
+    """
+    Backfill sessions into output with a pool of worker processes (see Backfill); resumable like crawl.crawl().
+    """
+    return Backfill(output,
+                    output_format=output_format,
+                    checkpoint=checkpoint,
+                    processes=processes,
+                    workers=workers,
+                    shard_size=shard_size,
+                    memory_limit=memory_limit,
+                    max_tasks_per_child=max_tasks_per_child,
+                    rate_limit=rate_limit,
+                    progress=crawl.Progress(report)).run(session_ids)
+
+
+def main(args):
+    def report(snapshot):
+        print(crawl.format_progress(snapshot), file=sys.stderr, flush=True)
+
+    try:
+        summary = backfill(args.output,
+                           session_ids=args.session,
+                           output_format=args.format,
+                           checkpoint=args.checkpoint,
+                           processes=args.processes,
+                           workers=args.workers,
+                           shard_size=args.shard_size,
+                           memory_limit=args.memory_limit * 1024 * 1024 if args.memory_limit else None,
+                           max_tasks_per_child=args.max_tasks_per_child,
+                           rate_limit=args.rate_limit,
+                           report=None if args.quiet else report)
+    except KeyboardInterrupt:
+        print("Interrupted, progress is checkpointed; run the same command again to resume.", file=sys.stderr)
+        return 130
+    print(f"Done: {summary['entities']} entities, {summary['requests']} requests, {summary['errors']} errors "
+          f"in {summary['elapsed']:.1f}s", file=sys.stderr)
+    return 1 if summary['errors'] else 0
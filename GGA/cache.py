@@ -0,0 +1,287 @@
+import contextvars
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class EntityCache:
+    """
+    Bounded LRU identity map of entities keyed by (entity type, id, session id), with an optional TTL in seconds.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped whenever an entity is added or finishes loading, so derived indexes know to catch up
+        self.version = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.peek(key) is not None
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.monotonic() - stored_at > self.ttl
+
+    def peek(self, key):
+        # Like get(), without touching statistics or recency
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[0]):
+                return None
+            return entry[1]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def changed(self):
+        with self._lock:
+            self.version += 1
+
+    def put(self, key, value):
+        with self._lock:
+            self.version += 1
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def values(self):
+        with self._lock:
+            return [value for stored_at, value in self._entries.values() if not self._expired(stored_at)]
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
+
+
+# Session the current service call is made for, so the response cache can tell closed sessions apart
+current_session = contextvars.ContextVar('current_session', default=None)
+
+
+@contextmanager
+def session_scope(session_id):
+    token = current_session.set(session_id)
+    try:
+        yield
+    finally:
+        current_session.reset(token)
+
+
+# Set inside fresh(): cached responses are revalidated with the service instead of served, and mirrors are skipped
+require_fresh = contextvars.ContextVar('require_fresh', default=False)
+
+
+@contextmanager
+def fresh():
+    token = require_fresh.set(True)
+    try:
+        yield
+    finally:
+        require_fresh.reset(token)
+
+
+class CachedResponse:
+    __slots__ = ('content', 'status_code', 'headers', 'stored_at', 'expires_at')
+
+    def __init__(self, content: bytes, status_code: int, headers: dict, stored_at: float, expires_at: float = None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers
+        self.stored_at = stored_at
+        # None never expires
+        self.expires_at = expires_at
+
+    @property
+    def expired(self):
+        return self.expires_at is not None and time.time() > self.expires_at
+
+
+class MemoryResponseStore:
+    def __init__(self, maxsize: int = 5000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskResponseStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, content BLOB, "
+                                 "status_code INTEGER, headers TEXT, stored_at REAL, expires_at REAL)")
+        self._connection.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute("SELECT content, status_code, headers, stored_at, expires_at "
+                                           "FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        content, status_code, headers, stored_at, expires_at = row
+        return CachedResponse(content, status_code, json.loads(headers), stored_at, expires_at)
+
+    def put(self, key, entry: CachedResponse):
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                                     (key, entry.content, entry.status_code, json.dumps(entry.headers),
+                                      entry.stored_at, entry.expires_at))
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+
+class ResponseCache:
+    """
+    Cache of SOAP responses keyed by operation and arguments, installed on the shared transport with
+    GGA.clients.configure_response_cache(). Each operation has its own TTL (seconds, None never expires, 0 not
+    cached); responses of session-scoped operations (session_operations) for sessions marked closed never expire.
+    Expired entries are revalidated with If-None-Match / If-Modified-Since when the service sent validators.
+    """
+
+    # Operations whose answer belongs to one session's data, so it is final once that session is closed. The
+    # others (GetMember, GetYears...) answer the same request for every session and keep their own TTL.
+    session_operations = frozenset({
+        'GetLegislationDetail',
+        'GetVote',
+        'GetVotesForLegislation',
+        'GetCommitteeForSession',
+        'GetMembersBySession',
+        'GetMembersByTypeAndSession',
+        'GetCommitteesBySession',
+        'GetLegislationForSession',
+        'GetSessionSchedule',
+    })
+
+    default_ttls = {
+        'GetVote': None,
+        'GetYears': 24 * 60 * 60,
+        'GetMember': 24 * 60 * 60,
+        'GetCommitteeForSession': 24 * 60 * 60,
+        'GetLegislationDetail': 60 * 60,
+        'GetLegislationDetailByDescription': 60 * 60,
+        'GetSessionSchedule': 60 * 60,
+        'GetTitles': 24 * 60 * 60,
+        'GetMembersBySession': 10 * 60,
+        'GetMembersByTypeAndSession': 10 * 60,
+        'GetCommitteesBySession': 10 * 60,
+        'GetLegislationForSession': 10 * 60,
+        'GetLegislationRange': 10 * 60,
+        'GetLegislationSearchResultsPaged': 10 * 60,
+        'GetVotesForLegislation': 10 * 60,
+    }
+
+    def __init__(self, store = None, ttls: dict = None, default_ttl: float = 0):
+        self.store = store if store is not None else MemoryResponseStore()
+        self.ttls = dict(self.default_ttls)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.closed_sessions = set()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def close_sessions(self, session_ids):
+        self.closed_sessions.update(session_ids)
+
+    def ttl(self, operation: str, session_id = None):
+        ttl = self.ttls.get(operation, self.default_ttl)
+        if ttl == 0:
+            return 0
+        if session_id is not None and session_id in self.closed_sessions and operation in self.session_operations:
+            return None
+        return ttl
+
+    @staticmethod
+    def key(operation: str, body: bytes):
+        return f"{operation}:{hashlib.sha256(body).hexdigest()}"
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def put(self, key, operation: str, content: bytes, status_code: int, headers: dict, session_id = None):
+        ttl = self.ttl(operation, session_id)
+        if ttl == 0:
+            return
+        now = time.time()
+        self.store.put(key, CachedResponse(content, status_code, headers, now, None if ttl is None else now + ttl))
+
+    def record(self, hit: bool, size: int = 0, revalidated: bool = False):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.bytes_saved += size
+                if revalidated:
+                    self.revalidated += 1
+            else:
+                self.misses += 1
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'revalidated': self.revalidated,
+            'bytes_saved': self.bytes_saved,
+        }
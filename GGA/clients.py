@@ -0,0 +1,233 @@
+import os
+import re
+import threading
+
+import platformdirs
+import requests
+from requests.adapters import HTTPAdapter
+from zeep import Client
+from zeep.cache import Base as CacheBase, SqliteCache
+from zeep.transports import Transport
+
+from GGA.transport import GGATransport, TransportPolicy
+
+base = 'http://webservices.legis.ga.gov/GGAServices/'
+suffix = '/Service.svc?wsdl'
+
+services = ['Session', 'Members', 'Legislation', 'Votes', 'Committees']
+
+# Connections kept alive per host by the shared HTTP session
+pool_size = 10
+
+# Bump whenever the on-disk layout of cached WSDL/XSD documents changes
+wsdl_cache_version = 1
+wsdl_cache_dir = os.environ.get('GGA_CACHE_DIR') or platformdirs.user_cache_dir('GGA', False)
+wsdl_cache_ttl = int(os.environ.get('GGA_WSDL_TTL', 7 * 24 * 60 * 60))
+wsdl_cache_enabled = True
+# Pre-baked WSDL/XSD documents shipped with the package (see bake_snapshot)
+snapshot_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wsdl')
+
+# GGA.cache.ResponseCache for SOAP responses, off by default (see configure_response_cache)
+response_cache = None
+# Timeouts, retries, circuit breaker and rate limit for every SOAP call (see configure_transport_policy)
+transport_policy = TransportPolicy()
+
+_clients = {}
+_client_locks = {}
+_transport = None
+# Whether _transport was installed with use_transport() rather than built by get_transport()
+_transport_installed = False
+_lock = threading.Lock()
+
+
+def _make_client_url(keyword: str):
+    return f"{base}{keyword}{suffix}"
+
+
+def _snapshot_filename(url: str):
+    if url.startswith(base):
+        url = url[len(base):]
+    return re.sub(r'[^A-Za-z0-9.]+', '_', url) + '.xml'
+
+
+class WsdlCache(SqliteCache):
+    """
+    SqliteCache that falls back to the pre-baked snapshot directory before going to the network.
+    A document read from the snapshot is stored like a download, so it expires after the same timeout and is
+    then refreshed from the network rather than from the snapshot again.
+    """
+
+    def __init__(self, path=None, timeout=None, snapshot: str = None):
+        super().__init__(path=path, timeout=timeout)
+        self.snapshot = snapshot
+
+    def get(self, url):
+        content = super().get(url)
+        if content is not None or not self.snapshot or self._stored(url):
+            return content
+        try:
+            with open(os.path.join(self.snapshot, _snapshot_filename(url)), 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        self.add(url, content)
+        return content
+
+    def _stored(self, url):
+        # Whether url has an entry, expired or not
+        with self.db_connection() as connection:
+            return connection.execute("SELECT 1 FROM request WHERE url = ?", (url,)).fetchone() is not None
+
+
+class _RecordingCache(CacheBase):
+    def __init__(self):
+        self.documents = {}
+
+    def add(self, url, content):
+        self.documents[url] = content
+
+    def get(self, url):
+        return None
+
+
+def get_wsdl_cache():
+    if not wsdl_cache_enabled:
+        return None
+    os.makedirs(wsdl_cache_dir, exist_ok=True)
+    return WsdlCache(path=os.path.join(wsdl_cache_dir, f"wsdl-v{wsdl_cache_version}.db"),
+                     timeout=wsdl_cache_ttl or None,
+                     snapshot=snapshot_dir)
+
+
+def configure_wsdl_cache(directory: str = None,
+                         ttl: int = None,
+                         snapshot: str = None,
+                         enabled: bool = True):
+    """
+    Change where WSDL/XSD documents are cached and for how long (seconds, 0 to never expire).
+    Pass snapshot='' to ignore the bundled snapshot. Pooled clients are rebuilt on next use; the shared transport
+    and its connections are kept, only its WSDL cache is replaced.
+    """
+    global wsdl_cache_dir, wsdl_cache_ttl, snapshot_dir, wsdl_cache_enabled
+    if directory is not None:
+        wsdl_cache_dir = directory
+    if ttl is not None:
+        wsdl_cache_ttl = ttl
+    if snapshot is not None:
+        snapshot_dir = snapshot
+    wsdl_cache_enabled = enabled
+    reset_clients(keep_transport=True)
+    with _lock:
+        # A transport installed with use_transport() (e.g. GGA.replay) keeps its own caching
+        if _transport is not None and not _transport_installed:
+            _transport.cache = get_wsdl_cache()
+
+
+def bake_snapshot(directory: str = None):
+    """
+    Download every service's WSDL and imported schemas into directory (the bundled snapshot by default).
+    Returns the paths written.
+    """
+    directory = directory or snapshot_dir
+    os.makedirs(directory, exist_ok=True)
+    recorder = _RecordingCache()
+    transport = Transport(cache=recorder)
+    for keyword in services:
+        Client(_make_client_url(keyword=keyword), transport=transport)
+    paths = []
+    for url, content in recorder.documents.items():
+        path = os.path.join(directory, _snapshot_filename(url))
+        with open(path, 'wb') as f:
+            f.write(content)
+        paths.append(path)
+    return paths
+
+
+def _make_transport():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(services),
+                          pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return GGATransport(cache=get_wsdl_cache(),
+                        session=session,
+                        response_cache=response_cache,
+                        policy=transport_policy)
+
+
+def configure_response_cache(cache = None):
+    """
+    Install a GGA.cache.ResponseCache on the shared transport (None turns response caching off).
+    """
+    global response_cache
+    response_cache = cache
+    if _transport is not None:
+        _transport.response_cache = cache
+    return cache
+
+
+def configure_transport_policy(policy: TransportPolicy = None, **settings):
+    """
+    Replace the transport policy shared by every service, either with policy or with
+    TransportPolicy(**settings), e.g. configure_transport_policy(retries=5, rate_limit=20).
+    configure_transport_policy(None) turns timeouts, retries and throttling off.
+    """
+    global transport_policy
+    transport_policy = TransportPolicy(**settings) if settings else policy
+    if _transport is not None:
+        _transport.set_policy(transport_policy)
+    return transport_policy
+
+
+def use_transport(transport = None):
+    """
+    Share transport (a GGATransport, e.g. from GGA.replay) between every service from now on; None goes back to
+    the default pooled transport. Pooled clients are rebuilt on next use.
+    """
+    global _transport, _transport_installed
+    reset_clients()
+    _transport = transport
+    _transport_installed = transport is not None
+    return transport
+
+
+def get_transport():
+    global _transport
+    if _transport is None:
+        with _lock:
+            if _transport is None:
+                _transport = _make_transport()
+    return _transport
+
+
+def get_client(keyword: str) -> Client:
+    """
+    Return the shared zeep Client for a service keyword ('Session', 'Members', 'Legislation', 'Votes', 'Committees').
+    Each service's WSDL is loaded once per process; concurrent callers wait for the first load instead of repeating it.
+    """
+    client = _clients.get(keyword)
+    if client is not None:
+        return client
+    with _lock:
+        keyword_lock = _client_locks.setdefault(keyword, threading.Lock())
+    with keyword_lock:
+        client = _clients.get(keyword)
+        if client is None:
+            client = Client(_make_client_url(keyword=keyword),
+                            transport=get_transport())
+            _clients[keyword] = client
+    return client
+
+
+def reset_clients(keep_transport: bool = False):
+    """
+    Drop every pooled client and the shared transport; the next get_client() call rebuilds them.
+    keep_transport: only drop the clients, e.g. to keep a transport installed with use_transport()
+    """
+    global _transport, _transport_installed
+    with _lock:
+        _clients.clear()
+        _client_locks.clear()
+        if not keep_transport:
+            _transport = None
+            _transport_installed = False
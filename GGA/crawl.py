@@ -0,0 +1,410 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from GGA import gga, instrument, mirror
+from GGA.gga import Committee, GeneralAssembly, Legislation, Member, Vote, _iter_hydrated, _stream_entity
+
+# Seconds between checkpoint writes and between progress reports
+checkpoint_interval = 5.0
+progress_interval = 2.0
+
+# kind -> detail operation and the arguments it was called with
+_operations = {
+    'member': ('GetMember', lambda entity: (entity.id,)),
+    'committee': ('GetCommitteeForSession', lambda entity: (entity.id, entity.session.id)),
+    'legislation': ('GetLegislationDetail', lambda entity: (entity.id,)),
+    'vote': ('GetVote', lambda entity: (entity.id,)),
+}
+
+
+class NdjsonWriter:
+    """
+    One JSON object per line: {"type", "session_id", "id", "legislation_id" (votes), "data"}.
+    Resuming truncates the file back to the offset saved with the last checkpoint, so nothing is written twice.
+    """
+
+    def __init__(self, path: str, offset: int = None):
+        self.path = path
+        if offset is not None and os.path.exists(path):
+            self.file = open(path, 'r+b')
+            self.file.truncate(offset)
+            self.file.seek(offset)
+        else:
+            self.file = open(path, 'wb')
+
+    def write(self, kind, entity, data, listing: bool = False):
+        if listing:
+            return
+        record = {'type': kind, 'session_id': gga._session_id(entity.session), 'id': entity.id}
+        if kind == 'vote':
+            record['legislation_id'] = entity._legislation.id if entity._legislation is not None else None
+        record['data'] = data
+        self.file.write(mirror.dumps(record).encode('utf-8') + b'\n')
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class MirrorWriter:
+    """
+    Stores responses in a GGA.mirror.Mirror, exactly as Mirror.sync() would.
+    """
+
+    def __init__(self, path: str, offset: int = None):
+        self.path = path
+        self.mirror = mirror.Mirror(path)
+
+    def write(self, kind, entity, data, listing: bool = False):
+        if listing:
+            operation, args = kind, entity
+        else:
+            operation, args = _operations[kind][0], _operations[kind][1](entity)
+        self.mirror.store(operation, args, data)
+
+    def flush(self):
+        return None
+
+    def close(self):
+        self.mirror.close()
+
+
+def output_format_for(path: str, output_format: str = None):
+    if output_format is None:
+        return 'sqlite' if path.endswith(('.db', '.sqlite', '.sqlite3')) else 'ndjson'
+    return output_format
+
+
+def writer_for(path: str, output_format: str = None, offset: int = None):
+    output_format = output_format_for(path, output_format)
+    if output_format == 'sqlite':
+        return MirrorWriter(path, offset=offset)
+    if output_format == 'ndjson':
+        return NdjsonWriter(path, offset=offset)
+    raise ValueError(f"Unknown output format '{output_format}', use 'ndjson' or 'sqlite'")
+
+
+class Checkpoint:
+    """
+    Ids already written, per session and kind, saved atomically as JSON next to the output.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = None
+        self.sessions = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.offset = state.get('offset')
+            self.sessions = {session_id: {kind: set(ids) if isinstance(ids, list) else ids
+                                          for kind, ids in kinds.items()}
+                             for session_id, kinds in state.get('sessions', {}).items()}
+
+    @property
+    def resumed(self):
+        return self.offset is not None or bool(self.sessions)
+
+    def done(self, session_id, kind: str):
+        return self.sessions.setdefault(str(session_id), {}).setdefault(kind, set())
+
+    def complete(self, session_id):
+        return self.sessions.get(str(session_id), {}).get('complete', False)
+
+    def mark_complete(self, session_id):
+        self.sessions.setdefault(str(session_id), {})['complete'] = True
+
+    def save(self, offset: int = None):
+        self.offset = offset
+        state = {'offset': offset,
+                 'sessions': {session_id: {kind: sorted(ids) if isinstance(ids, set) else ids
+                                           for kind, ids in kinds.items()}
+                              for session_id, kinds in self.sessions.items()}}
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+
+
+class Progress:
+    def __init__(self, report = None):
+        self.report = report
+        self.started = time.monotonic()
+        self.entities = 0
+        self.requests = 0
+        self.errors = 0
+        self.phase = None
+        self.phase_done = 0
+        self.phase_total = 0
+        self.phase_started = self.started
+        self._phase_base = 0
+        self._reported = 0.0
+
+    def start_phase(self, phase: str, total: int, done: int = 0):
+        self.phase = phase
+        self.phase_total = total
+        self.phase_done = done
+        self.phase_started = time.monotonic()
+        self._phase_base = done
+        self.emit(force=True)
+
+    def advance(self, entities: int = 0, requests: int = 0, errors: int = 0, units: int = None):
+        # units: progress within the current phase, the entity count unless the phase counts something else
+        self.entities += entities
+        self.phase_done += entities if units is None else units
+        self.requests += requests
+        self.errors += errors
+        self.emit()
+
+    def snapshot(self):
+        now = time.monotonic()
+        elapsed = max(now - self.started, 1e-9)
+        phase_rate = (self.phase_done - self._phase_base) / max(now - self.phase_started, 1e-9)
+        remaining = max(self.phase_total - self.phase_done, 0)
+        return {
+            'phase': self.phase,
+            'done': self.phase_done,
+            'total': self.phase_total,
+            'entities': self.entities,
+            'requests': self.requests,
+            'errors': self.errors,
+            'entities_per_second': self.entities / elapsed,
+            'requests_per_second': self.requests / elapsed,
+            'eta': remaining / phase_rate if phase_rate > 0 else None,
+            'elapsed': elapsed,
+        }
+
+    def emit(self, force: bool = False):
+        if self.report is None:
+            return
+        now = time.monotonic()
+        if force or now - self._reported >= progress_interval:
+            self._reported = now
+            self.report(self.snapshot())
+
+
+def format_progress(snapshot):
+    eta = snapshot['eta']
+    eta = '--' if eta is None else time.strftime('%H:%M:%S', time.gmtime(eta))
+    return (f"{snapshot['phase']}: {snapshot['done']}/{snapshot['total']} "
+            f"{snapshot['entities_per_second']:.1f} entities/s {snapshot['requests_per_second']:.1f} requests/s "
+            f"{snapshot['errors']} errors ETA {eta}")
+
+
+class Crawler:
+    """
+    Walks sessions -> members, committees, legislation and each bill's votes, writing every hydrated entity to
+    `writer` and checkpointing which ids are done. Entities that fail to load are counted and left for the next run.
+    workers: detail requests in flight at once
+    """
+
+    def __init__(self, writer, checkpoint: Checkpoint, workers: int = None, progress: Progress = None,
+                 assembly: GeneralAssembly = None):
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.workers = workers or gga.batch_workers
+        self.progress = progress or Progress()
+        self.assembly = assembly or GeneralAssembly()
+        self._saved = time.monotonic()
+        self._trace = None
+        self._counted = 0
+
+    def save(self, force: bool = False):
+        if force or time.monotonic() - self._saved >= checkpoint_interval:
+            self.checkpoint.save(self.writer.flush())
+            self._saved = time.monotonic()
+
+    @contextmanager
+    def _tracing(self):
+        # Requests are counted from what reached the service (not the mirror or the response cache), including
+        # the worker threads' calls; nested phases share the outermost trace
+        if self._trace is not None:
+            yield
+            return
+        with instrument.trace() as trace_:
+            self._trace, self._counted = trace_, 0
+            try:
+                yield
+            finally:
+                self._trace = None
+                self.progress.advance(requests=trace_.requests - self._counted)
+
+    def _requests(self):
+        # Requests made since the last call
+        if self._trace is None:
+            return 0
+        requests = self._trace.requests
+        counted, self._counted = self._counted, requests
+        return requests - counted
+
+    def run(self, session_ids = None):
+        with self._tracing():
+            return self._run(session_ids)
+
+    def _run(self, session_ids):
+        sessions = self.assembly.sessions
+        self.progress.advance(requests=self._requests())
+        if session_ids:
+            sessions = [session for session in sessions if session.id in session_ids]
+            missing = set(session_ids) - {session.id for session in sessions}
+            if missing:
+                raise ValueError(f"Unknown session id(s): {', '.join(str(session_id) for session_id in missing)}")
+        try:
+            for session in sessions:
+                if not self.checkpoint.complete(session.id):
+                    self.crawl_session(session)
+        finally:
+            self.save(force=True)
+        return self.progress.snapshot()
+
+    def crawl_session(self, session):
+        with self._tracing():
+            errors = self.progress.errors
+            self.crawl_people(session)
+            self.crawl_legislation(session, self.crawl_listing(session))
+            # Sessions with failures are walked again on the next run, skipping whatever was written
+            if self.progress.errors == errors:
+                self.checkpoint.mark_complete(session.id)
+            self.save(force=True)
+
+    def crawl_people(self, session):
+        """
+        The session's members and committees.
+        """
+        with self._tracing():
+            members = session._members_summary() or []
+            self._listed('GetMembersBySession', session, members)
+            self._crawl(session, 'member', members,
+                        lambda member: _stream_entity(Member, member['Id'],
+                                                      session=session,
+                                                      short_data=member))
+
+            session._committees_summary()
+            committees = session._committee_summaries or []
+            self._listed('GetCommitteesBySession', session, committees)
+            self._crawl(session, 'committee', committees,
+                        lambda committee: _stream_entity(Committee, committee['Id'],
+                                                         session=session,
+                                                         data=committee))
+
+    def crawl_listing(self, session):
+        with self._tracing():
+            listing = session._call('GetLegislationForSession', session.id, keyword='Legislation') or []
+            self._listed('GetLegislationForSession', session, listing)
+            return listing
+
+    def crawl_legislation(self, session, listing):
+        """
+        The bills of a GetLegislationForSession listing (or a slice of it) and their votes.
+        """
+        with self._tracing():
+            self._crawl(session, 'legislation', listing,
+                        lambda legis: _stream_entity(Legislation, legis['Id'],
+                                                     session=session,
+                                                     data=legis))
+            self._crawl_votes(session, [legis['Id'] for legis in listing])
+
+    def _listed(self, operation, session, listing):
+        self.writer.write(operation, (session.id,), listing, listing=True)
+        self.progress.advance(requests=self._requests())
+
+    def _crawl(self, session, kind, summaries, factory):
+        done = self.checkpoint.done(session.id, kind)
+        pending = [summary for summary in summaries if summary['Id'] not in done]
+        self.progress.start_phase(f"session {session.id} {kind}", total=len(summaries),
+                                  done=len(summaries) - len(pending))
+        self._write_hydrated(kind, (factory(summary) for summary in pending), done)
+
+    def _write_hydrated(self, kind, entities, done, units: int = None):
+        failed = 0
+        for result in _iter_hydrated(entities, prefetch=self.workers, ordered=False, return_exceptions=True):
+            if isinstance(result, Exception):
+                failed += 1
+                self.progress.advance(requests=self._requests(), errors=1)
+                continue
+            self.writer.write(kind, result, result.json)
+            done.add(result.id)
+            self.progress.advance(entities=1, requests=self._requests(), units=units)
+            self.save()
+        return failed
+
+    def _crawl_votes(self, session, legislation_ids):
+        listed = self.checkpoint.done(session.id, 'vote_list')
+        done = self.checkpoint.done(session.id, 'vote')
+        pending = [legislation_id for legislation_id in legislation_ids if legislation_id not in listed]
+        self.progress.start_phase(f"session {session.id} votes by bill", total=len(legislation_ids),
+                                  done=len(legislation_ids) - len(pending))
+
+        def list_votes(legislation_id):
+            try:
+                return legislation_id, session._call('GetVotesForLegislation', legislation_id, keyword='Votes')
+            except Exception as e:
+                return legislation_id, e
+
+        # Bills are listed a chunk at a time so memory stays bounded; a bill's list is marked done with its votes
+        chunk = self.workers * 4
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for start in range(0, len(pending), chunk):
+                stubs, listings = [], []
+                for legislation_id, votes in executor.map(instrument.contextual(list_votes), pending[start:start + chunk]):
+                    if isinstance(votes, Exception):
+                        self.progress.advance(requests=self._requests(), errors=1)
+                        continue
+                    self.progress.advance(requests=self._requests())
+                    listings.append((legislation_id, votes))
+                    legislation = Legislation(legislation_id, session=session)
+                    stubs.extend(_stream_entity(Vote, vote['VoteId'],
+                                                session=session,
+                                                legislation=legislation,
+                                                data=vote)
+                                 for vote in votes or [] if vote['VoteId'] not in done)
+                if not self._write_hydrated('vote', stubs, done, units=0):
+                    for legislation_id, votes in listings:
+                        self.writer.write('GetVotesForLegislation', (legislation_id,), votes, listing=True)
+                        listed.add(legislation_id)
+                # This phase counts bills whose votes are done
+                self.progress.advance(units=len(pending[start:start + chunk]))
+                self.save()
+
+
+def crawl(output: str, session_ids = None, output_format: str = None, checkpoint: str = None, workers: int = None,
+          report = None):
+    """
+    Crawl into output (NDJSON, or a GGA.mirror SQLite store for .db/.sqlite paths), resuming from the checkpoint
+    file (output + '.checkpoint' by default) when there is one. report(snapshot) receives progress snapshots.
+    """
+    state = Checkpoint(checkpoint or f"{output}.checkpoint")
+    writer = writer_for(output, output_format=output_format, offset=state.offset if state.resumed else None)
+    try:
+        return Crawler(writer, state, workers=workers, progress=Progress(report)).run(session_ids)
+    finally:
+        writer.close()
+
+
+def main(args):
+    def report(snapshot):
+        print(format_progress(snapshot), file=sys.stderr, flush=True)
+
+    try:
+        summary = crawl(args.output,
+                        session_ids=args.session,
+                        output_format=args.format,
+                        checkpoint=args.checkpoint,
+                        workers=args.workers,
+                        report=None if args.quiet else report)
+    except KeyboardInterrupt:
+        print("Interrupted, progress is checkpointed; run the same command again to resume.", file=sys.stderr)
+        return 130
+    print(f"Done: {summary['entities']} entities, {summary['requests']} requests, {summary['errors']} errors "
+          f"in {summary['elapsed']:.1f}s", file=sys.stderr)
+    return 1 if summary['errors'] else 0
@@ -1,70 +1,554 @@
+import bisect
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Union
 
-from zeep import Client, helpers
-from datetime import datetime
+from zeep import helpers
+from datetime import date, datetime
 
-base = 'http://webservices.legis.ga.gov/GGAServices/'
-suffix = '/Service.svc?wsdl'
+from GGA import clients, instrument, records, snapshot
+from GGA.cache import EntityCache, require_fresh, session_scope
+from GGA.clients import base, suffix, _make_client_url, get_client
+from GGA.instrument import trace
 
-def _make_client_url(keyword: str):
-    return f"{base}{keyword}{suffix}"
+# verbose=True entities log their progress at INFO, others at DEBUG
+logger = logging.getLogger('GGA')
+
+# Threads used to hydrate entities in parallel
+batch_workers = 8
+# How many stubs from the same list get hydrated together when one of them is first used
+batch_window = 32
+# Results requested per page by get_legislation_range() and search_legislation()
+legislation_page_size = 100
+
+# Identity map for entities whose session doesn't belong to a GeneralAssembly
+default_entities = EntityCache()
+# Local mirror (GGA.mirror.Mirror) answering calls made outside a GeneralAssembly that has its own
+default_mirror = None
+# Called with each entity right after its details are loaded from a service payload (e.g. GGA.index)
+hydration_listeners = []
+
+def add_hydration_listener(listener):
+    if listener not in hydration_listeners:
+        hydration_listeners.append(listener)
+
+def remove_hydration_listener(listener):
+    if listener in hydration_listeners:
+        hydration_listeners.remove(listener)
+
+def _service_call(keyword: str, operation: str, *args, assembly = None, session_id = None):
+    """
+    Every SOAP call goes through here so a local mirror can answer it before the service does (except inside
+    GGA.cache.fresh()). session_id tells the response cache which session the call belongs to.
+    """
+    mirror = getattr(assembly, 'mirror', None) or default_mirror
+    if mirror is not None and not require_fresh.get():
+        data = mirror.lookup(operation, args)
+        if data is not None:
+            instrument.record(keyword, operation, args, session_id=session_id, source='mirror')
+            return data
+    with session_scope(session_id):
+        data = instrument.call(get_client(keyword), keyword, operation, *args, session_id=session_id)
+    if mirror is not None and mirror.write_through:
+        mirror.store(operation, args, data)
+    return data
 
 def get_legislation_by_type_and_number(bill_type,
                                        bill_number,
                                        verbose: bool = False):
     # ex. ('HB', 280)
-    data = Client(_make_client_url(keyword='Legislation')).service.GetLegislationDetailByDescription(bill_type,
-                                                                                                     bill_number)
-    return Legislation(legislation_id=data['Id'],
-                       session=None,
-                       verbose=verbose)
+    data = _service_call('Legislation', 'GetLegislationDetailByDescription', bill_type, bill_number)
+    return _entity(Legislation, data['Id'],
+                   session=None,
+                   verbose=verbose).hydrate(data)
 
 def get_members_by_chamber_and_session(chamber: str, session, raw_data: bool = False):
     if chamber not in ['Senate', 'House']:
         raise Exception("Please indicate 'House' or 'Senate' when getting chamber members.")
     members = []
-    data = Client(_make_client_url(keyword='Members')).service.GetMembersByTypeAndSession(
-            ('Senator' if chamber == 'Senate' else 'Representative'), session.id)
+    data = _service_call('Members', 'GetMembersByTypeAndSession',
+                         ('Senator' if chamber == 'Senate' else 'Representative'), session.id,
+                         assembly=session.assembly,
+                         session_id=session.id)
     if raw_data:
         return data
     for member in data:
-        members.append(Member(member_id=member['Id'], session=session))
+        members.append(_entity(Member, member['Id'], session=session, short_data=member))
     return members
 
-"""
-    Currently broken, do not use
+def _name_key(name):
+    return ' '.join(str(name).split()).casefold()
+
+def _member_name_keys(data):
+    # "First Last" and "Last, First" (also with the nickname), matched case-insensitively
+    first, last, nickname = _field(data, 'Name', 'First'), _field(data, 'Name', 'Last'), _field(data, 'Name', 'Nickname')
+    keys = []
+    for given in (first, nickname):
+        if given and last:
+            keys.extend([_name_key(f"{given} {last}"), _name_key(f"{last}, {given}")])
+    return keys
+
+def _session_id(session):
+    return session.id if session is not None else None
+
+def _entities_for(session):
+    entities = getattr(getattr(session, 'assembly', None), 'entities', None)
+    return entities if entities is not None else default_entities
+
+def _entity(cls, entity_id, session, **kwargs):
+    """
+    Return the entity from the identity map, creating (and registering) a stub when it isn't known yet.
+    """
+    entities = _entities_for(session)
+    key = (cls._kind, entity_id, _session_id(session))
+    entity = entities.get(key)
+    if type(entity) is not cls:
+        entity = cls(entity_id, session=session, **kwargs)
+        entities.put(key, entity)
+    return entity
+
+# Per-key locks of the entities being fetched, so threads loading the same entity share one detail call
+_loading = {}
+_loading_lock = threading.Lock()
+
+@contextmanager
+def _single_flight(key):
+    with _loading_lock:
+        entry = _loading.get(key)
+        if entry is None:
+            entry = _loading[key] = [threading.RLock(), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _loading_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _loading[key]
+
+def _sponsor_ids(legislation):
+    # Distinct sponsor member ids of a hydrated bill, in listing order
+    member_ids = []
+    for author in _field(legislation.__dict__.get('json'), 'Authors', 'Sponsorship') or []:
+        if author['MemberId'] not in member_ids:
+            member_ids.append(author['MemberId'])
+    return member_ids
+
+def _load_or_error(entity):
+    try:
+        if not entity._hydrated:
+            entity._load()
+    except Exception as e:
+        return e
+    return entity
+
+def _hydrate_many(entities, max_workers: int = None, ordered: bool = True):
+    """
+    Hydrate entities on a bounded thread pool sharing the pooled clients.
+    Each result is the hydrated entity or the exception its detail call raised; a failure never aborts the batch.
+    Results are a list in input order, or a generator in completion order when ordered=False.
+    """
+    entities = list(entities)
+    workers = max(1, min(max_workers or batch_workers, len(entities)))
+    if ordered:
+        if workers == 1:
+            return [_load_or_error(entity) for entity in entities]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(instrument.contextual(_load_or_error), entities))
+    return _hydrate_as_completed(entities, workers)
+
+def _hydrate_as_completed(entities, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        load = instrument.contextual(_load_or_error)
+        futures = [executor.submit(load, entity) for entity in entities]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+def fetch_legislation_many(legislation_ids, session = None, verbose: bool = False, max_workers: int = None,
+                           ordered: bool = True):
+    return _hydrate_many((_entity(Legislation, legislation_id, session=session, verbose=verbose)
+                          for legislation_id in legislation_ids),
+                         max_workers=max_workers,
+                         ordered=ordered)
+
+def fetch_members_many(member_ids, session, verbose: bool = False, max_workers: int = None, ordered: bool = True):
+    return _hydrate_many((_entity(Member, member_id, session=session, verbose=verbose)
+                          for member_id in member_ids),
+                         max_workers=max_workers,
+                         ordered=ordered)
+
+def fetch_votes_many(vote_ids, session = None, legislation = None, verbose: bool = False, max_workers: int = None,
+                     ordered: bool = True):
+    return _hydrate_many((_entity(Vote, vote_id, session=session, legislation=legislation, verbose=verbose)
+                          for vote_id in vote_ids),
+                         max_workers=max_workers,
+                         ordered=ordered)
 
-def getLegislationRanges(startIndex, endIndex):
-    pass
+def fetch_committees_many(committee_ids, session, verbose: bool = False, max_workers: int = None,
+                          ordered: bool = True):
+    return _hydrate_many((_entity(Committee, committee_id, session=session, verbose=verbose)
+                          for committee_id in committee_ids),
+                         max_workers=max_workers,
+                         ordered=ordered)
 
-def getLegislationRange(startIndex, endIndex):
-    return Client(_make_client_url(keyword='Legislation')).service.GetLegislationRange()
+def _stream_entity(cls, entity_id, session, retain: bool = False, **kwargs):
+    # Streamed entities are only kept by the identity map when asked to, so memory stays flat
+    if retain:
+        return _entity(cls, entity_id, session=session, **kwargs)
+    entity = cls(entity_id, session=session, **kwargs)
+    entity._cacheable = False
+    return entity
 
-def getLegislationSearchResults(searchTerm):
-    return Client(_make_client_url(keyword='Legislation')).service.GetLegislationSearchResultsPaged(searchTerm)
-"""
+def _iter_hydrated(entities, prefetch: int = None, ordered: bool = True, return_exceptions: bool = False):
+    """
+    Yield entities hydrated, keeping up to `prefetch` detail calls running ahead of the consumer.
+    Stopping the iteration early cancels whatever hasn't started yet.
+    """
+    prefetch = batch_workers if prefetch is None else prefetch
+    entities = iter(entities)
+    if prefetch < 1:
+        for entity in entities:
+            result = _load_or_error(entity)
+            if isinstance(result, Exception) and not return_exceptions:
+                raise result
+            yield result
+        return
+    executor = ThreadPoolExecutor(max_workers=prefetch)
+    load = instrument.contextual(_load_or_error)
+    pending = deque()
+    try:
+        for entity in entities:
+            pending.append(executor.submit(load, entity))
+            if len(pending) >= prefetch:
+                break
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                future = next(as_completed(pending))
+                pending.remove(future)
+            result = future.result()
+            for entity in entities:
+                pending.append(executor.submit(load, entity))
+                break
+            if isinstance(result, Exception) and not return_exceptions:
+                raise result
+            yield result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+class _Batch:
+    # Stubs returned by one list call. The first one used hydrates on its own; once a second one is used the caller
+    # is walking the list, and from then on each use hydrates it and the next few siblings in parallel
+    def __init__(self, entities):
+        self.entities = entities
+        self.walking = False
+        for index, entity in enumerate(entities):
+            entity._batch = self
+            entity._batch_index = index
+
+    @staticmethod
+    def detach(entity):
+        # For entities handed out one at a time (get_member() and the like): hydrating them never pulls in siblings
+        entity.__dict__.pop('_batch', None)
+        return entity
+
+    def hydrate(self, entity):
+        if not self.walking:
+            self.walking = True
+            entity._load()
+            return
+        start = entity._batch_index
+        pending = [sibling for sibling in self.entities[start:start + batch_window] if not sibling._hydrated]
+        if entity not in pending:
+            pending.insert(0, entity)
+        result = _hydrate_many(pending)[pending.index(entity)]
+        if isinstance(result, Exception):
+            raise result
+
+# Where each paged operation's response holds its items and its total: a path of element names to the list (None
+# when the operation answers with the list itself), and the total count's element (None when it reports none)
+_paged_fields = {
+    'GetLegislationRange': (None, None),
+    'GetLegislationSearchResultsPaged': (('Results', 'LegislationSearchResult'), 'TotalResults'),
+}
+
+def _page_items(operation: str, data):
+    items_path, total_field = _paged_fields[operation]
+    data = helpers.serialize_object(data)
+    if data is None:
+        return [], None
+    if items_path is None:
+        if not isinstance(data, list):
+            raise ValueError(f"{operation} answered with {type(data).__name__}, expected a list (see gga._paged_fields)")
+        return data, None
+    if not isinstance(data, dict) or items_path[0] not in data:
+        raise ValueError(f"{operation} response has no {items_path[0]} element (see gga._paged_fields)")
+    total = data.get(total_field) if total_field else None
+    return list(_field(data, *items_path) or []), total
+
+class _Pages:
+    """
+    Lazy iterator over a paged listing. fetch(page_number) returns (items, total or None); page n + 1 is
+    requested in the background while page n is being consumed, and nothing is requested before iteration starts.
+    """
+    def __init__(self, fetch, page_size: int, limit: int = None):
+        self.fetch = fetch
+        self.page_size = page_size
+        self.limit = limit
+        # Reported by the service with the first page, when it does
+        self.total = None
+        self.pages_fetched = 0
+
+    def __iter__(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        fetch = instrument.contextual(self.fetch)
+        try:
+            future = executor.submit(fetch, 0)
+            page, seen = 0, 0
+            while future is not None:
+                items, total = future.result()
+                self.pages_fetched += 1
+                if total is not None:
+                    self.total = total
+                if self.limit is not None:
+                    items = items[:self.limit - seen]
+                seen += len(items)
+                page += 1
+                done = (len(items) < self.page_size
+                        or (self.total is not None and seen >= self.total)
+                        or (self.limit is not None and seen >= self.limit))
+                future = None if done else executor.submit(fetch, page)
+                yield from items
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def _legislation_page(operation: str, data, session, verbose):
+    # One _Batch per page, so hydrating a result only pulls in its neighbours on the same page
+    items, total = _page_items(operation, data)
+    legislation = [_entity(Legislation, _field(item, 'Id'),
+                           session=session,
+                           verbose=verbose,
+                           data=item)
+                   for item in items if _field(item, 'Id') is not None]
+    _Batch(legislation)
+    return legislation, total
+
+def get_legislation_range(start_index: int, end_index: int = None, session = None, page_size: int = None,
+                          verbose: bool = False):
+    """
+    Legislation stubs at positions start_index <= i < end_index (open-ended when end_index is None) of the
+    service's listing, fetched page_size at a time with GetLegislationRange (which takes inclusive bounds).
+    """
+    page_size = page_size or legislation_page_size
+
+    def fetch(page):
+        first = start_index + page * page_size
+        last = first + page_size if end_index is None else min(first + page_size, end_index)
+        if last <= first:
+            return [], None
+        return _legislation_page('GetLegislationRange',
+                                 _service_call('Legislation', 'GetLegislationRange', first, last - 1,
+                                               assembly=getattr(session, 'assembly', None),
+                                               session_id=_session_id(session)),
+                                 session=session,
+                                 verbose=verbose)
+
+    limit = None if end_index is None else max(0, end_index - start_index)
+    return _Pages(fetch, page_size=page_size, limit=limit)
+
+def search_legislation(term: str, session = None, page_size: int = None, limit: int = None, verbose: bool = False,
+                       **constraints):
+    """
+    Search the service with GetLegislationSearchResultsPaged, page by page; results are Legislation stubs.
+    Extra keyword arguments are added to the search constraints as they are (e.g. DocumentType='HB').
+    """
+    page_size = page_size or legislation_page_size
+
+    def fetch(page):
+        request = {'Keyword': term, 'PageIndex': page, 'PageSize': page_size}
+        if session is not None:
+            request['SessionId'] = session.id
+        request.update(constraints)
+        return _legislation_page('GetLegislationSearchResultsPaged',
+                                 _service_call('Legislation', 'GetLegislationSearchResultsPaged', request,
+                                               assembly=getattr(session, 'assembly', None),
+                                               session_id=_session_id(session)),
+                                 session=session,
+                                 verbose=verbose)
+
+    return _Pages(fetch, page_size=page_size, limit=limit)
+
+def _field(data, *keys):
+    # Safe nested lookup for optional summary fields
+    for key in keys:
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError, AttributeError):
+            return None
+    return data
 
 class Base:
+    # Identity map entity type; entities sharing a kind share fetched details
+    _kind = None
+    # Whether instances are registered in the identity map once hydrated
+    _cacheable = True
+    # Attributes filled in by hydrate(); reading one on a stub triggers the detail call
+    _details = ()
+    # Detail attributes that summary listings may already provide, as {attribute: (keys, ...)}
+    _summary_fields = {}
+
     def __init__(self, keyword: str = 'Session', verbose: bool = False):
-        self.client = Client(_make_client_url(keyword=keyword))
+        self.keyword = keyword
         self.verbose = verbose
+        self._hydrated = False
+
+    def __getattr__(self, name):
+        # Only reached when normal lookup fails, i.e. a detail attribute of a stub
+        if name in type(self)._details and not self.__dict__.get('_hydrated', True):
+            self.hydrate()
+            return getattr(self, name)
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+
+    def _apply_summary(self, data):
+        if data is None:
+            return
+        for attribute, keys in self._summary_fields.items():
+            value = _field(data, *keys)
+            if value is not None:
+                setattr(self, attribute, value)
+
+    @property
+    def hydrated(self):
+        return self._hydrated
+
+    def hydrate(self, data = None):
+        """
+        Load the detail attributes, from data if the detail payload is already at hand.
+        """
+        if not self._hydrated:
+            batch = self.__dict__.get('_batch')
+            if data is None and batch is not None:
+                batch.hydrate(self)
+            else:
+                self._load(data)
+        return self
+
+    def _key(self):
+        return self._kind, self.id, _session_id(self.session)
+
+    def _entities(self):
+        # Identity map this entity is registered in
+        return _entities_for(self.session)
+
+    def _copy_details(self, other):
+        for name in self._details:
+            if name in other.__dict__:
+                self.__dict__[name] = other.__dict__[name]
+
+    def _load(self, data = None):
+        entities = self._entities()
+        key = self._key()
+        if data is not None:
+            self._finish_load(entities, key, data, None)
+            return
+        with _single_flight((id(entities), key)):
+            # Whoever held the key first has loaded this entity or its twin by now
+            if not self._hydrated:
+                self._finish_load(entities, key, None, entities.peek(key))
+
+    def _finish_load(self, entities, key, data, twin):
+        loaded = twin is None or twin is self or not twin._hydrated
+        if loaded:
+            self._hydrate(data)
+        else:
+            self._copy_details(twin)
+        self._hydrated = True
+        if loaded:
+            entities.changed()
+            for listener in list(hydration_listeners):
+                listener(self)
+        if self._cacheable:
+            known = entities.peek(key)
+            if known is None:
+                entities.put(key, self)
+            elif known is not self and not known._hydrated:
+                known._copy_details(self)
+                known._hydrated = True
+
+    def _hydrate(self, data):
+        pass
+
+    def to_record(self, keep_raw: bool = None):
+        """
+        Compact __slots__ copy of this entity (GGA.records); keep_raw defaults to records.keep_raw.
+        """
+        return self._record.from_data(self.json, self.id,
+                                      session_id=_session_id(self.session),
+                                      keep=keep_raw,
+                                      **self._record_kwargs())
+
+    def _record_kwargs(self):
+        # Extra from_data() arguments of this entity's record type
+        return {}
+
+    @property
+    def client(self):
+        # Pooled per service keyword, so creating an object never loads a WSDL
+        return get_client(self.keyword)
 
     def remake_client(self, keyword: str):
-        self.client = Client(_make_client_url(keyword=keyword))
+        self.keyword = keyword
+
+    def _assembly(self):
+        return getattr(getattr(self, 'session', None), 'assembly', None)
+
+    def _session_id(self):
+        return _session_id(getattr(self, 'session', None))
+
+    def _log(self, message: str):
+        logger.log(logging.INFO if self.verbose else logging.DEBUG, message, self.__class__.__name__, self.id)
+
+    def _call(self, operation: str, *args, keyword: str = None):
+        return _service_call(keyword or self.keyword, operation, *args,
+                             assembly=self._assembly(),
+                             session_id=self._session_id())
 
 class GeneralAssembly(Base):
     
-    def __init__(self, verbose: bool = False):
+    def __init__(self,
+                 verbose: bool = False,
+                 entity_cache_size: int = 10000,
+                 entity_cache_ttl: float = None,
+                 mirror = None):
         super().__init__(keyword='Session',
                          verbose=verbose)
+        # Optional GGA.mirror.Mirror answering calls from local storage
+        self.mirror = mirror
         self._sessions = None
+        self._sessions_by_id = {}
+        self._sessions_by_name = {}
         self._years = None
         self._votes = None
+        # Every Member, Legislation, Committee and Vote reached from this assembly is fetched once
+        self.entities = EntityCache(maxsize=entity_cache_size,
+                                    ttl=entity_cache_ttl)
+
+    def _assembly(self):
+        return self
 
     @property
     def legislation_categories(self):
         categories = []
-        for category in Client(_make_client_url(keyword='Legislation')).service.GetTitles():
+        for category in self._call('GetTitles', keyword='Legislation'):
             categories.append(Category(category_data=category)
                               )
         return categories
@@ -73,6 +557,8 @@ class GeneralAssembly(Base):
     def sessions(self):
         if not self._sessions:
             self._sessions = self._years_to_sessions()
+            self._sessions_by_id = {session.id: session for session in self._sessions}
+            self._sessions_by_name = {_name_key(session.description): session for session in self._sessions}
             """
             self._sessions = []
             for session in self.client.service.GetSessions():
@@ -83,45 +569,81 @@ class GeneralAssembly(Base):
     def get_session(self, session_name: str = None, session_id = None):
         if not session_id and not session_name:
             return None
-        for session in self.sessions:
-            if session_id and session.id == session_id:
-                return session
-            elif session_name and session.description == session_name:
-                return session
-        return None
+        self.sessions  # builds the lookups on first use
+        if session_id:
+            return self._sessions_by_id.get(session_id)
+        return self._sessions_by_name.get(_name_key(session_name))
     
     @property
     def years(self):
         if not self._years:
-            self._years = self.client.service.GetYears()
+            self._years = self._call('GetYears')
         return self._years
 
     def _years_to_sessions(self):
+        if clients.response_cache is not None and self.years:
+            # Only the latest session can still change, cached responses for the others never expire
+            latest = max(self.years, key=lambda year: year['Number'])
+            clients.response_cache.close_sessions([year['Session']['Id'] for year in self.years
+                                                   if year is not latest])
         sessions = []
         for year in self.years:
             session_data = year['Session']
             session_data['Year'] = year['Number']
             sessions.append(Session(session_id=session_data['Id'],
                                     data=session_data,
-                                    verbose=self.verbose)
+                                    verbose=self.verbose,
+                                    assembly=self)
                             )
         return sessions
     
     @property
     def votes(self):
         if not self._votes:
-            for vote in Client(_make_client_url(keyword='Votes')).service.GetVotes():
-                self._votes.append(Vote(vote_id=vote['voteId'],
-                                        session=None,
-                                        legislation=None,
-                                        verbose=self.verbose)
+            self._votes = []
+            for vote in self._call('GetVotes', keyword='Votes'):
+                self._votes.append(_entity(Vote, vote['VoteId'],
+                                           session=None,
+                                           legislation=None,
+                                           verbose=self.verbose,
+                                           data=vote)
                                    )
+            _Batch(self._votes)
         return self._votes
 
+    def iter_votes(self, prefetch: int = None, ordered: bool = True, retain: bool = False):
+        return _iter_hydrated((_stream_entity(Vote, vote['VoteId'],
+                                              session=None,
+                                              retain=retain,
+                                              legislation=None,
+                                              verbose=self.verbose,
+                                              data=vote)
+                               for vote in self._call('GetVotes', keyword='Votes')),
+                              prefetch=prefetch,
+                              ordered=ordered)
+
+    def save_snapshot(self, path: str):
+        """
+        Save everything loaded so far (sessions, listings, hydrated members, legislation, committees and votes) to a
+        msgpack snapshot file for load_snapshot(); returns the number of service payloads saved.
+        """
+        return snapshot.save(self, path)
+
+    @classmethod
+    def load_snapshot(cls, path: str, **kwargs):
+        """
+        A GeneralAssembly answered from a snapshot file instead of the service; entities are rebuilt lazily, as
+        they are reached, and only what the snapshot lacks is fetched.
+        """
+        return cls(mirror=snapshot.Snapshot(path), **kwargs)
+
     def reset(self):
-        del self._sessions
-        del self._years
-        del self._votes
+        self._sessions = None
+        self._sessions_by_id = {}
+        self._sessions_by_name = {}
+        self._years = None
+        self._votes = None
+        self.entities.clear()
 
 
 class Session(Base):
@@ -129,10 +651,29 @@ class Session(Base):
     def __init__(self,
                  session_id,
                  data = None,
-                 verbose: bool = False):
+                 verbose: bool = False,
+                 assembly = None):
         super().__init__(keyword='Session',
                          verbose=verbose)
         self.id = session_id
+        self.assembly = assembly
+        self._legislation = None
+        # Raw GetLegislationForSession listing behind _legislation (see GGA.snapshot)
+        self._legislation_summaries = None
+        # Summary listings keyed by chamber (None for the whole session) and the lookups built from them
+        self._member_summaries = {}
+        self._member_index = {}
+        self._committee_summaries = None
+        self._committee_index = None
+        # Sponsor member id -> Legislation, and Legislation id -> (Legislation, sponsor member ids) already indexed
+        self._sponsors = {}
+        self._indexed_sponsors = {}
+        # (bill list, identity map version) the index was last brought up to date with
+        self._sponsors_seen = None
+        self._sponsor_lock = threading.Lock()
+        # Schedules and Calendars by chamber
+        self._schedules = {}
+        self._calendars = {}
         self.description = ""
         if data:
             self.description = data['Description']
@@ -142,29 +683,110 @@ class Session(Base):
 
     def __repr__(self):
         return f"<{self.__class__.__name__}:{self.description}>"
+
+    def _assembly(self):
+        return self.assembly
+
+    def _session_id(self):
+        return self.id
     
     def get_schedules(self,
-                      chamber):
+                      chamber,
+                      refresh: bool = False):
         if chamber not in ['House', 'Senate']:
             raise Exception("Specify either 'House' or 'Senate' when grabbing schedule.")
+        if refresh or chamber not in self._schedules:
+            self._schedules[chamber] = self._make_schedules(chamber=chamber,
+                                                            schedule_data=self._call('GetSessionSchedule', self.id,
+                                                                                     chamber))
+            self._calendars.pop(chamber, None)
+        return self._schedules[chamber]
+
+    def calendar(self, chamber: str):
+        """
+        Calendar of the chamber's legislative days, with date lookups (see Calendar).
+        """
+        return self._calendar_from(chamber, self.get_schedules(chamber))
+
+    def _calendar_from(self, chamber: str, schedules):
+        if chamber not in self._calendars:
+            self._calendars[chamber] = Calendar(chamber=chamber,
+                                                schedules=schedules,
+                                                session=self)
+        return self._calendars[chamber]
+
+    def _known(self, kind: str):
+        # Entities of this session already in the identity map, loaded or not
+        return [entity for entity in _entities_for(self).values()
+                if entity._kind == kind and _session_id(entity.session) == self.id]
+
+    def _make_schedules(self, chamber, schedule_data):
         schedules = []
-        schedule_data = helpers.serialize_object(self.client.service.GetSessionSchedule(self.id, chamber))
+        schedule_data = helpers.serialize_object(schedule_data)
         for schedule in schedule_data['Years']['LegislativeYear']:
             schedules.append(Schedule(chamber=chamber,
                                       schedule_data=schedule)
                              )
         return schedules
         
+    def reset(self):
+        self._legislation = None
+        self._legislation_summaries = None
+        self._schedules = {}
+        self._calendars = {}
+        self._member_summaries = {}
+        self._member_index = {}
+        self._committee_summaries = None
+        self._committee_index = None
+        with self._sponsor_lock:
+            self._sponsors = {}
+            self._indexed_sponsors = {}
+            self._sponsors_seen = None
+
+    def _members_summary(self, chamber: str = None):
+        if chamber not in self._member_summaries:
+            if chamber:
+                members = get_members_by_chamber_and_session(chamber=chamber, session=self, raw_data=True)
+            else:
+                members = self._call('GetMembersBySession', self.id, keyword='Members')
+            self._member_summaries[chamber] = members
+        return self._member_summaries[chamber]
+
+    def _members_lookup(self, chamber: str = None):
+        if chamber not in self._member_index:
+            by_id, by_name = {}, {}
+            for member in self._members_summary(chamber=chamber):
+                by_id[member['Id']] = member
+                for key in _member_name_keys(member):
+                    by_name.setdefault(key, member)
+            self._member_index[chamber] = (by_id, by_name)
+        return self._member_index[chamber]
+
     @property
     def all_members(self):
         members = []
-        for member in Client(_make_client_url(keyword='Members')).service.GetMembersBySession(self.id):
-            members.append(Member(member_id=member['Id'],
-                                  session=self,
-                                  verbose=self.verbose)
+        for member in self._members_summary():
+            members.append(_entity(Member, member['Id'],
+                                   session=self,
+                                   verbose=self.verbose,
+                                   short_data=member)
                            )
+        _Batch(members)
         return members
 
+    def iter_members(self, prefetch: int = None, ordered: bool = True, retain: bool = False):
+        """
+        Yield the session's members hydrated one by one, `prefetch` requests ahead; see also iter_legislation().
+        """
+        return _iter_hydrated((_stream_entity(Member, member['Id'],
+                                              session=self,
+                                              retain=retain,
+                                              verbose=self.verbose,
+                                              short_data=member)
+                               for member in self._members_summary()),
+                              prefetch=prefetch,
+                              ordered=ordered)
+
     def get_chamber_members(self, chamber: str):
         return get_members_by_chamber_and_session(chamber=chamber, session=self)
 
@@ -172,85 +794,205 @@ class Session(Base):
                    member_name: str = None,
                    member_id = None,
                    chamber: str = None):
+        # member_name may be "First Last" or "Last, First", in any case
         if not member_id and not member_name:
             return None
-        if chamber:
-            members = get_members_by_chamber_and_session(chamber=chamber, session=self, raw_data=True)
-        else:
-            members = Client(_make_client_url(keyword='Members')).service.GetMembersBySession(self.id)
-        for member in members:
-            if member_id and member['Id'] == member_id:
-                return Member(member_id=member['Id'],
-                              session=self,
-                              verbose=self.verbose)
-            elif member_name and f"{member['Name']['First']} {member['Name']['Last']}" == member_name:
-                return Member(member_id=member['Id'],
-                              session=self,
-                              verbose=self.verbose)
-        return None
+        by_id, by_name = self._members_lookup(chamber=chamber)
+        member = by_id.get(member_id) if member_id else by_name.get(_name_key(member_name))
+        if member is None:
+            return None
+        return _Batch.detach(_entity(Member, member['Id'],
+                                     session=self,
+                                     verbose=self.verbose,
+                                     short_data=member))
         
     @property
     def legislation(self):
+        if self._legislation is None:
+            self.refresh_legislation()
+        return self._legislation
+
+    def refresh_legislation(self):
+        """
+        Re-pull the session's bill list; the sponsor index catches up with the difference on its next use.
+        """
         legislation = []
-        for legis in Client(_make_client_url(keyword='Legislation')).service.GetLegislationForSession(self.id):
-            legislation.append(Legislation(legislation_id=legis['Id'],
-                                           session=self,
-                                           verbose=self.verbose)
+        self._legislation_summaries = self._call('GetLegislationForSession', self.id, keyword='Legislation')
+        for legis in self._legislation_summaries:
+            legislation.append(_entity(Legislation, legis['Id'],
+                                       session=self,
+                                       verbose=self.verbose,
+                                       data=legis)
                                )
+        _Batch(legislation)
+        self._legislation = legislation
         return legislation
+
+    def iter_legislation(self, prefetch: int = None, ordered: bool = True, retain: bool = False):
+        """
+        Yield the session's legislation hydrated as soon as each bill is fetched, without building the full list.
+        prefetch: detail requests kept in flight ahead of the consumer (0 fetches one at a time)
+        ordered: keep the listing order, or yield in completion order
+        retain: also keep the bills in the identity map (off by default so memory stays constant)
+        """
+        return _iter_hydrated((_stream_entity(Legislation, legis['Id'],
+                                              session=self,
+                                              retain=retain,
+                                              verbose=self.verbose,
+                                              data=legis)
+                               for legis in self._call('GetLegislationForSession', self.id, keyword='Legislation')),
+                              prefetch=prefetch,
+                              ordered=ordered)
+
+    def _update_sponsor_index(self):
+        with self._sponsor_lock:
+            legislation = self.legislation
+            version = _entities_for(self).version
+            # Nothing to catch up with unless the bill list was refreshed or some entity was added or (re)loaded
+            seen = self._sponsors_seen
+            if seen is not None and seen[0] is legislation and seen[1] == version:
+                return
+            self._sponsors_seen = (legislation, version)
+            current = {legis.id: legis for legis in legislation}
+            for legislation_id, (indexed, member_ids) in list(self._indexed_sponsors.items()):
+                # Gone from the list, replaced by another object, or re-hydrated with different authors
+                legis = current.get(legislation_id)
+                if legis is not indexed or _sponsor_ids(legis) != member_ids:
+                    self._unindex_sponsors(legislation_id)
+            added = [legis for legislation_id, legis in current.items()
+                     if legislation_id not in self._indexed_sponsors]
+            # Sponsors only come with the bill details; bills that fail to load are retried next time
+            for legis in _hydrate_many(added):
+                if isinstance(legis, Exception):
+                    self._sponsors_seen = None
+                    continue
+                member_ids = _sponsor_ids(legis)
+                for member_id in member_ids:
+                    self._sponsors.setdefault(member_id, []).append(legis)
+                self._indexed_sponsors[legis.id] = (legis, member_ids)
+
+    def _unindex_sponsors(self, legislation_id):
+        legis, member_ids = self._indexed_sponsors.pop(legislation_id)
+        for member_id in member_ids:
+            self._sponsors[member_id] = [indexed for indexed in self._sponsors[member_id] if indexed is not legis]
+
+    @property
+    def sponsor_index(self):
+        self._update_sponsor_index()
+        return self._sponsors
+
+    def legislation_by_sponsor(self, member_id):
+        return list(self.sponsor_index.get(member_id, []))
+
+    def search_legislation(self, term: str, page_size: int = None, limit: int = None, **constraints):
+        """
+        Lazily page through the service's search results for this session; see gga.search_legislation().
+        """
+        return search_legislation(term,
+                                  session=self,
+                                  page_size=page_size,
+                                  limit=limit,
+                                  verbose=self.verbose,
+                                  **constraints)
     
+    def _committees_summary(self):
+        if self._committee_summaries is None:
+            self._committee_summaries = self._call('GetCommitteesBySession', self.id, keyword='Committees')
+        return self._committee_summaries
+
+    def _committees_lookup(self):
+        if self._committee_index is None:
+            by_id, by_name = {}, {}
+            for committee in self._committees_summary():
+                by_id[committee['Id']] = committee
+                for key in ('Name', 'Code'):
+                    if _field(committee, key):
+                        by_name.setdefault(_name_key(committee[key]), committee)
+            self._committee_index = (by_id, by_name)
+        return self._committee_index
+
     @property
     def committees(self):
         committees = []
-        for committee in Client(_make_client_url(keyword='Committees')).service.GetCommitteesBySession(self.id):
-            committees.append(Committee(committee_id=committee['Id'],
-                                        session=self,
-                                        verbose=self.verbose)
+        for committee in self._committees_summary():
+            committees.append(_entity(Committee, committee['Id'],
+                                      session=self,
+                                      verbose=self.verbose,
+                                      data=committee)
                               )
+        _Batch(committees)
         return committees
 
+    def iter_committees(self, prefetch: int = None, ordered: bool = True, retain: bool = False):
+        return _iter_hydrated((_stream_entity(Committee, committee['Id'],
+                                              session=self,
+                                              retain=retain,
+                                              verbose=self.verbose,
+                                              data=committee)
+                               for committee in self._committees_summary()),
+                              prefetch=prefetch,
+                              ordered=ordered)
+
     def get_committee(self,
                       committee_id = None,
                       committe_name: str = None):
+        # committe_name matches the committee name or code, in any case
         if not committee_id and not committe_name:
             return None
-        for committee in self.committees:
-            if committee_id and committee.id == committee_id:
-                return committee
-            elif committe_name and committee.name == committe_name:
-                return committee
-        return None
+        by_id, by_name = self._committees_lookup()
+        committee = by_id.get(committee_id) if committee_id else by_name.get(_name_key(committe_name))
+        if committee is None:
+            return None
+        return _Batch.detach(_entity(Committee, committee['Id'],
+                                     session=self,
+                                     verbose=self.verbose,
+                                     data=committee))
     
 class Member(Base):
-    
+    _kind = 'Member'
+    _record = records.MemberRecord
+    _details = ('address', 'birthday', 'education', 'firstName', 'lastName', 'middleName', 'nickname', 'name',
+                'suffix', 'occupation', 'religion', 'spouse', 'bioLink', 'comments', 'residence', 'latestSession',
+                'party', 'legId', 'serviceId', 'chamber', 'title', 'staff', 'json')
+    _summary_fields = {
+        'firstName': ('Name', 'First'),
+        'lastName': ('Name', 'Last'),
+        'middleName': ('Name', 'Middle'),
+        'nickname': ('Name', 'Nickname'),
+        'suffix': ('Name', 'Suffix'),
+        'party': ('Party',),
+        'chamber': ('District', 'Type'),
+    }
+
     def __init__(self,
                  member_id,
                  session: Session,
                  verbose: bool = False,
                  short_data = None,
                  short: bool = False):
+        # Members start as stubs; `short` is kept for compatibility, details load on first use
         super().__init__(keyword='Members',
                          verbose=verbose)
         self.id = member_id
-        if self.verbose:
-            print(f"Creating basic {self.__class__.__name__} {self.id}...")
+        self._log("Creating basic %s %s...")
         self.session = session
         self._district = None
         self._contact = None
         self._sessions = []
-        if short and short_data:
-            self.chamber = ""
-            self.name = f"{short_data['Name']['First']} {short_data['Name']['Last']}"
-        else:
-            self._make_member()
+        self._apply_summary(short_data)
+        if 'firstName' in self.__dict__ and 'lastName' in self.__dict__:
+            self.name = f"{self.firstName} {self.lastName}"
 
     def expand(self):
-        self._make_member()
+        self.hydrate()
+
+    def _hydrate(self, data):
+        self._make_member(data=data)
 
-    def _make_member(self):
-        if self.verbose:
-            print(f"Expanding {self.__class__.__name__} {self.id}...")
-        data = self.client.service.GetMember(self.id)
+    def _make_member(self, data = None):
+        self._log("Expanding %s %s...")
+        if data is None:
+            data = self._call('GetMember', self.id)
         self.address = data['Address']
         self.birthday = data['Birthday']
         self.education = data['Education']
@@ -277,7 +1019,8 @@ class Member(Base):
         self.json = data
 
     def __repr__(self):
-        return f"<{self.__class__.__name__}:{self.chamber}:{self.name}>"
+        # Never hydrates; stubs show whatever the summary provided
+        return f"<{self.__class__.__name__}:{self.__dict__.get('chamber', '')}:{self.__dict__.get('name', self.id)}>"
         
     @property
     def district(self):
@@ -295,29 +1038,31 @@ class Member(Base):
     def sessions(self):
         if not self._sessions:
             for session in self.json['SessionsInService']['LegislativeService']:
-                self._sessions.append(Session(session_id=session['Session']['Id']))
+                self._sessions.append(Session(session_id=session['Session']['Id'],
+                                              assembly=getattr(self.session, 'assembly', None)))
         return self._sessions
 
     @property
     def committees(self):
         committees = []
         for committee in self.latestSession['CommitteeMemberships']['CommitteeMembership']:
-            committees.append(Committee(committee_id=committee['Committee']['Id'],
-                                        session=self.session,
-                                        verbose=self.verbose)
+            committees.append(_entity(Committee, committee['Committee']['Id'],
+                                      session=self.session,
+                                      verbose=self.verbose,
+                                      data=committee['Committee'])
                               )
         return committees
 
     @property
     def legislation(self):
-        legislation = []
-        for legis in self.session.legislation:
-            for author in legis.authors:
-                if author.id == self.id and author.name == self.name:
-                    legislation.append(legis)
-        return legislation
+        if self.session is None:
+            return []
+        return self.session.legislation_by_sponsor(self.id)
 
 class Author(Member):
+    # Authors carry a per-bill type, so only the underlying Member is shared through the identity map
+    _cacheable = False
+
     def __init__(self,
                  author_type,
                  member_id,
@@ -335,6 +1080,14 @@ class Author(Member):
     def __repr__(self):
         return super(Author, self).__repr__()
 
+    def _load(self, data = None):
+        member = _entity(Member, self.id,
+                         session=self.session,
+                         verbose=self.verbose)
+        member.hydrate(data)
+        self._copy_details(member)
+        self._hydrated = True
+
 class District:
     def __init__(self,
                  district_data):
@@ -345,6 +1098,9 @@ class District:
         self.number = district_data['Number']
         self.json = district_data
 
+    def to_record(self):
+        return records.DistrictRecord.from_data(self.json)
+
 class Contact:
     def __init__(self,
                  contact_data):
@@ -360,25 +1116,42 @@ class Contact:
         self.zipCode = dist['Zip']
         self.json = contact_data
 
+    def to_record(self):
+        return records.ContactRecord.from_data(self.json)
+
 class Vote(Base):
-    
+    _kind = 'Vote'
+    _record = records.VoteRecord
+    _details = ('day', 'time', 'datetime', 'number', 'count', 'result', 'chamber', 'json')
+    _summary_fields = {
+        'datetime': ('Date',),
+        'number': ('Number',),
+        'chamber': ('Branch',),
+    }
+
     def __init__(self,
                  vote_id,
                  session: Union[Session, None],
                  legislation,
-                 verbose: bool = False):
+                 verbose: bool = False,
+                 data = None):
         super().__init__(keyword='Votes',
                          verbose=verbose)
         self.id = vote_id
         self.session = session
         self._legislation = legislation
+        self._apply_summary(data)
+
+    def _hydrate(self, data):
+        self._make_vote(data=data)
 
-        self._make_vote()
+    def _record_kwargs(self):
+        return {'legislation_id': getattr(self._legislation, 'id', self._legislation)}
 
-    def _make_vote(self):
-        if self.verbose:
-            print(f"Creating {self.__class__.__name__} {self.id}...")
-        data = self.client.service.GetVote(self.id)
+    def _make_vote(self, data = None):
+        self._log("Creating %s %s...")
+        if data is None:
+            data = self._call('GetVote', self.id)
         self.day = data['Day']
         self.time = data['Time']
         self.datetime = data['Date']
@@ -390,7 +1163,7 @@ class Vote(Base):
         self.json = data
 
     def __repr__(self):
-        return f"<{self.__class__.__name__}:{self.chamber}:{self.number}>"
+        return f"<{self.__class__.__name__}:{self.__dict__.get('chamber', '')}:{self.__dict__.get('number', self.id)}>"
 
 class VoteCount:
     def __init__(self,
@@ -398,30 +1171,48 @@ class VoteCount:
                  vote):
         self.yays = vote_count_data['Yeas']
         self.nays = vote_count_data['Nays']
-        self.noVotes = vote_count_data['NotVoting'],
+        self.noVotes = vote_count_data['NotVoting']
         self.excused = vote_count_data['Excused']
         self.vote = vote
 
     def __repr__(self):
         return f"<{self.__class__.__name__}:{self.vote.chamber}:{self.vote.number}:Count>"
 
+    def to_record(self):
+        return records.VoteCountRecord(yays=self.yays, nays=self.nays, noVotes=self.noVotes, excused=self.excused)
+
 class Legislation(Base):
+    _kind = 'Legislation'
+    _record = records.LegislationRecord
+    _details = ('caption', 'vetoNumber', 'documentType', 'type', 'number', 'status', 'suffix', 'footnotes',
+                'statusHistory', 'summary', 'versions', 'json')
+    _summary_fields = {
+        'caption': ('Caption',),
+        'documentType': ('DocumentType',),
+        'number': ('Number',),
+        'suffix': ('Suffix',),
+    }
 
     def __init__(self,
                  legislation_id,
                  session: Union[Session, None],
-                 verbose: bool = False):
+                 verbose: bool = False,
+                 data = None):
         super().__init__(keyword='Legislation',
                          verbose=verbose)
         self.id = legislation_id
         self.session = session
+        # Last GetVotesForLegislation listing behind votes (see GGA.snapshot)
+        self._vote_summaries = None
+        self._apply_summary(data)
 
-        self._make_legislation()
+    def _hydrate(self, data):
+        self._make_legislation(details=data)
 
-    def _make_legislation(self):
-        if self.verbose:
-            print(f"Creating {self.__class__.__name__} {self.id}...")
-        details = self.client.service.GetLegislationDetail(self.id)
+    def _make_legislation(self, details = None):
+        self._log("Creating %s %s...")
+        if details is None:
+            details = self._call('GetLegislationDetail', self.id)
         self.caption = details['Caption']
         self.vetoNumber = details['ActVetoNumber']
         self.documentType = details['DocumentType']
@@ -437,19 +1228,33 @@ class Legislation(Base):
         self.json = details
 
     def __repr__(self):
-        return f"<{self.__class__.__name__}:{self.documentType}:{self.number}>"
+        return f"<{self.__class__.__name__}:{self.__dict__.get('documentType', '')}:{self.__dict__.get('number', self.id)}>"
 
     @property
     def votes(self):
         votes = []
-        for vote in Client(_make_client_url(keyword='Votes')).service.GetVotesForLegislation(self.id):
-            votes.append(Vote(vote_id=vote['VoteId'],
-                              session=self.session,
-                              legislation=self,
-                              verbose=self.verbose)
+        self._vote_summaries = self._call('GetVotesForLegislation', self.id, keyword='Votes')
+        for vote in self._vote_summaries:
+            votes.append(_entity(Vote, vote['VoteId'],
+                                 session=self.session,
+                                 legislation=self,
+                                 verbose=self.verbose,
+                                 data=vote)
                          )
+        _Batch(votes)
         return votes
 
+    def iter_votes(self, prefetch: int = None, ordered: bool = True, retain: bool = False):
+        return _iter_hydrated((_stream_entity(Vote, vote['VoteId'],
+                                              session=self.session,
+                                              retain=retain,
+                                              legislation=self,
+                                              verbose=self.verbose,
+                                              data=vote)
+                               for vote in self._call('GetVotesForLegislation', self.id, keyword='Votes')),
+                              prefetch=prefetch,
+                              ordered=ordered)
+
     @property
     def authors(self):
         authors = []
@@ -465,30 +1270,42 @@ class Legislation(Base):
     def committees(self):
         committees = []
         for committee in self.json['Committees']['CommitteeListing']:
-            committees.append(Committee(committee_id=committee['Id'],
-                                        session=self.session,
-                                        verbose=self.verbose)
+            committees.append(_entity(Committee, committee['Id'],
+                                      session=self.session,
+                                      verbose=self.verbose,
+                                      data=committee)
                               )
         return committees
 
 class Committee(Base):
-    
+    _kind = 'Committee'
+    _record = records.CommitteeRecord
+    _details = ('code', 'name', 'type', 'description', 'staff', 'subcommittees', 'json')
+    _summary_fields = {
+        'code': ('Code',),
+        'name': ('Name',),
+        'type': ('Type',),
+    }
+
     def __init__(self,
                  committee_id,
                  session: Session,
-                 verbose: bool = False):
+                 verbose: bool = False,
+                 data = None):
         super().__init__(keyword='Committees',
                          verbose=verbose)
         self.id = committee_id
         self.session = session
         self._members = []
+        self._apply_summary(data)
 
-        self._make_committee()
+    def _hydrate(self, data):
+        self._make_committee(data=data)
 
-    def _make_committee(self):
-        if self.verbose:
-            print(f"Creating {self.__class__.__name__} {self.id}...")
-        data = self.client.service.GetCommitteeForSession(self.id, self.session.id)
+    def _make_committee(self, data = None):
+        self._log("Creating %s %s...")
+        if data is None:
+            data = self._call('GetCommitteeForSession', self.id, self.session.id)
         self.code = data['Code']
         self.name = data['Name']
         self.type = data['Type']
@@ -498,15 +1315,16 @@ class Committee(Base):
         self.json = data
 
     def __repr__(self):
-        return f"<{self.__class__.__name__}:{self.type}:{self.name}>"
+        return f"<{self.__class__.__name__}:{self.__dict__.get('type', '')}:{self.__dict__.get('name', self.id)}>"
 
     @property
     def members(self):
         if not self._members:
             for member in self.json['Members']['CommitteeMember']:
-                self._members.append(Member(member_id=member['Member']['Id'],
-                                            session=self.session,
-                                            verbose=self.verbose)
+                self._members.append(_entity(Member, member['Member']['Id'],
+                                             session=self.session,
+                                             verbose=self.verbose,
+                                             short_data=member['Member'])
                                      )
         return self._members
 
@@ -529,16 +1347,166 @@ class ScheduleDate:
     def __init__(self,
                  date_data):
         self._date = date_data['Date']
+        self._formatted = None
         self.number = date_data['Number']
         self.chamber = date_data['Branch']
 
     @property
     def date(self):
-        return self._date.strftime("%m-%d-%Y")
+        if self._formatted is None:
+            self._formatted = self._date.strftime("%m-%d-%Y")
+        return self._formatted
+
+    @property
+    def day(self):
+        return _calendar_day(self._date)
 
     def __repr__(self):
         return f"<{self.__class__.__name__}:{self.chamber}:{self.number}:{self.date}>"
 
+    def to_record(self):
+        return records.ScheduleDateRecord(date=self._date, number=self.number, chamber=self.chamber)
+
+
+def _calendar_day(value):
+    # datetime, date, ScheduleDate, or a '%m-%d-%Y' / ISO string -> date
+    if isinstance(value, ScheduleDate):
+        return value.day
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value, "%m-%d-%Y").date()
+        except ValueError:
+            return date.fromisoformat(value[:10])
+    raise TypeError(f"Expected a date, got {type(value).__name__}")
+
+class Calendar:
+    """
+    A chamber's legislative days in a session, sorted by date. Date lookups bisect the sorted days; votes
+    (Vote.datetime) and status changes (Legislation.statusHistory) are joined from entities already loaded,
+    never refetched: the identity map is re-read when it changed, and others can be passed to add_votes() /
+    add_legislation().
+    """
+    def __init__(self,
+                 chamber,
+                 schedules,
+                 session = None):
+        self.chamber = chamber
+        self.session = session
+        self.days = sorted((day for schedule in schedules for day in schedule.dates), key=lambda day: day.day)
+        self._dates = [day.day for day in self.days]
+        self._numbers = {}
+        for day in self.days:
+            self._numbers.setdefault(day.number, []).append(day)
+        self._votes = {}
+        self._changes = {}
+        self._vote_index = None
+        self._change_index = None
+        self._indexed_version = None
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.chamber}:{len(self.days)} days>"
+
+    def __len__(self):
+        return len(self.days)
+
+    def day(self, number: int, year: int = None):
+        """
+        Legislative day `number`; pass the year when the session numbers days again in its second year.
+        """
+        days = [day for day in self._numbers.get(number, []) if year is None or day.day.year == year]
+        if len(days) > 1:
+            raise ValueError(f"Legislative day {number} falls in {', '.join(str(day.day.year) for day in days)}; "
+                             f"pass year=")
+        return days[0] if days else None
+
+    def on(self, when):
+        """
+        The legislative day held on a calendar date, or None.
+        """
+        when = _calendar_day(when)
+        index = bisect.bisect_left(self._dates, when)
+        if index < len(self._dates) and self._dates[index] == when:
+            return self.days[index]
+        return None
+
+    def between(self, start, end):
+        """
+        Legislative days from start to end, both included.
+        """
+        return self.days[bisect.bisect_left(self._dates, _calendar_day(start)):
+                         bisect.bisect_right(self._dates, _calendar_day(end))]
+
+    def days_between(self, start, end):
+        return (bisect.bisect_right(self._dates, _calendar_day(end))
+                - bisect.bisect_left(self._dates, _calendar_day(start)))
+
+    def _resolve(self, day, year = None):
+        if isinstance(day, int):
+            found = self.day(day, year=year)
+            if found is None:
+                raise KeyError(f"No legislative day {day} in the {self.chamber} calendar")
+            return found.day
+        return _calendar_day(day)
+
+    def add_votes(self, votes):
+        for vote in votes:
+            when = vote.__dict__.get('datetime')
+            if when is not None and vote.__dict__.get('chamber', self.chamber) == self.chamber:
+                self._votes[vote.id] = (_calendar_day(when), vote)
+        self._vote_index = None
+
+    def add_legislation(self, legislation):
+        for legis in legislation:
+            if not legis.hydrated:
+                continue
+            history = _field(legis.statusHistory, 'StatusListing') or []
+            self._changes[legis.id] = [(_calendar_day(status['Date']), legis, status)
+                                       for status in history if _field(status, 'Date') is not None]
+        self._change_index = None
+
+    def refresh(self):
+        """
+        Re-read the session's votes and loaded legislation from the identity map.
+        """
+        if self.session is not None:
+            self.add_votes(self.session._known('Vote'))
+            self.add_legislation(self.session._known('Legislation'))
+            self._indexed_version = _entities_for(self.session).version
+
+    def _sync(self):
+        if self.session is not None and self._indexed_version != _entities_for(self.session).version:
+            self.refresh()
+
+    def _index(self, entries):
+        entries = sorted(entries, key=lambda entry: entry[0])
+        return [entry[0] for entry in entries], entries
+
+    def votes_on(self, day, year: int = None):
+        """
+        Votes taken on a legislative day (its number, a date or a ScheduleDate).
+        """
+        when = self._resolve(day, year=year)
+        self._sync()
+        if self._vote_index is None:
+            self._vote_index = self._index(self._votes.values())
+        dates, entries = self._vote_index
+        return [vote for _, vote in entries[bisect.bisect_left(dates, when):bisect.bisect_right(dates, when)]]
+
+    def status_changes_on(self, day, year: int = None):
+        """
+        (Legislation, status) pairs for every StatusHistory entry dated on a legislative day.
+        """
+        when = self._resolve(day, year=year)
+        self._sync()
+        if self._change_index is None:
+            self._change_index = self._index(change for changes in self._changes.values() for change in changes)
+        dates, entries = self._change_index
+        return [(legis, status)
+                for _, legis, status in entries[bisect.bisect_left(dates, when):bisect.bisect_right(dates, when)]]
 
 class Category:
     def __init__(self, category_data):
@@ -548,4 +1516,7 @@ class Category:
         self.parent = category_data['Parent']
 
     def __repr__(self):
-        return f"<{self.__class__.__name__}:{self.name}>"
\ No newline at end of file
+        return f"<{self.__class__.__name__}:{self.name}>"
+
+    def to_record(self):
+        return records.CategoryRecord(id=self.id, code=self.code, name=self.name, parent=self.parent)
\ No newline at end of file
@@ -0,0 +1,173 @@
+import sqlite3
+import threading
+
+from GGA import gga
+from GGA.records import LegislationRecord, Record
+
+_schema = """
+CREATE TABLE IF NOT EXISTS documents (
+    rowid INTEGER PRIMARY KEY,
+    legislation_id INTEGER NOT NULL,
+    session_id INTEGER,
+    document_type TEXT,
+    number INTEGER,
+    type TEXT,
+    status TEXT,
+    status_code TEXT,
+    UNIQUE (legislation_id, session_id)
+);
+CREATE INDEX IF NOT EXISTS documents_session ON documents (session_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS legislation_text USING fts5(caption, summary, footnotes, versions,
+                                                               tokenize = 'porter unicode61');
+"""
+
+# bm25() weights for caption, summary, footnotes and versions
+weights = (10.0, 4.0, 1.0, 2.0)
+
+
+class SearchHit(Record):
+    __slots__ = ('id', 'sessionId', 'documentType', 'number', 'type', 'status', 'caption', 'score', 'snippet')
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.documentType}:{self.number}:{self.score:.2f}>"
+
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def match_expression(query: str, phrase: bool = False):
+    """
+    FTS5 MATCH expression for plain text: every word must appear, or the exact phrase with phrase=True.
+    """
+    if phrase:
+        return _quote(' '.join(query.split()))
+    return ' '.join(_quote(term) for term in query.split())
+
+
+class LegislationIndex:
+    """
+    SQLite FTS5 index over legislation captions, summaries, footnotes and version titles, ranked with bm25.
+    With attach(), every Legislation hydrated anywhere in the process is (re)indexed as it loads.
+    path: database file, or ':memory:' (see save())
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(_schema)
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(documents)")]
+        if 'status_code' not in columns:
+            # Indexes written before status codes were stored; their bills match codes once re-indexed
+            self.connection.execute("ALTER TABLE documents ADD COLUMN status_code TEXT")
+        self.connection.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        self.detach()
+        with self._lock:
+            self.connection.close()
+
+    def attach(self):
+        gga.add_hydration_listener(self._on_hydrate)
+        return self
+
+    def detach(self):
+        gga.remove_hydration_listener(self._on_hydrate)
+
+    def _on_hydrate(self, entity):
+        if entity._kind == 'Legislation':
+            self.add(entity)
+
+    def add(self, legislation):
+        """
+        Index (or re-index) a hydrated Legislation or a LegislationRecord.
+        """
+        self.add_many([legislation])
+
+    def add_many(self, legislation):
+        rows = [item if isinstance(item, LegislationRecord) else item.to_record() for item in legislation]
+        with self._lock, self.connection:
+            for record in rows:
+                # Looked up with IS rather than relying on the UNIQUE constraint, which never matches a NULL session
+                row = self.connection.execute("SELECT rowid FROM documents WHERE legislation_id = ? "
+                                              "AND session_id IS ?", (record.id, record.sessionId)).fetchone()
+                if row is None:
+                    rowid = self.connection.execute("INSERT INTO documents (legislation_id, session_id, document_type, "
+                                                    "number, type, status, status_code) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                                    (record.id, record.sessionId, record.documentType, record.number,
+                                                     record.type, record.status, record.statusCode)).lastrowid
+                else:
+                    rowid = row[0]
+                    self.connection.execute("UPDATE documents SET document_type = ?, number = ?, type = ?, status = ?, "
+                                            "status_code = ? WHERE rowid = ?",
+                                            (record.documentType, record.number, record.type, record.status,
+                                             record.statusCode, rowid))
+                self.connection.execute("DELETE FROM legislation_text WHERE rowid = ?", (rowid,))
+                self.connection.execute("INSERT INTO legislation_text (rowid, caption, summary, footnotes, versions) "
+                                        "VALUES (?, ?, ?, ?, ?)",
+                                        (rowid, record.caption or '', record.summary or '', record.footnotes or '',
+                                         '\n'.join(version for version in record.versions if version)))
+
+    def remove(self, legislation_id, session_id = None):
+        with self._lock, self.connection:
+            row = self.connection.execute("SELECT rowid FROM documents WHERE legislation_id = ? AND session_id IS ?",
+                                          (legislation_id, session_id)).fetchone()
+            if row is not None:
+                self.connection.execute("DELETE FROM legislation_text WHERE rowid = ?", row)
+                self.connection.execute("DELETE FROM documents WHERE rowid = ?", row)
+
+    def search(self, query: str, session = None, type: str = None, status: str = None, document_type: str = None,
+               phrase: bool = False, raw: bool = False, limit: int = 20, offset: int = 0):
+        """
+        Best matches first.
+        query: words that must all appear, an exact phrase with phrase=True, or FTS5 query syntax with raw=True
+        session: Session or session id; type: e.g. 'Bill'; status: status description or code;
+        document_type: e.g. 'HB'
+        """
+        expression = query if raw else match_expression(query, phrase=phrase)
+        if not expression:
+            return []
+        conditions, parameters = ["legislation_text MATCH ?"], [expression]
+        session_id = getattr(session, 'id', session)
+        for column, value in (('session_id', session_id), ('type', type), ('document_type', document_type)):
+            if value is not None:
+                conditions.append(f"documents.{column} = ?")
+                parameters.append(value)
+        if status is not None:
+            conditions.append("(documents.status = ? OR documents.status_code = ?)")
+            parameters.extend([status, status])
+        sql = (f"SELECT documents.legislation_id, documents.session_id, documents.document_type, documents.number, "
+               f"documents.type, documents.status, legislation_text.caption, "
+               f"bm25(legislation_text, {', '.join(str(weight) for weight in weights)}) AS score, "
+               f"snippet(legislation_text, -1, '[', ']', '...', 12) "
+               f"FROM legislation_text JOIN documents ON documents.rowid = legislation_text.rowid "
+               f"WHERE {' AND '.join(conditions)} ORDER BY score LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self.connection.execute(sql, parameters + [limit, offset]).fetchall()
+        # bm25() is lower for better matches; flip it so higher scores rank first
+        return [SearchHit(id=row[0], sessionId=row[1], documentType=row[2], number=row[3], type=row[4],
+                          status=row[5], caption=row[6], score=-row[7], snippet=row[8])
+                for row in rows]
+
+    def optimize(self):
+        with self._lock, self.connection:
+            self.connection.execute("INSERT INTO legislation_text (legislation_text) VALUES ('optimize')")
+
+    def save(self, path: str):
+        """
+        Copy the index to a database file, e.g. to keep an in-memory index.
+        """
+        target = sqlite3.connect(path)
+        try:
+            with self._lock:
+                self.connection.backup(target)
+        finally:
+            target.close()
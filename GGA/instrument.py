@@ -0,0 +1,314 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger('GGA.calls')
+
+# Upper bounds of the latency (seconds) and response size (bytes) histogram buckets
+latency_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float('inf'))
+size_buckets = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, float('inf'))
+
+# Called with a CallEvent before each call is made and after it finished (see add_hooks)
+pre_hooks = []
+post_hooks = []
+
+# Event of the call in progress, so the transport can add payload sizes and cache hits to it
+current_event = contextvars.ContextVar('current_event', default=None)
+_traces = contextvars.ContextVar('traces', default=())
+
+
+class CallEvent:
+    """
+    One SOAP operation requested by the library.
+    source: 'service', or 'mirror' when a local mirror answered it
+    cached: the transport answered from the response cache
+    """
+    __slots__ = ('keyword', 'operation', 'args', 'session_id', 'source', 'started', 'duration', 'request_bytes',
+                 'response_bytes', 'cached', 'error', '_clock')
+
+    def __init__(self, keyword: str, operation: str, args = (), session_id = None, source: str = 'service'):
+        self.keyword = keyword
+        self.operation = operation
+        self.args = args
+        self.session_id = session_id
+        self.source = source
+        self.started = time.time()
+        self.duration = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.cached = False
+        self.error = None
+        self._clock = time.perf_counter()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.operation}{tuple(self.args)}:{self.source}>"
+
+
+def add_hooks(pre = None, post = None):
+    if pre is not None and pre not in pre_hooks:
+        pre_hooks.append(pre)
+    if post is not None and post not in post_hooks:
+        post_hooks.append(post)
+
+
+def remove_hooks(pre = None, post = None):
+    if pre in pre_hooks:
+        pre_hooks.remove(pre)
+    if post in post_hooks:
+        post_hooks.remove(post)
+
+
+def begin(keyword: str, operation: str, args = (), session_id = None, source: str = 'service'):
+    event = CallEvent(keyword, operation, args, session_id=session_id, source=source)
+    for hook in list(pre_hooks):
+        hook(event)
+    event.started = time.time()
+    event._clock = time.perf_counter()
+    return event
+
+
+def finish(event: CallEvent, error: Exception = None):
+    event.duration = time.perf_counter() - event._clock
+    event.error = error
+    metrics.observe(event)
+    for trace_ in _traces.get():
+        trace_.add(event)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s%s %s %.3fs %d bytes%s%s", event.operation, tuple(event.args), event.source, event.duration,
+                     event.response_bytes, ' cached' if event.cached else '', f" failed: {error!r}" if error else '')
+    for hook in list(post_hooks):
+        hook(event)
+
+
+def call(client, keyword: str, operation: str, *args, session_id = None):
+    """
+    Invoke operation on a zeep client, with hooks, metrics, traces and logging around it.
+    """
+    event = begin(keyword, operation, args, session_id=session_id)
+    token = current_event.set(event)
+    try:
+        result = getattr(client.service, operation)(*args)
+    except Exception as e:
+        current_event.reset(token)
+        finish(event, e)
+        raise
+    current_event.reset(token)
+    finish(event)
+    return result
+
+
+def record(keyword: str, operation: str, args = (), session_id = None, source: str = 'mirror'):
+    # A call answered without a request, e.g. by the local mirror
+    finish(begin(keyword, operation, args, session_id=session_id, source=source))
+
+
+def contextual(function):
+    """
+    Wrap function so each call runs in a copy of the caller's context (traces, session scope) -- for work handed
+    to executor threads.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(function, *args, **kwargs)
+
+    return run
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def cumulative(self):
+        total, buckets = 0, []
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+
+class OperationStats:
+    __slots__ = ('calls', 'errors', 'cached', 'request_bytes', 'response_bytes', 'latency', 'sizes')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cached = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.latency = Histogram(latency_buckets)
+        self.sizes = Histogram(size_buckets)
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'cached': self.cached,
+            'seconds': self.latency.sum,
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+        }
+
+
+class Metrics:
+    """
+    Per (operation, source) call counters, latency and response size histograms for the whole process.
+    """
+
+    def __init__(self):
+        self.operations = {}
+        self._lock = threading.Lock()
+
+    def observe(self, event: CallEvent):
+        with self._lock:
+            stats = self.operations.get((event.operation, event.source))
+            if stats is None:
+                stats = self.operations[(event.operation, event.source)] = OperationStats()
+            stats.calls += 1
+            stats.errors += event.error is not None
+            stats.cached += event.cached
+            stats.request_bytes += event.request_bytes
+            stats.response_bytes += event.response_bytes
+            stats.latency.observe(event.duration)
+            if event.source == 'service' and not event.cached:
+                stats.sizes.observe(event.response_bytes)
+
+    def reset(self):
+        with self._lock:
+            self.operations.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {f"{operation}:{source}": stats.to_dict()
+                    for (operation, source), stats in sorted(self.operations.items())}
+
+    def to_prometheus(self, prefix: str = 'gga'):
+        """
+        Prometheus text exposition format.
+        """
+        with self._lock:
+            items = sorted(self.operations.items())
+            lines = [f"# HELP {prefix}_calls_total SOAP operations requested",
+                     f"# TYPE {prefix}_calls_total counter"]
+            for (operation, source), stats in items:
+                lines.append(f'{prefix}_calls_total{{operation="{operation}",source="{source}"}} {stats.calls}')
+            lines += [f"# HELP {prefix}_call_errors_total SOAP operations that raised",
+                      f"# TYPE {prefix}_call_errors_total counter"]
+            for (operation, source), stats in items:
+                lines.append(f'{prefix}_call_errors_total{{operation="{operation}",source="{source}"}} {stats.errors}')
+            lines += [f"# HELP {prefix}_cache_hits_total SOAP operations answered by the response cache",
+                      f"# TYPE {prefix}_cache_hits_total counter"]
+            for (operation, source), stats in items:
+                lines.append(f'{prefix}_cache_hits_total{{operation="{operation}",source="{source}"}} {stats.cached}')
+            for name, help_text, attribute in (('call_duration_seconds', 'SOAP operation latency', 'latency'),
+                                               ('response_bytes', 'SOAP response sizes', 'sizes')):
+                lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} histogram"]
+                for (operation, source), stats in items:
+                    histogram = getattr(stats, attribute)
+                    labels = f'operation="{operation}",source="{source}"'
+                    for bound, count in histogram.cumulative():
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f'{prefix}_{name}_bucket{{{labels},le="{le}"}} {count}')
+                    lines.append(f'{prefix}_{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{prefix}_{name}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+class Trace:
+    """
+    Calls made inside a `with trace():` block, including the ones made by worker threads it started.
+    """
+
+    def __init__(self):
+        self.events = []
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def add(self, event: CallEvent):
+        with self._lock:
+            self.events.append(event)
+            if event.source == 'service' and not event.cached:
+                self._requests += 1
+
+    def __len__(self):
+        return len(self.events)
+
+    @property
+    def operations(self):
+        return Counter(event.operation for event in self.events)
+
+    @property
+    def requests(self):
+        # Calls that actually reached the service
+        return self._requests
+
+    @property
+    def seconds(self):
+        return sum(event.duration for event in self.events)
+
+    @property
+    def response_bytes(self):
+        return sum(event.response_bytes for event in self.events)
+
+    def report(self):
+        lines = [f"{len(self.events)} calls, {self.requests} requests, {self.seconds:.3f}s, "
+                 f"{self.response_bytes} bytes"]
+        for operation, count in self.operations.most_common():
+            lines.append(f"  {operation}: {count}")
+        return '\n'.join(lines)
+
+
+@contextmanager
+def trace():
+    trace_ = Trace()
+    token = _traces.set(_traces.get() + (trace_,))
+    try:
+        yield trace_
+    finally:
+        _traces.reset(token)
+
+
+def install_opentelemetry(meter = None):
+    """
+    Mirror every call into OpenTelemetry instruments (gga.calls, gga.call.duration, gga.response.size).
+    Returns the hook, for remove_hooks(post=...).
+    """
+    if meter is None:
+        try:
+            from opentelemetry import metrics as otel_metrics
+        except ImportError:
+            raise RuntimeError("OpenTelemetry export requires `pip install opentelemetry-api`") from None
+        meter = otel_metrics.get_meter('GGA')
+    calls = meter.create_counter('gga.calls', unit='1', description='SOAP operations requested')
+    duration = meter.create_histogram('gga.call.duration', unit='s', description='SOAP operation latency')
+    size = meter.create_histogram('gga.response.size', unit='By', description='SOAP response sizes')
+
+    def hook(event):
+        attributes = {'operation': event.operation, 'source': event.source, 'cached': event.cached,
+                      'error': event.error is not None}
+        calls.add(1, attributes)
+        duration.record(event.duration, attributes)
+        if event.response_bytes:
+            size.record(event.response_bytes, attributes)
+
+    add_hooks(post=hook)
+    return hook
@@ -0,0 +1,384 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+
+from zeep import helpers
+
+from GGA import instrument
+from GGA.clients import get_client
+
+# Service keyword for each mirrored operation
+operations = {
+    'GetYears': 'Session',
+    'GetMembersBySession': 'Members',
+    'GetMember': 'Members',
+    'GetLegislationForSession': 'Legislation',
+    'GetLegislationDetail': 'Legislation',
+    'GetVotesForLegislation': 'Votes',
+    'GetVote': 'Votes',
+    'GetCommitteesBySession': 'Committees',
+    'GetCommitteeForSession': 'Committees',
+}
+
+_schema = """
+CREATE TABLE IF NOT EXISTS responses (
+    operation TEXT NOT NULL,
+    args TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (operation, args)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY, description TEXT, year INTEGER
+);
+CREATE TABLE IF NOT EXISTS members (
+    id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT, party TEXT, chamber TEXT, district INTEGER
+);
+CREATE TABLE IF NOT EXISTS session_members (
+    session_id INTEGER, member_id INTEGER, PRIMARY KEY (session_id, member_id)
+);
+CREATE TABLE IF NOT EXISTS legislation (
+    id INTEGER PRIMARY KEY, session_id INTEGER, document_type TEXT, number INTEGER, suffix TEXT,
+    caption TEXT, summary TEXT, status TEXT, status_date TEXT
+);
+CREATE TABLE IF NOT EXISTS sponsorships (
+    legislation_id INTEGER, member_id INTEGER, type TEXT, PRIMARY KEY (legislation_id, member_id)
+);
+CREATE TABLE IF NOT EXISTS votes (
+    id INTEGER PRIMARY KEY, legislation_id INTEGER, chamber TEXT, number INTEGER, date TEXT, caption TEXT,
+    yeas INTEGER, nays INTEGER, not_voting INTEGER, excused INTEGER
+);
+CREATE TABLE IF NOT EXISTS committees (
+    session_id INTEGER, id INTEGER, code TEXT, name TEXT, type TEXT, PRIMARY KEY (session_id, id)
+);
+CREATE INDEX IF NOT EXISTS legislation_session ON legislation (session_id);
+CREATE INDEX IF NOT EXISTS votes_legislation ON votes (legislation_id);
+CREATE INDEX IF NOT EXISTS sponsorships_member ON sponsorships (member_id);
+"""
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'__decimal__': str(value)}
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    raise TypeError(f"Cannot store {type(value).__name__} in the mirror")
+
+
+def _decode(value):
+    if '__datetime__' in value:
+        return datetime.fromisoformat(value['__datetime__'])
+    if '__date__' in value:
+        return date.fromisoformat(value['__date__'])
+    if '__decimal__' in value:
+        return Decimal(value['__decimal__'])
+    return value
+
+
+def dumps(data):
+    return json.dumps(helpers.serialize_object(data), default=_encode, separators=(',', ':'))
+
+
+def loads(text):
+    return json.loads(text, object_hook=_decode)
+
+
+def _digest(data):
+    return hashlib.sha256(dumps(data).encode('utf-8')).hexdigest()
+
+
+def _get(data, *keys):
+    for key in keys:
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return data
+
+
+def _listing(data, *keys):
+    # zeep returns None for empty arrays
+    return _get(data, *keys) or []
+
+
+def status_date(details):
+    """
+    Latest date in a GetLegislationDetail payload's StatusHistory, as an ISO string (or None).
+    """
+    dates = [_get(status, 'Date') for status in _listing(details, 'StatusHistory', 'StatusListing')]
+    dates = [d for d in dates if d is not None]
+    return max(dates).isoformat() if dates else None
+
+
+class SyncReport:
+    def __init__(self):
+        self.requests = 0
+        self.skipped = 0
+        self.errors = []
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.requests} requests:{self.skipped} skipped:{len(self.errors)} errors>"
+
+
+class Mirror:
+    """
+    Local SQLite copy of the service.
+
+    sync() mirrors sessions, members, legislation, votes and committees; later runs only fetch what changed.
+    max_age: in the open session, stored member, committee and bill details older than this many seconds are
+    refetched even when their listing entry didn't change (None: only when it changed)
+    Pass the mirror to GeneralAssembly(mirror=...) (or set gga.default_mirror) and the regular classes read from it,
+    falling back to the service for anything it doesn't hold. The projected tables (sessions, members, legislation,
+    sponsorships, votes, committees) can be queried directly with SQL.
+    """
+
+    def __init__(self, path: str, write_through: bool = False, max_workers: int = 8,
+                 max_age: float = 7 * 24 * 60 * 60):
+        self.path = path
+        # Store responses fetched live by the regular classes too
+        self.write_through = write_through
+        self.max_workers = max_workers
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(_schema)
+        self.connection.commit()
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def query(self, sql: str, parameters = ()):
+        with self._lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def lookup(self, operation: str, args = ()):
+        if operation not in operations:
+            return None
+        with self._lock:
+            row = self.connection.execute("SELECT payload FROM responses WHERE operation = ? AND args = ?",
+                                          (operation, json.dumps(list(args)))).fetchone()
+        return loads(row[0]) if row else None
+
+    def has(self, operation: str, args = ()):
+        with self._lock:
+            return self.connection.execute("SELECT 1 FROM responses WHERE operation = ? AND args = ?",
+                                           (operation, json.dumps(list(args)))).fetchone() is not None
+
+    def fetched_at(self, operation: str):
+        # When each stored response of operation was fetched, by args
+        with self._lock:
+            rows = self.connection.execute("SELECT args, fetched_at FROM responses WHERE operation = ?",
+                                           (operation,)).fetchall()
+        return {tuple(json.loads(args)): fetched_at for args, fetched_at in rows}
+
+    def store(self, operation: str, args, data):
+        if operation not in operations:
+            return
+        payload = dumps(data)
+        data = loads(payload)
+        with self._lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO responses (operation, args, payload, fetched_at) "
+                                    "VALUES (?, ?, ?, ?)",
+                                    (operation, json.dumps(list(args)), payload, time.time()))
+            self._project(operation, args, data)
+
+    def merge(self, path: str):
+        """
+        Copy every response stored in another mirror database into this one, e.g. the parts of GGA.backfill.
+        Returns the number of responses merged.
+        """
+        source = sqlite3.connect(path)
+        merged = 0
+        try:
+            rows = source.execute("SELECT operation, args, payload, fetched_at FROM responses")
+            with self._lock, self.connection:
+                for operation, args, payload, fetched_at in rows:
+                    self.connection.execute("INSERT OR REPLACE INTO responses (operation, args, payload, fetched_at) "
+                                            "VALUES (?, ?, ?, ?)", (operation, args, payload, fetched_at))
+                    self._project(operation, tuple(json.loads(args)), loads(payload))
+                    merged += 1
+        finally:
+            source.close()
+        return merged
+
+    def _project(self, operation, args, data):
+        execute = self.connection.execute
+        if operation == 'GetYears':
+            for year in data or []:
+                execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                        (_get(year, 'Session', 'Id'), _get(year, 'Session', 'Description'), _get(year, 'Number')))
+        elif operation == 'GetMembersBySession':
+            for member in data or []:
+                execute("INSERT OR IGNORE INTO session_members VALUES (?, ?)", (args[0], member['Id']))
+                execute("INSERT OR IGNORE INTO members (id, first_name, last_name) VALUES (?, ?, ?)",
+                        (member['Id'], _get(member, 'Name', 'First'), _get(member, 'Name', 'Last')))
+        elif operation == 'GetMember':
+            latest = _get(data, 'SessionsInService', 'LegislativeService', 0)
+            execute("INSERT OR REPLACE INTO members VALUES (?, ?, ?, ?, ?, ?)",
+                    (args[0], _get(data, 'Name', 'First'), _get(data, 'Name', 'Last'), _get(latest, 'Party'),
+                     _get(latest, 'District', 'Type'), _get(latest, 'District', 'Number')))
+        elif operation == 'GetLegislationForSession':
+            for legis in data or []:
+                execute("INSERT OR IGNORE INTO legislation (id, session_id) VALUES (?, ?)", (legis['Id'], args[0]))
+        elif operation == 'GetLegislationDetail':
+            legislation_id = args[0]
+            execute("INSERT INTO legislation (id, session_id) VALUES (?, ?) ON CONFLICT (id) DO NOTHING",
+                    (legislation_id, _get(data, 'Session', 'Id')))
+            execute("UPDATE legislation SET document_type = ?, number = ?, suffix = ?, caption = ?, summary = ?, "
+                    "status = ?, status_date = ? WHERE id = ?",
+                    (data['DocumentType'], data['Number'], data['Suffix'], data['Caption'], data['Summary'],
+                     _get(data, 'Status', 'Description') or _get(data, 'Status', 'Code'), status_date(data),
+                     legislation_id))
+            execute("DELETE FROM sponsorships WHERE legislation_id = ?", (legislation_id,))
+            for author in _listing(data, 'Authors', 'Sponsorship'):
+                execute("INSERT OR REPLACE INTO sponsorships VALUES (?, ?, ?)",
+                        (legislation_id, author['MemberId'], author['Type']))
+        elif operation == 'GetVotesForLegislation':
+            for vote in data or []:
+                execute("INSERT INTO votes (id, legislation_id) VALUES (?, ?) "
+                        "ON CONFLICT (id) DO UPDATE SET legislation_id = excluded.legislation_id",
+                        (vote['VoteId'], args[0]))
+        elif operation == 'GetVote':
+            execute("INSERT INTO votes (id) VALUES (?) ON CONFLICT (id) DO NOTHING", (args[0],))
+            execute("UPDATE votes SET chamber = ?, number = ?, date = ?, caption = ?, yeas = ?, nays = ?, "
+                    "not_voting = ?, excused = ? WHERE id = ?",
+                    (data['Branch'], data['Number'], data['Date'].isoformat() if data['Date'] else None,
+                     data['Caption'], data['Yeas'], data['Nays'], data['NotVoting'], data['Excused'], args[0]))
+        elif operation in ('GetCommitteesBySession', 'GetCommitteeForSession'):
+            session_id = args[0] if operation == 'GetCommitteesBySession' else args[1]
+            for committee in (data or []) if operation == 'GetCommitteesBySession' else [data]:
+                execute("INSERT OR REPLACE INTO committees VALUES (?, ?, ?, ?, ?)",
+                        (session_id, committee['Id'], _get(committee, 'Code'), _get(committee, 'Name'),
+                         _get(committee, 'Type')))
+
+    def _fetch(self, operation: str, *args):
+        return instrument.call(get_client(operations[operation]), operations[operation], operation, *args)
+
+    def _fetch_many(self, operation: str, arg_list, report: SyncReport):
+        # Fetch in parallel, store from this thread; failures are recorded and retried on the next sync
+        def fetch(args):
+            try:
+                return args, self._fetch(operation, *args), None
+            except Exception as e:
+                return args, None, e
+
+        stored = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for args, data, error in executor.map(instrument.contextual(fetch), arg_list):
+                report.requests += 1
+                if error is not None:
+                    report.errors.append((operation, args, error))
+                    continue
+                self.store(operation, args, data)
+                stored.append((args, data))
+        return stored
+
+    def _refresh(self, operation: str, args, report: SyncReport):
+        data = self._fetch(operation, *args)
+        report.requests += 1
+        self.store(operation, args, data)
+        return data
+
+    def sync(self, session_ids = None, refresh_closed: bool = False):
+        """
+        Mirror the given sessions (all of them by default). Only the most recent session is treated as open:
+        closed sessions never refetch bills, votes, members or committees already stored.
+        """
+        report = SyncReport()
+        years = self._refresh('GetYears', (), report)
+        ordered = sorted(years, key=lambda year: year['Number'], reverse=True)
+        current = ordered[0]['Session']['Id'] if ordered else None
+        for year in ordered:
+            session_id = year['Session']['Id']
+            if session_ids is None or session_id in session_ids:
+                self.sync_session(session_id,
+                                  closed=session_id != current and not refresh_closed,
+                                  report=report)
+        report.elapsed = time.monotonic() - report.started
+        return report
+
+    def _listing(self, operation: str, session_id, closed: bool, report: SyncReport):
+        # (previous entries by id, current entries): closed sessions reuse the stored listing
+        stored = self.lookup(operation, (session_id,))
+        if closed and stored is not None:
+            return {}, stored
+        return {entry['Id']: entry for entry in stored or []}, self._refresh(operation, (session_id,), report) or []
+
+    def _stale(self, operation: str, arg_list, entries, previous, closed: bool):
+        """
+        The args of arg_list (one per listing entry) whose details need fetching: those never stored and, in an
+        open session, those whose listing entry changed since the last sync or which are older than max_age.
+        """
+        fetched_at = self.fetched_at(operation)
+        expired = None if self.max_age is None else time.time() - self.max_age
+        return [args for args, entry in zip(arg_list, entries)
+                if args not in fetched_at
+                or not closed and (entry['Id'] not in previous
+                                   or _digest(previous[entry['Id']]) != _digest(entry)
+                                   or expired is not None and fetched_at[args] < expired)]
+
+    def _sync_details(self, operation: str, listing_operation: str, session_id, arg_list, entries, previous,
+                      closed: bool, report: SyncReport):
+        stale = self._stale(operation, arg_list, entries, previous, closed)
+        report.skipped += len(arg_list) - len(stale)
+        stored = self._fetch_many(operation, stale, report)
+        failed = {args[0] for args in stale} - {args[0] for args, data in stored}
+        if any(entry['Id'] in previous for entry in entries if entry['Id'] in failed):
+            # Failed entries go back to their previous version, so the next sync still sees them as changed
+            self.store(listing_operation, (session_id,),
+                       [previous.get(entry['Id'], entry) if entry['Id'] in failed else entry for entry in entries])
+        return stored
+
+    def sync_session(self, session_id, closed: bool = False, report: SyncReport = None):
+        """
+        Mirror one session. Closed sessions only fetch what isn't stored yet; in an open session, members,
+        committees and bills are refetched when new, when their listing entry changed or once older than max_age,
+        and only bills whose StatusHistory moved on get their vote list checked again.
+        """
+        report = report or SyncReport()
+        previous_bills, listing = self._listing('GetLegislationForSession', session_id, closed, report)
+        for operation, listing_operation in (('GetMember', 'GetMembersBySession'),
+                                             ('GetCommitteeForSession', 'GetCommitteesBySession')):
+            previous, entries = self._listing(listing_operation, session_id, closed, report)
+            arg_list = [(entry['Id'],) if operation == 'GetMember' else (entry['Id'], session_id)
+                        for entry in entries]
+            self._sync_details(operation, listing_operation, session_id, arg_list, entries, previous, closed, report)
+
+        # Latest StatusHistory date of each stored bill, from the projected table
+        known = dict(self.query("SELECT id, status_date FROM legislation WHERE session_id = ?", (session_id,)))
+        changed = []
+        for (legislation_id,), details in self._sync_details('GetLegislationDetail', 'GetLegislationForSession',
+                                                             session_id, [(legis['Id'],) for legis in listing],
+                                                             listing, previous_bills, closed, report):
+            if (not self.has('GetVotesForLegislation', (legislation_id,))
+                    or status_date(details) != known.get(legislation_id)):
+                changed.append((legislation_id,))
+            else:
+                report.skipped += 1
+
+        new_votes = []
+        for args, votes in self._fetch_many('GetVotesForLegislation', changed, report):
+            for vote in votes or []:
+                if not self.has('GetVote', (vote['VoteId'],)):
+                    new_votes.append((vote['VoteId'],))
+        self._fetch_many('GetVote', new_votes, report)
+        report.elapsed = time.monotonic() - report.started
+        return report
@@ -0,0 +1,207 @@
+import sys
+
+from zeep import helpers
+
+# Whether records keep the serialized service payload in `raw` unless told otherwise
+keep_raw = False
+
+
+def _get(data, *keys):
+    for key in keys:
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return data
+
+
+def _listing(data, *keys):
+    return _get(data, *keys) or []
+
+
+def _raw(data, keep):
+    keep = keep_raw if keep is None else keep
+    return helpers.serialize_object(data) if keep and data is not None else None
+
+
+class Record:
+    """
+    Compact, immutable-by-convention value object. Subclasses only declare __slots__, so instances carry no __dict__.
+    """
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values.get(name))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{getattr(self, 'id', '')}>"
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, name) == getattr(other, name)
+                                                 for name in self.__slots__)
+
+    def __hash__(self):
+        return hash((type(self), getattr(self, 'id', None)))
+
+    def to_dict(self):
+        values = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            values[name] = value.to_dict() if isinstance(value, Record) else value
+        return values
+
+
+class DistrictRecord(Record):
+    __slots__ = ('id', 'type', 'number', 'post', 'coverage')
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(id=data['Id'], type=data['Type'], number=data['Number'], post=data['Post'],
+                   coverage=data['Coverage'])
+
+
+class ContactRecord(Record):
+    __slots__ = ('address', 'city', 'state', 'zipCode', 'email', 'phoneNumber', 'faxNumber', 'cellNumber',
+                 'homeNumber')
+
+    @classmethod
+    def from_data(cls, data):
+        dist = data['DistrictAddress'] or {}
+        return cls(address=f"{_get(dist, 'Address1') or ''}{' ' + str(dist['Address2']) if _get(dist, 'Address2') else ''}",
+                   city=_get(dist, 'City'), state=_get(dist, 'State'), zipCode=_get(dist, 'Zip'),
+                   email=_get(dist, 'Email'), phoneNumber=_get(dist, 'Phone'), faxNumber=_get(dist, 'Fax'),
+                   cellNumber=data['CellPhone'], homeNumber=data['HomePhone'])
+
+
+class MemberRecord(Record):
+    __slots__ = ('id', 'sessionId', 'name', 'firstName', 'lastName', 'middleName', 'nickname', 'suffix', 'party',
+                 'chamber', 'title', 'legId', 'serviceId', 'district', 'contact', 'committeeIds', 'raw')
+
+    @classmethod
+    def from_data(cls, data, member_id = None, session_id = None, keep: bool = None):
+        latest = _get(data, 'SessionsInService', 'LegislativeService', 0)
+        name = data['Name']
+        return cls(id=member_id if member_id is not None else _get(data, 'Id'), sessionId=session_id,
+                   name=f"{name['First']} {name['Last']}", firstName=name['First'], lastName=name['Last'],
+                   middleName=name['Middle'], nickname=name['Nickname'], suffix=name['Suffix'],
+                   party=_get(latest, 'Party'), chamber=_get(latest, 'District', 'Type'),
+                   title=_get(latest, 'Title'), legId=_get(latest, 'LegId'), serviceId=_get(latest, 'ServiceId'),
+                   district=DistrictRecord.from_data(latest['District']) if _get(latest, 'District') else None,
+                   contact=ContactRecord.from_data(data),
+                   committeeIds=tuple(membership['Committee']['Id'] for membership in
+                                      _listing(latest, 'CommitteeMemberships', 'CommitteeMembership')),
+                   raw=_raw(data, keep))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.chamber}:{self.name}>"
+
+
+class LegislationRecord(Record):
+    __slots__ = ('id', 'sessionId', 'documentType', 'number', 'suffix', 'type', 'caption', 'summary', 'footnotes',
+                 'vetoNumber', 'status', 'statusCode', 'statusHistory', 'versions', 'authorIds', 'committeeIds', 'raw')
+
+    @classmethod
+    def from_data(cls, data, legislation_id = None, session_id = None, keep: bool = None):
+        return cls(id=legislation_id if legislation_id is not None else _get(data, 'Id'), sessionId=session_id,
+                   documentType=data['DocumentType'], number=data['Number'], suffix=data['Suffix'],
+                   type=data['LegislationType'], caption=data['Caption'], summary=data['Summary'],
+                   footnotes=data['Footnotes'], vetoNumber=data['ActVetoNumber'],
+                   status=_get(data, 'Status', 'Description') or _get(data, 'Status', 'Code'),
+                   statusCode=_get(data, 'Status', 'Code'),
+                   # (code, date, description) per status change
+                   statusHistory=tuple((_get(status, 'Code'), _get(status, 'Date'), _get(status, 'Description'))
+                                       for status in _listing(data, 'StatusHistory', 'StatusListing')),
+                   versions=tuple(_get(version, 'Description')
+                                  for version in _listing(data, 'Versions', 'DocumentDescription')),
+                   authorIds=tuple(author['MemberId'] for author in _listing(data, 'Authors', 'Sponsorship')),
+                   committeeIds=tuple(committee['Id'] for committee in
+                                      _listing(data, 'Committees', 'CommitteeListing')),
+                   raw=_raw(data, keep))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.documentType}:{self.number}>"
+
+
+class VoteCountRecord(Record):
+    __slots__ = ('yays', 'nays', 'noVotes', 'excused')
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(yays=data['Yeas'], nays=data['Nays'], noVotes=data['NotVoting'], excused=data['Excused'])
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.yays}-{self.nays}>"
+
+
+class VoteRecord(Record):
+    __slots__ = ('id', 'sessionId', 'legislationId', 'chamber', 'number', 'datetime', 'day', 'time', 'result',
+                 'count', 'raw')
+
+    @classmethod
+    def from_data(cls, data, vote_id = None, session_id = None, legislation_id = None, keep: bool = None):
+        return cls(id=vote_id if vote_id is not None else _get(data, 'VoteId'), sessionId=session_id,
+                   legislationId=legislation_id, chamber=data['Branch'], number=data['Number'],
+                   datetime=data['Date'], day=data['Day'], time=data['Time'], result=data['Caption'],
+                   count=VoteCountRecord.from_data(data), raw=_raw(data, keep))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.chamber}:{self.number}>"
+
+
+class CommitteeRecord(Record):
+    __slots__ = ('id', 'sessionId', 'code', 'name', 'type', 'description', 'memberIds', 'raw')
+
+    @classmethod
+    def from_data(cls, data, committee_id = None, session_id = None, keep: bool = None):
+        return cls(id=committee_id if committee_id is not None else _get(data, 'Id'), sessionId=session_id,
+                   code=data['Code'], name=data['Name'], type=data['Type'], description=data['Description'],
+                   memberIds=tuple(member['Member']['Id'] for member in _listing(data, 'Members', 'CommitteeMember')),
+                   raw=_raw(data, keep))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.type}:{self.name}>"
+
+
+class ScheduleDateRecord(Record):
+    __slots__ = ('date', 'number', 'chamber')
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(date=data['Date'], number=data['Number'], chamber=data['Branch'])
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.chamber}:{self.number}:{self.date:%m-%d-%Y}>"
+
+
+class CategoryRecord(Record):
+    __slots__ = ('id', 'code', 'name', 'parent')
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(id=data['Id'], code=data['Code'], name=data['Name'], parent=data['Parent'])
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.name}>"
+
+
+def footprint(obj, _seen = None):
+    """
+    Approximate deep size in bytes of obj (containers, __dict__ and __slots__ included, classes and modules not).
+    """
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen or isinstance(obj, type) or type(obj).__name__ == 'module':
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(footprint(key, seen) + footprint(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(footprint(item, seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        size += footprint(vars(obj), seen)
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if hasattr(obj, name) and not name.startswith('__'):
+                size += footprint(getattr(obj, name), seen)
+    return size
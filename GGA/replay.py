@@ -0,0 +1,104 @@
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import Counter
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from GGA import clients
+from GGA.clients import _snapshot_filename
+from GGA.transport import GGATransport, operation_name
+
+
+class ReplayMiss(LookupError):
+    """
+    Raised in replay mode for a request that has no recorded fixture.
+    """
+
+
+class ReplaySession(requests.Session):
+    """
+    requests.Session that records every response (WSDL/XSD downloads and SOAP calls) to fixture files, or serves
+    them back from those files without touching the network.
+    directory: fixture directory, with wsdl/ and responses/ inside
+    mode: 'record' (go to the network and save) or 'replay'
+    latency: seconds added to every replayed request; jitter: +/- fraction of it drawn uniformly
+    """
+
+    def __init__(self, directory: str, mode: str = 'replay', latency: float = 0.0, jitter: float = 0.0):
+        super().__init__()
+        if mode not in ('record', 'replay'):
+            raise ValueError("mode must be 'record' or 'replay'")
+        self.directory = directory
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        # Requests made through this session, by SOAP operation ('wsdl' for document downloads)
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'wsdl'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'responses'), exist_ok=True)
+
+    @staticmethod
+    def _fixture_name(method, url, body, headers):
+        if method.upper() == 'GET':
+            return os.path.join('wsdl', _snapshot_filename(url))
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        digest = hashlib.sha256(url.encode('utf-8') + (body or b'')).hexdigest()[:24]
+        return os.path.join('responses', f"{operation_name(headers, None) or 'unknown'}-{digest}.xml")
+
+    def request(self, method, url, data = None, headers = None, **kwargs):
+        name = self._fixture_name(method, url, data, headers)
+        with self._lock:
+            self.requests['wsdl' if method.upper() == 'GET' else operation_name(headers, None) or 'unknown'] += 1
+        path = os.path.join(self.directory, name)
+        if self.mode == 'record':
+            response = super().request(method, url, data=data, headers=headers, **kwargs)
+            # Faults are kept too, with their status code next to the body
+            with open(path, 'wb') as f:
+                f.write(response.content)
+            if response.status_code != 200:
+                with open(f"{path}.status", 'w') as f:
+                    f.write(str(response.status_code))
+            return response
+        if self.latency:
+            time.sleep(max(0.0, self.latency * (1 + random.uniform(-self.jitter, self.jitter))))
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            raise ReplayMiss(f"No fixture for {method} {url} ({name}); record it first") from None
+        status_code = 200
+        if os.path.exists(f"{path}.status"):
+            with open(f"{path}.status") as f:
+                status_code = int(f.read())
+        response = requests.Response()
+        response._content = content
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict({'Content-Type': 'text/xml; charset=utf-8'})
+        response.encoding = 'utf-8'
+        response.url = url
+        return response
+
+    @property
+    def total_requests(self):
+        return sum(self.requests.values())
+
+
+def install(directory: str, mode: str = 'replay', latency: float = 0.0, jitter: float = 0.0):
+    """
+    Route every service through a ReplaySession on directory; the response cache and transport policy configured
+    in GGA.clients still apply. Returns the session, whose `requests` counts what went through it.
+    clients.use_transport(None) undoes it.
+    """
+    session = ReplaySession(directory, mode=mode, latency=latency, jitter=jitter)
+    # No WSDL cache, so documents are recorded and replayed like any other request
+    clients.use_transport(GGATransport(cache=None,
+                                       session=session,
+                                       response_cache=clients.response_cache,
+                                       policy=clients.transport_policy))
+    return session
@@ -0,0 +1,304 @@
+import csv
+from concurrent.futures import ThreadPoolExecutor
+
+from GGA import instrument
+from GGA.gga import Vote, _field, _iter_hydrated, _stream_entity, batch_workers
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Matrix codes; ABSENT means the member has no position recorded on that roll call (e.g. the other chamber)
+ABSENT = 0
+YEA = 1
+NAY = -1
+NOT_VOTING = 2
+EXCUSED = 3
+
+labels = {ABSENT: None, YEA: 'Yea', NAY: 'Nay', NOT_VOTING: 'NotVoting', EXCUSED: 'Excused'}
+
+_codes = {
+    'yea': YEA, 'yes': YEA, 'aye': YEA, 'y': YEA,
+    'nay': NAY, 'no': NAY, 'n': NAY,
+    'notvoting': NOT_VOTING, 'nv': NOT_VOTING,
+    'excused': EXCUSED, 'e': EXCUSED,
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Roll-call matrices require numpy, e.g. `pip install GGA[rollcall]`")
+
+
+def _require_arrow():
+    if pa is None:
+        raise RuntimeError("Arrow and Parquet export require pyarrow, e.g. `pip install GGA[arrow]`")
+
+
+def position_code(value):
+    return _codes.get(''.join(str(value or '').split()).replace('_', '').casefold(), ABSENT)
+
+
+def member_votes(vote_data):
+    """
+    (member id, position code) for every member listed on a GetVote payload.
+    """
+    listing = _field(vote_data, 'Votes')
+    if isinstance(listing, dict):
+        # The listing is wrapped in a single array element, whatever its name
+        listing = next((value for value in listing.values() if isinstance(value, list)), [])
+    positions = []
+    for entry in listing or []:
+        member_id = _field(entry, 'Member', 'Id')
+        if member_id is None:
+            member_id = _field(entry, 'MemberId')
+        position = _field(entry, 'MemberVoted')
+        if position is None:
+            position = _field(entry, 'Vote')
+        if member_id is not None:
+            positions.append((member_id, position_code(position)))
+    return positions
+
+
+def _vote_stubs(legislation, session):
+    return [_stream_entity(Vote, vote['VoteId'],
+                           session=session,
+                           legislation=legislation,
+                           verbose=legislation.verbose,
+                           data=vote)
+            for vote in legislation._call('GetVotesForLegislation', legislation.id, keyword='Votes')]
+
+
+def _member_parties(session, prefetch: int = None):
+    # Member summaries of session, with 'Party' read from the GetMember detail where the summary has none
+    summaries = session._members_summary()
+    missing = {summary['Id'] for summary in summaries if _field(summary, 'Party') is None}
+    if not missing:
+        return summaries
+    stubs = [member for member in session.all_members if member.id in missing]
+    parties = {member.id: member.party for member in _iter_hydrated(stubs, prefetch=prefetch)}
+    return [{'Id': summary['Id'], 'Party': parties[summary['Id']]} if summary['Id'] in missing else summary
+            for summary in summaries]
+
+
+class RollCall:
+    """
+    Member x roll-call matrix for a session. `matrix[i, j]` is the int8 position code (YEA, NAY, NOT_VOTING,
+    EXCUSED or ABSENT) of member `member_ids[i]` on vote `vote_ids[j]`.
+    """
+
+    def __init__(self, matrix, member_ids, vote_ids, legislation_ids = None, chambers = None, dates = None,
+                 parties = None):
+        _require_numpy()
+        self.matrix = np.asarray(matrix, dtype=np.int8)
+        self.member_ids = np.asarray(member_ids, dtype=np.int64)
+        self.vote_ids = np.asarray(vote_ids, dtype=np.int64)
+        members, votes = self.matrix.shape
+        self.legislation_ids = (np.asarray(legislation_ids, dtype=np.int64) if legislation_ids is not None
+                                else np.full(votes, -1, dtype=np.int64))
+        self.chambers = np.asarray(chambers if chambers is not None else [None] * votes, dtype=object)
+        self.dates = np.asarray(dates if dates is not None else [None] * votes, dtype='datetime64[s]')
+        self.parties = np.asarray(parties if parties is not None else [None] * members, dtype=object)
+        self._member_rows = None
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{len(self.member_ids)}x{len(self.vote_ids)}>"
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    @classmethod
+    def build(cls, session, chamber: str = None, max_workers: int = None, prefetch: int = None):
+        """
+        Fetch every roll call of `session` (GetVotesForLegislation per bill, then GetVote per roll call) and
+        build the matrix. Vote payloads are parsed as they stream in and aren't retained. Parties come from the
+        session's member summaries, or from GetMember for members whose summary has none.
+        chamber: keep only 'House' or 'Senate' roll calls
+        """
+        _require_numpy()
+        with ThreadPoolExecutor(max_workers=max_workers or batch_workers) as executor:
+            listings = list(executor.map(instrument.contextual(lambda legislation: _vote_stubs(legislation, session)),
+                                         session.legislation))
+        stubs = [vote for votes in listings for vote in votes
+                 if chamber is None or vote.__dict__.get('chamber') in (None, chamber)]
+        return cls.from_votes(_iter_hydrated(stubs, prefetch=prefetch),
+                              members=_member_parties(session, prefetch=prefetch),
+                              chamber=chamber)
+
+    @classmethod
+    def from_votes(cls, votes, members = None, chamber: str = None):
+        """
+        Build the matrix from hydrated Vote objects (or raw GetVote payloads).
+        members: member summaries (dicts with 'Id' and optionally 'Party') fixing the row order and parties;
+        members only seen on roll calls are appended after them.
+        """
+        _require_numpy()
+        rows, parties = {}, []
+        for member in members or []:
+            rows.setdefault(member['Id'], len(rows))
+            parties.append(_field(member, 'Party'))
+        columns, vote_ids, legislation_ids, chambers, dates = [], [], [], [], []
+        for vote in votes:
+            data = vote if isinstance(vote, dict) else vote.json
+            if chamber is not None and data['Branch'] != chamber:
+                continue
+            positions = member_votes(data)
+            for member_id, _ in positions:
+                if member_id not in rows:
+                    rows[member_id] = len(rows)
+                    parties.append(None)
+            columns.append((np.fromiter((rows[member_id] for member_id, _ in positions), dtype=np.int64,
+                                        count=len(positions)),
+                            np.fromiter((code for _, code in positions), dtype=np.int8, count=len(positions))))
+            vote_ids.append(data['VoteId'] if isinstance(vote, dict) else vote.id)
+            legislation = None if isinstance(vote, dict) else vote._legislation
+            legislation_ids.append(legislation.id if legislation is not None else -1)
+            chambers.append(data['Branch'])
+            dates.append(data['Date'])
+        matrix = np.zeros((len(rows), len(columns)), dtype=np.int8)
+        for column, (member_rows, codes) in enumerate(columns):
+            matrix[member_rows, column] = codes
+        return cls(matrix, member_ids=list(rows), vote_ids=vote_ids, legislation_ids=legislation_ids,
+                   chambers=chambers, dates=dates, parties=parties)
+
+    def member_row(self, member_id):
+        if self._member_rows is None:
+            self._member_rows = {member_id: row for row, member_id in enumerate(self.member_ids.tolist())}
+        return self.matrix[self._member_rows[member_id]]
+
+    def attendance(self):
+        """
+        Per member, the share of their recorded roll calls where they voted yea or nay (NaN with none recorded).
+        """
+        recorded = np.count_nonzero(self.matrix != ABSENT, axis=1)
+        voted = np.count_nonzero((self.matrix == YEA) | (self.matrix == NAY), axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(recorded > 0, voted / recorded, np.nan)
+
+    def agreement(self):
+        """
+        Member x member share of roll calls where both voted yea/nay and voted the same way (NaN with no overlap).
+        """
+        yea = (self.matrix == YEA).astype(np.float32)
+        nay = (self.matrix == NAY).astype(np.float32)
+        both = yea + nay
+        shared = both @ both.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(shared > 0, (yea @ yea.T + nay @ nay.T) / shared, np.nan)
+
+    def party_positions(self):
+        """
+        (parties, positions): for each party, its majority position per roll call (YEA, NAY, or ABSENT on a tie).
+        """
+        cast = np.where((self.matrix == YEA) | (self.matrix == NAY), self.matrix, 0).astype(np.int32)
+        parties = sorted({party for party in self.parties.tolist() if party is not None})
+        positions = np.zeros((len(parties), self.matrix.shape[1]), dtype=np.int8)
+        for index, party in enumerate(parties):
+            positions[index] = np.sign(cast[self.parties == party].sum(axis=0))
+        return parties, positions
+
+    def party_line_votes(self):
+        """
+        Boolean mask of roll calls where the majorities of at least two parties voted against each other.
+        """
+        _, positions = self.party_positions()
+        return (positions == YEA).any(axis=0) & (positions == NAY).any(axis=0)
+
+    def party_line_scores(self, party_line_only: bool = False):
+        """
+        Per member, the share of their yea/nay votes cast with their party's majority (NaN without a party or votes).
+        party_line_only: only count roll calls where party majorities opposed each other
+        """
+        parties, positions = self.party_positions()
+        party_rows = {party: index for index, party in enumerate(parties)}
+        has_party = np.array([party in party_rows for party in self.parties.tolist()], dtype=bool)
+        expected = np.zeros_like(self.matrix)
+        if has_party.any():
+            expected[has_party] = positions[[party_rows[party] for party in self.parties[has_party].tolist()]]
+        counted = ((self.matrix == YEA) | (self.matrix == NAY)) & (expected != ABSENT)
+        if party_line_only:
+            counted &= self.party_line_votes()
+        agreed = np.count_nonzero(counted & (self.matrix == expected), axis=1)
+        total = np.count_nonzero(counted, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(total > 0, agreed / total, np.nan)
+
+    def iter_chunks(self, chunk_size: int = 256):
+        """
+        Yield the matrix in long form (one row per recorded member position), `chunk_size` roll calls at a time,
+        as dicts of equal-length column arrays.
+        """
+        for start in range(0, len(self.vote_ids), chunk_size):
+            block = self.matrix[:, start:start + chunk_size]
+            member_rows, columns = np.nonzero(block.T != ABSENT)[::-1]
+            columns += start
+            yield {
+                'vote_id': self.vote_ids[columns],
+                'legislation_id': self.legislation_ids[columns],
+                'chamber': self.chambers[columns],
+                'date': self.dates[columns],
+                'member_id': self.member_ids[member_rows],
+                'party': self.parties[member_rows],
+                'position': self.matrix[member_rows, columns],
+            }
+
+    def to_csv(self, path, chunk_size: int = 256):
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['vote_id', 'legislation_id', 'chamber', 'date', 'member_id', 'party', 'position'])
+            for chunk in self.iter_chunks(chunk_size):
+                writer.writerows(zip(chunk['vote_id'].tolist(), chunk['legislation_id'].tolist(),
+                                     chunk['chamber'].tolist(), chunk['date'].tolist(), chunk['member_id'].tolist(),
+                                     chunk['party'].tolist(), [labels[code] for code in chunk['position'].tolist()]))
+
+    def _record_batches(self, chunk_size):
+        schema = self._schema()
+        # Chunks never hold ABSENT, so the dictionary only needs the cast positions
+        cast = (YEA, NAY, NOT_VOTING, EXCUSED)
+        position_labels = pa.array([labels[code] for code in cast], pa.string())
+        lookup = np.zeros(256, dtype=np.int8)
+        for index, code in enumerate(cast):
+            lookup[code % 256] = index
+        for chunk in self.iter_chunks(chunk_size):
+            yield pa.record_batch([
+                pa.array(chunk['vote_id']),
+                pa.array(chunk['legislation_id']),
+                pa.array(chunk['chamber'], pa.string()).dictionary_encode(),
+                pa.array(chunk['date'], pa.timestamp('s')),
+                pa.array(chunk['member_id']),
+                pa.array(chunk['party'], pa.string()).dictionary_encode(),
+                pa.DictionaryArray.from_arrays(pa.array(lookup[chunk['position'].astype(np.uint8)]), position_labels),
+            ], schema=schema)
+
+    def _schema(self):
+        _require_arrow()
+        return pa.schema([('vote_id', pa.int64()), ('legislation_id', pa.int64()),
+                          ('chamber', pa.dictionary(pa.int32(), pa.string())), ('date', pa.timestamp('s')),
+                          ('member_id', pa.int64()), ('party', pa.dictionary(pa.int32(), pa.string())),
+                          ('position', pa.dictionary(pa.int8(), pa.string()))])
+
+    def to_arrow(self, path, chunk_size: int = 256):
+        # Arrow IPC file, one record batch per chunk
+        _require_arrow()
+        with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, self._schema()) as writer:
+            for batch in self._record_batches(chunk_size):
+                writer.write_batch(batch)
+
+    def to_parquet(self, path, chunk_size: int = 256):
+        # One row group per chunk
+        _require_arrow()
+        with pq.ParquetWriter(str(path), self._schema()) as writer:
+            for batch in self._record_batches(chunk_size):
+                writer.write_batch(batch)
+
+
+def build(session, chamber: str = None, max_workers: int = None, prefetch: int = None):
+    return RollCall.build(session, chamber=chamber, max_workers=max_workers, prefetch=prefetch)
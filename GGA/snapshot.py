@@ -0,0 +1,200 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from zeep import helpers
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+magic = b'GGASNAP\x01'
+version = 1
+
+# msgpack extension type codes
+_DATETIME, _DATE, _DECIMAL = 1, 2, 3
+
+# Identity map kind -> detail operation and the arguments it is called with
+_details = {
+    'Member': ('GetMember', lambda entity: (entity.id,)),
+    'Legislation': ('GetLegislationDetail', lambda entity: (entity.id,)),
+    'Vote': ('GetVote', lambda entity: (entity.id,)),
+    'Committee': ('GetCommitteeForSession', lambda entity: (entity.id, entity.session.id)),
+}
+
+# Session.get_chamber_members() argument for each chamber
+_member_types = {'House': 'Representative', 'Senate': 'Senator'}
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise RuntimeError("Snapshots require msgpack, e.g. `pip install GGA[snapshot]`")
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_DATETIME, value.isoformat().encode('ascii'))
+    if isinstance(value, date):
+        return msgpack.ExtType(_DATE, value.isoformat().encode('ascii'))
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_DECIMAL, str(value).encode('ascii'))
+    raise TypeError(f"Cannot store {type(value).__name__} in a snapshot")
+
+
+def _decode(code, data):
+    if code == _DATETIME:
+        return datetime.fromisoformat(data.decode('ascii'))
+    if code == _DATE:
+        return date.fromisoformat(data.decode('ascii'))
+    if code == _DECIMAL:
+        return Decimal(data.decode('ascii'))
+    return msgpack.ExtType(code, data)
+
+
+def _key(args):
+    return json.dumps(list(args))
+
+
+def collect(assembly):
+    """
+    Every service payload the assembly's graph was built from, as {operation: {args: payload}}: the session
+    list, each session's member, committee and bill listings, bill vote listings, and the details of every
+    hydrated entity in the identity map.
+    """
+    sections = {}
+
+    def add(operation, args, data):
+        if data is not None:
+            sections.setdefault(operation, {})[tuple(args)] = data
+
+    add('GetYears', (), assembly._years)
+    for session in assembly._sessions or []:
+        for chamber, members in session._member_summaries.items():
+            if chamber is None:
+                add('GetMembersBySession', (session.id,), members)
+            else:
+                add('GetMembersByTypeAndSession', (_member_types[chamber], session.id), members)
+        add('GetCommitteesBySession', (session.id,), session._committee_summaries)
+        add('GetLegislationForSession', (session.id,), session._legislation_summaries)
+    for entity in assembly.entities.values():
+        if entity._kind == 'Legislation':
+            add('GetVotesForLegislation', (entity.id,), entity.__dict__.get('_vote_summaries'))
+        if entity.hydrated and entity._kind in _details:
+            operation, args = _details[entity._kind]
+            add(operation, args(entity), entity.json)
+    return sections
+
+
+def save(assembly, path: str):
+    """
+    Write the assembly's graph (see collect()) to path, atomically. Returns the number of payloads written.
+    Layout: magic, header length, msgpack header {operation: [index offset, index length]}, then per operation
+    an index {args: [offset, length]} and the payloads, each packed on its own so they load one at a time.
+    """
+    _require_msgpack()
+    blobs, header, offset, count = [], {}, 0, 0
+    for operation, payloads in sorted(collect(assembly).items()):
+        index = {}
+        for args, data in payloads.items():
+            blob = msgpack.packb(helpers.serialize_object(data), default=_encode, use_bin_type=True)
+            index[_key(args)] = [offset, len(blob)]
+            blobs.append(blob)
+            offset += len(blob)
+            count += 1
+        blob = msgpack.packb(index, use_bin_type=True)
+        header[operation] = [offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+    header = msgpack.packb({'version': version, 'created': time.time(), 'sections': header}, use_bin_type=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(magic)
+        f.write(struct.pack('>I', len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return count
+
+
+class Snapshot:
+    """
+    Read side of a snapshot file, answering service calls like a GGA.mirror.Mirror: pass it as
+    GeneralAssembly(mirror=...) (GeneralAssembly.load_snapshot() does) and the graph is rebuilt from the file,
+    falling back to the service for anything it doesn't hold. The file is memory-mapped; an operation's index is
+    read the first time that operation is looked up, and each payload when it is asked for.
+    """
+
+    # Calls answered by the service are not written back to the file
+    write_through = False
+
+    def __init__(self, path: str):
+        _require_msgpack()
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map[:len(magic)] != magic:
+                raise ValueError(f"{path} is not a GGA snapshot")
+            start = len(magic) + 4
+            length, = struct.unpack('>I', self._map[len(magic):start])
+            header = msgpack.unpackb(self._map[start:start + length], raw=False)
+        except Exception:
+            self._file.close()
+            raise
+        self.created = header['created']
+        self._base = start + length
+        self._sections = header['sections']
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.path}>"
+
+    def close(self):
+        with self._lock:
+            self._map.close()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def operations(self):
+        return sorted(self._sections)
+
+    def _read(self, offset, length):
+        start = self._base + offset
+        return self._map[start:start + length]
+
+    def _index(self, operation: str):
+        index = self._indexes.get(operation)
+        if index is None and operation in self._sections:
+            with self._lock:
+                index = self._indexes.get(operation)
+                if index is None:
+                    index = self._indexes[operation] = msgpack.unpackb(self._read(*self._sections[operation]),
+                                                                       raw=False)
+        return index
+
+    def has(self, operation: str, args = ()):
+        index = self._index(operation)
+        return index is not None and _key(args) in index
+
+    def lookup(self, operation: str, args = ()):
+        index = self._index(operation)
+        entry = index.get(_key(args)) if index is not None else None
+        if entry is None:
+            return None
+        return msgpack.unpackb(self._read(*entry), raw=False, ext_hook=_decode, strict_map_key=False)
@@ -0,0 +1,332 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from lxml import etree
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from zeep.transports import Transport
+from zeep.wsdl.utils import etree_to_string
+
+from GGA.cache import current_session, require_fresh
+from GGA.instrument import begin, current_event, finish
+
+# Response headers kept with cached responses
+_cached_headers = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def operation_name(headers, envelope):
+    # SOAP 1.1 names the operation in SOAPAction, otherwise use the body's first element
+    action = (headers or {}).get('SOAPAction', '').strip('"')
+    if action:
+        return action.rsplit('/', 1)[-1]
+    body = envelope.find('{*}Body') if envelope is not None else None
+    if body is not None and len(body):
+        return etree.QName(body[0]).localname
+    return ''
+
+
+def service_keyword(address):
+    # Service of an endpoint address, e.g. 'Members' for .../GGAServices/Members/Service.svc
+    parts = [part for part in urlparse(address).path.split('/') if part]
+    if len(parts) > 1 and parts[-1].lower().endswith('.svc'):
+        return parts[-2]
+    return parts[-1] if parts else ''
+
+
+def is_fault(response):
+    # SOAP faults come back as HTTP 500: the service answered, retrying the same request gets the same fault
+    if response.status_code != 500 or not response.content:
+        return False
+    try:
+        envelope = etree.fromstring(response.content)
+    except etree.XMLSyntaxError:
+        return False
+    return envelope.find('{*}Body/{*}Fault') is not None
+
+
+def _cached_response(entry, address):
+    response = Response()
+    response._content = entry.content
+    response.status_code = entry.status_code
+    response.headers = CaseInsensitiveDict(entry.headers)
+    response.encoding = 'utf-8'
+    response.url = address
+    return response
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Raised instead of making a request while the host's circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects requests for `reset_timeout` seconds, then
+    lets a single trial request through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 10, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'open' if time.monotonic() - self.opened_at < self.reset_timeout else 'half-open'
+
+    def before_request(self, host: str = None):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial:
+                raise CircuitOpenError(f"Circuit open for {host or 'host'} after {self.failures} consecutive failures")
+            self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+            self._trial = False
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread: at most `rate` request starts per second, with bursts of `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class TransportPolicy:
+    """
+    Timeouts, retries and throttling applied by GGATransport to every SOAP call (see clients.configure_transport_policy).
+    connect_timeout, read_timeout: seconds
+    retries: extra attempts for idempotent operations after a timeout, connection error or retry_statuses response
+    (except SOAP faults, which are returned at once and don't count against the circuit breaker)
+    backoff, backoff_max: exponential backoff base and cap in seconds; the sleep is drawn uniformly below it (jitter)
+    failure_threshold, reset_timeout: per-host circuit breaker settings (failure_threshold=0 disables it)
+    rate_limit, burst: requests per second across all hosts and threads (None for no limit)
+    """
+
+    retry_statuses = (429, 500, 502, 503, 504)
+
+    def __init__(self,
+                 connect_timeout: float = 10,
+                 read_timeout: float = 60,
+                 retries: int = 3,
+                 backoff: float = 0.5,
+                 backoff_max: float = 30,
+                 failure_threshold: int = 10,
+                 reset_timeout: float = 30,
+                 rate_limit: float = None,
+                 burst: int = 1,
+                 idempotent_operations = None):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.limiter = RateLimiter(rate_limit, burst) if rate_limit else None
+        # Every operation of the GGA services is a read; anything else is only retried when listed here
+        self.idempotent_operations = set(idempotent_operations or ())
+        self.attempts = 0
+        self.retried = 0
+        self.rejected = 0
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self):
+        return self.connect_timeout, self.read_timeout
+
+    def idempotent(self, operation: str):
+        return operation.startswith('Get') or operation in self.idempotent_operations
+
+    def breaker(self, host: str):
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(failure_threshold=self.failure_threshold,
+                                                                reset_timeout=self.reset_timeout)
+            return breaker
+
+    def delay(self, attempt: int, response = None):
+        delay = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.backoff_max))
+        return delay
+
+    def record(self, attempts: int = 0, retried: int = 0, rejected: int = 0):
+        with self._lock:
+            self.attempts += attempts
+            self.retried += retried
+            self.rejected += rejected
+
+    @property
+    def stats(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {
+            'attempts': self.attempts,
+            'retried': self.retried,
+            'rejected': self.rejected,
+            'circuits': {host: breaker.state for host, breaker in breakers.items()},
+        }
+
+
+class GGATransport(Transport):
+    """
+    zeep Transport shared by every pooled client; adds the optional SOAP response cache (GGA.cache.ResponseCache)
+    and the TransportPolicy (timeouts, retries, circuit breaker, rate limit).
+    """
+
+    def __init__(self, cache=None, timeout=300, operation_timeout=None, session=None, response_cache=None,
+                 policy: TransportPolicy = None):
+        super().__init__(cache=cache,
+                         timeout=timeout,
+                         operation_timeout=operation_timeout,
+                         session=session)
+        self.response_cache = response_cache
+        self.policy = policy
+        if policy is not None:
+            self.operation_timeout = policy.timeout
+
+    def set_policy(self, policy: TransportPolicy = None):
+        self.policy = policy
+        self.operation_timeout = policy.timeout if policy is not None else None
+
+    def post(self, address, message, headers):
+        policy = self.policy
+        if policy is None:
+            return super().post(address, message, headers)
+        host = urlparse(address).netloc
+        breaker = policy.breaker(host) if policy.failure_threshold else None
+        retries = policy.retries if policy.idempotent(operation_name(headers, None)) else 0
+        attempt = 0
+        while True:
+            if breaker is not None:
+                try:
+                    breaker.before_request(host)
+                except CircuitOpenError:
+                    policy.record(rejected=1)
+                    raise
+            if policy.limiter is not None:
+                policy.limiter.acquire()
+            policy.record(attempts=1)
+            response = None
+            try:
+                response = super().post(address, message, headers)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if breaker is not None:
+                    breaker.record_failure()
+                if attempt >= retries:
+                    raise
+            except BaseException:
+                # Any other error ends the attempt too, so a half-open trial is never left claimed
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in policy.retry_statuses or is_fault(response):
+                    if breaker is not None:
+                        breaker.record_success()
+                    return response
+                if breaker is not None:
+                    breaker.record_failure()
+                if attempt >= retries:
+                    # Let zeep turn the last answer into a Fault or TransportError as usual
+                    return response
+            time.sleep(policy.delay(attempt, response))
+            attempt += 1
+            policy.record(retried=1)
+
+    def post_xml(self, address, envelope, headers):
+        message = etree_to_string(envelope)
+        event = current_event.get()
+        # Requests made straight through a pooled zeep client (no GGA.instrument.call around them) get their own event
+        standalone = event is None
+        if standalone:
+            event = begin(service_keyword(address), operation_name(headers, envelope))
+        event.request_bytes = len(message)
+        try:
+            response = self._post_cached(address, envelope, message, headers, event)
+        except Exception as e:
+            if standalone:
+                finish(event, e)
+            raise
+        event.response_bytes = len(response.content or b'')
+        if standalone:
+            finish(event)
+        return response
+
+    def _post_cached(self, address, envelope, message, headers, event):
+        cache = self.response_cache
+        if cache is None:
+            return self.post(address, message, headers)
+
+        operation = operation_name(headers, envelope)
+        session_id = current_session.get()
+        key = cache.key(operation, address.encode('utf-8') + message)
+        entry = cache.get(key)
+        if entry is not None and not entry.expired and not require_fresh.get():
+            cache.record(hit=True, size=len(entry.content))
+            if event is not None:
+                event.cached = True
+            return _cached_response(entry, address)
+
+        request_headers = dict(headers)
+        if entry is not None:
+            if entry.headers.get('ETag'):
+                request_headers['If-None-Match'] = entry.headers['ETag']
+            if entry.headers.get('Last-Modified'):
+                request_headers['If-Modified-Since'] = entry.headers['Last-Modified']
+        response = self.post(address, message, request_headers)
+
+        if entry is not None and response.status_code == 304:
+            cache.put(key, operation, entry.content, entry.status_code, entry.headers, session_id=session_id)
+            cache.record(hit=True, size=len(entry.content), revalidated=True)
+            return _cached_response(entry, address)
+        cache.record(hit=False)
+        if response.status_code == 200:
+            cache.put(key, operation, response.content, response.status_code,
+                      {name: response.headers[name] for name in _cached_headers if name in response.headers},
+                      session_id=session_id)
+        return response
@@ -0,0 +1,357 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from GGA import instrument, mirror
+from GGA.cache import fresh
+from GGA.gga import Legislation, Member, Vote, _entity, _field, batch_workers
+from GGA.records import Record
+
+logger = logging.getLogger('GGA.watch')
+
+
+class NewLegislation(Record):
+    __slots__ = ('id', 'legislation')
+
+
+class StatusChange(Record):
+    # status: the new StatusHistory entry (Code, Date, Description)
+    __slots__ = ('id', 'legislation', 'code', 'date', 'description', 'status')
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.id}:{self.code}>"
+
+
+class NewVote(Record):
+    __slots__ = ('id', 'vote', 'legislation')
+
+
+class MemberChange(Record):
+    # change: 'added', 'removed' or 'changed'; member is None once removed
+    __slots__ = ('id', 'change', 'member')
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.id}:{self.change}>"
+
+
+def _digest(data):
+    return hashlib.sha256(mirror.dumps(data).encode('utf-8')).hexdigest()
+
+
+def _moment(value):
+    # ISO string, so dates and datetimes compare in order
+    return value.isoformat() if value is not None else None
+
+
+def _statuses(details):
+    return _field(details, 'StatusHistory', 'StatusListing') or []
+
+
+class _Tracked:
+    __slots__ = ('digest', 'mark', 'at_mark', 'votes')
+
+    def __init__(self):
+        self.digest = None
+        # StatusHistory high-water mark: latest status date, and the entries already seen on that date
+        self.mark = None
+        self.at_mark = set()
+        # Known vote ids, or None until the bill's votes are first listed
+        self.votes = None
+
+    def advance(self, details):
+        """
+        Move the high-water mark over details' StatusHistory; returns the entries past the old mark, oldest first.
+        """
+        new = []
+        for status in _statuses(details):
+            when = _moment(_field(status, 'Date'))
+            key = (_field(status, 'Code'), when)
+            if self.mark is None or when is None or when > self.mark or (when == self.mark and key not in self.at_mark):
+                new.append((when or '', status))
+        for status in _statuses(details):
+            when = _moment(_field(status, 'Date'))
+            if when is None:
+                continue
+            if self.mark is None or when > self.mark:
+                self.mark, self.at_mark = when, set()
+            if when == self.mark:
+                self.at_mark.add((_field(status, 'Code'), when))
+        return [status for when, status in sorted(new, key=lambda item: item[0])]
+
+
+class Watcher:
+    """
+    Polls one session for what changed since the last poll, as NewLegislation, StatusChange, NewVote and
+    MemberChange events -- passed to callback, returned by poll(), or yielded by `async for event in watcher`.
+
+    Each poll fetches the session's bill listing, then details only for new bills, bills whose listing entry
+    changed and the next `sweep` bills in round-robin order. Votes are only listed for bills whose StatusHistory
+    moved past its high-water mark, and only vote ids not seen before are fetched. Responses that hash the same as
+    last time are skipped. Polls revalidate the response cache and bypass mirrors (GGA.cache.fresh()).
+
+    A bill's baseline is taken the first time it is listed (from its details, fetched then unless already hydrated),
+    so the first poll reports nothing unless emit_initial=True, which reports every bill as new. Bills whose vote
+    listing or new votes could not be fetched are rechecked on the following polls until they succeed.
+    sweep: bills re-checked per poll besides the ones known to have changed (None checks them all)
+    members_every: polls between member listing checks (0 never checks)
+    """
+
+    def __init__(self,
+                 session,
+                 interval: float = 60,
+                 callback = None,
+                 sweep: int = 50,
+                 members_every: int = 10,
+                 max_workers: int = None,
+                 emit_initial: bool = False):
+        self.session = session
+        self.interval = interval
+        self.callback = callback
+        self.sweep = sweep
+        self.members_every = members_every
+        self.max_workers = max_workers or batch_workers
+        self.emit_initial = emit_initial
+        self.polls = 0
+        # Requests that reached the service during the last poll
+        self.last_requests = 0
+        self._listing_digest = None
+        self._entries = {}
+        self._bills = {}
+        self._queue = deque()
+        self._retry = set()
+        # Bills whose votes still have to be checked, as {id: (legislation, status mark before the change)}
+        self._vote_retry = {}
+        self._members_digest = None
+        self._members = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}:{self.session.description}>"
+
+    def _fetch(self, operation: str, *args, keyword: str):
+        with fresh():
+            return self.session._call(operation, *args, keyword=keyword)
+
+    def _fetch_many(self, operation: str, ids, keyword: str):
+        # (id, payload or exception) pairs, in the order of ids
+        def fetch(entity_id):
+            try:
+                return entity_id, self._fetch(operation, entity_id, keyword=keyword)
+            except Exception as e:
+                return entity_id, e
+
+        if not ids:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(ids)))) as executor:
+            return list(executor.map(instrument.contextual(fetch), ids))
+
+    def poll(self):
+        """
+        Check for changes once; returns the events (also passed to the callback).
+        """
+        with self._lock, instrument.trace() as trace_:
+            events = self._poll()
+        self.last_requests = trace_.requests
+        self.polls += 1
+        if self.callback is not None:
+            for event in events:
+                self.callback(event)
+        return events
+
+    def _poll(self):
+        first = self.polls == 0
+        events = []
+        candidates = self._check_listing(events, first)
+        candidates.update(self._retry)
+        self._retry = set()
+        sweep = len(self._queue) if self.sweep is None else min(self.sweep, len(self._queue))
+        for _ in range(sweep):
+            legislation_id = self._queue.popleft()
+            if legislation_id in self._entries:
+                self._queue.append(legislation_id)
+                candidates.add(legislation_id)
+        moved = self._check_details(sorted(candidates), events)
+        self._check_votes(moved, events)
+        if self.members_every and self.polls % self.members_every == 0:
+            self._check_members(events)
+        return events
+
+    def _check_listing(self, events, first):
+        listing = self._fetch('GetLegislationForSession', self.session.id, keyword='Legislation') or []
+        digest = _digest(listing)
+        if digest == self._listing_digest:
+            return set()
+        self._listing_digest = digest
+        entries = {}
+        for legis in listing:
+            entries[legis['Id']] = (_digest(legis), legis)
+        changed = set()
+        for legislation_id, (entry_digest, legis) in entries.items():
+            previous = self._entries.get(legislation_id)
+            if previous is None:
+                self._queue.append(legislation_id)
+                tracked = self._bills.setdefault(legislation_id, _Tracked())
+                known = _entity(Legislation, legislation_id, session=self.session, data=legis)
+                if known.hydrated and tracked.digest is None:
+                    tracked.digest = _digest(known.json)
+                    tracked.advance(known.json)
+                else:
+                    # Fetched now, so a status change made before the bill's turn in the sweep isn't absorbed
+                    changed.add(legislation_id)
+                if not first or self.emit_initial:
+                    events.append(NewLegislation(id=legislation_id, legislation=known))
+            elif previous[0] != entry_digest:
+                changed.add(legislation_id)
+        for legislation_id in set(self._entries) - set(entries):
+            self._bills.pop(legislation_id, None)
+            self._vote_retry.pop(legislation_id, None)
+        self._entries = entries
+        # The next Session.legislation re-pulls the listing (from the response cache this poll refreshed)
+        self.session._legislation = None
+        return changed
+
+    def _check_details(self, legislation_ids, events):
+        moved = []
+        for legislation_id, details in self._fetch_many('GetLegislationDetail', legislation_ids, 'Legislation'):
+            if isinstance(details, Exception):
+                logger.warning("Could not fetch legislation %s: %r", legislation_id, details)
+                self._retry.add(legislation_id)
+                continue
+            tracked = self._bills.setdefault(legislation_id, _Tracked())
+            digest = _digest(details)
+            if digest == tracked.digest:
+                continue
+            baseline = tracked.digest is None
+            tracked.digest = digest
+            previous_mark = tracked.mark
+            legislation = _entity(Legislation, legislation_id,
+                                  session=self.session,
+                                  data=self._entries.get(legislation_id, (None, None))[1])
+            # Reload even if already hydrated, so the identity map (and its listeners) see the new status
+            legislation._load(details)
+            statuses = tracked.advance(details)
+            if baseline:
+                continue
+            for status in statuses:
+                events.append(StatusChange(id=legislation_id, legislation=legislation, code=_field(status, 'Code'),
+                                           date=_field(status, 'Date'), description=_field(status, 'Description'),
+                                           status=status))
+            if statuses:
+                moved.append((legislation, previous_mark))
+        return moved
+
+    def _check_votes(self, moved, events):
+        # Pending rechecks keep their older mark, so no vote between the two marks is skipped
+        by_id, self._vote_retry = self._vote_retry, {}
+        for legislation, mark in moved:
+            by_id.setdefault(legislation.id, (legislation, mark))
+        new_votes = {}
+        for legislation_id, votes in self._fetch_many('GetVotesForLegislation', sorted(by_id), 'Votes'):
+            if isinstance(votes, Exception):
+                logger.warning("Could not list votes for legislation %s: %r", legislation_id, votes)
+                self._vote_retry[legislation_id] = by_id[legislation_id]
+                continue
+            legislation, mark = by_id[legislation_id]
+            tracked = self._bills.get(legislation_id)
+            if tracked is None:
+                # No longer listed
+                continue
+            for vote in votes or []:
+                vote_id = vote['VoteId']
+                if tracked.votes is not None and vote_id in tracked.votes:
+                    continue
+                when = _moment(_field(vote, 'Date'))
+                # Votes listed for the first time: only the ones after the old high-water mark are new
+                if tracked.votes is None and mark is not None and when is not None and when <= mark:
+                    continue
+                new_votes[vote_id] = (legislation, mark, vote)
+            tracked.votes = (tracked.votes or set()) | {vote['VoteId'] for vote in votes or []}
+        for vote_id, data in self._fetch_many('GetVote', list(new_votes), 'Votes'):
+            legislation, mark, summary = new_votes[vote_id]
+            if isinstance(data, Exception):
+                logger.warning("Could not fetch vote %s: %r", vote_id, data)
+                # Unseen again, so relisting the bill on the next poll picks it up
+                self._bills[legislation.id].votes.discard(vote_id)
+                self._vote_retry.setdefault(legislation.id, (legislation, mark))
+                continue
+            vote = _entity(Vote, vote_id,
+                           session=self.session,
+                           legislation=legislation,
+                           data=summary).hydrate(data)
+            events.append(NewVote(id=vote_id, vote=vote, legislation=legislation))
+
+    def _check_members(self, events):
+        members = self._fetch('GetMembersBySession', self.session.id, keyword='Members') or []
+        digest = _digest(members)
+        if digest == self._members_digest:
+            return
+        self._members_digest = digest
+        current = {member['Id']: (_digest(member), member) for member in members}
+        if self._members is not None or self.emit_initial:
+            previous = self._members or {}
+            for member_id, (member_digest, member) in current.items():
+                if member_id not in previous or previous[member_id][0] != member_digest:
+                    events.append(MemberChange(id=member_id,
+                                               change='added' if member_id not in previous else 'changed',
+                                               member=_entity(Member, member_id,
+                                                              session=self.session,
+                                                              short_data=member)))
+            for member_id in set(previous) - set(current):
+                events.append(MemberChange(id=member_id, change='removed', member=None))
+        self._members = current
+        self.session._member_summaries.pop(None, None)
+        self.session._member_index.pop(None, None)
+
+    def run(self):
+        """
+        Poll every `interval` seconds until stop(); errors are logged and the next poll tries again.
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Polling %s failed", self.session.description)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """
+        Run in a background thread; returns self.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=instrument.contextual(self.run),
+                                            name='GGA-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    async def __aiter__(self):
+        # Polls run in a worker thread so the event loop is never blocked on the service
+        self._stop.clear()
+        while not self._stop.is_set():
+            try:
+                events = await asyncio.to_thread(self.poll)
+            except Exception:
+                logger.exception("Polling %s failed", self.session.description)
+                events = []
+            for event in events:
+                yield event
+            await asyncio.sleep(self.interval)
+
+
+def watch(session, interval: float = 60, callback = None, **options):
+    """
+    Start a Watcher for session in a background thread; call .stop() on it when done.
+    """
+    return Watcher(session, interval=interval, callback=callback, **options).start()
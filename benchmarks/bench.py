@@ -0,0 +1,129 @@
+"""
+Client benchmarks on recorded fixtures.
+
+    python -m benchmarks.bench --record              # once, against the live service
+    python -m benchmarks.bench --latency 0.05        # offline, 50ms per request
+
+Each scenario reports wall time, requests sent and peak Python memory (tracemalloc).
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+from GGA import clients, gga, replay
+
+default_fixtures = 'benchmarks/fixtures'
+
+
+def _assembly():
+    return gga.GeneralAssembly()
+
+
+def _session(assembly, session_id):
+    if session_id is None:
+        return max(assembly.sessions, key=lambda session: session.year)
+    return assembly.get_session(session_id=session_id)
+
+
+def startup(context):
+    # Client creation (WSDL loads) included; the replay transport stays installed
+    clients.reset_clients(keep_transport=True)
+    if not context.live:
+        assert isinstance(clients.get_transport().session, replay.ReplaySession), "replay transport not installed"
+    return lambda: _assembly().sessions
+
+
+def all_members(context):
+    session = _session(_assembly(), context.session)
+    return lambda: [member.party for member in session.all_members]
+
+
+def legislation(context):
+    session = _session(_assembly(), context.session)
+    return lambda: [legis.caption for legis in session.legislation]
+
+
+def member_legislation(context):
+    session = _session(_assembly(), context.session)
+    member = session.all_members[0]
+    return lambda: member.legislation
+
+
+def legislation_authors(context):
+    session = _session(_assembly(), context.session)
+    legis = session.legislation[0]
+    legis.hydrate()
+    return lambda: [author.name for author in legis.authors]
+
+
+def get_committee(context):
+    session = _session(_assembly(), context.session)
+    name = session._call('GetCommitteesBySession', session.id, keyword='Committees')[0]['Name']
+    return lambda: session.get_committee(committe_name=name).members
+
+
+scenarios = {
+    'startup': startup,
+    'all_members': all_members,
+    'legislation': legislation,
+    'member_legislation': member_legislation,
+    'legislation_authors': legislation_authors,
+    'get_committee': get_committee,
+}
+
+
+def measure(name, context, session):
+    """
+    Run one scenario: setup isn't measured, the returned callable is.
+    """
+    gga.default_entities.clear()
+    run = scenarios[name](context)
+    gc.collect()
+    requests = session.total_requests if session is not None else 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'scenario': name,
+        'seconds': elapsed,
+        'requests': (session.total_requests - requests) if session is not None else None,
+        'peak_kib': peak / 1024,
+    }
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default=default_fixtures, help='Fixture directory')
+    parser.add_argument('--record', action='store_true', help='Record fixtures from the live service')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds injected per replayed request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='+/- fraction of the latency')
+    parser.add_argument('--session', type=int, help='Session id (the latest by default)')
+    parser.add_argument('--live', action='store_true', help='Use the live service without fixtures')
+    parser.add_argument('scenario', nargs='*', help=f"Scenarios (all by default): {', '.join(scenarios)}")
+    context = parser.parse_args(argv)
+    unknown = set(context.scenario) - set(scenarios)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    session = None
+    if not context.live:
+        session = replay.install(context.fixtures,
+                                 mode='record' if context.record else 'replay',
+                                 latency=context.latency,
+                                 jitter=context.jitter)
+    print(f"{'scenario':<22}{'seconds':>10}{'requests':>10}{'peak KiB':>12}")
+    for name in context.scenario or scenarios:
+        result = measure(name, context, session)
+        requests = '-' if result['requests'] is None else result['requests']
+        print(f"{name:<22}{result['seconds']:>10.3f}{requests:>10}{result['peak_kib']:>12.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from GGA import gga, mirror
+
+
+def member(member_id):
+    return {'Id': member_id, 'Address': None, 'Birthday': None, 'Education': '', 'Occupation': '', 'Religion': '',
+            'Spouse': '', 'FreeForm1': '', 'LegislativeComments': '', 'Residence': '', 'Staff': '',
+            'CellPhone': None, 'HomePhone': None,
+            'Name': {'First': f"First{member_id}", 'Last': f"Last{member_id}", 'Middle': None, 'Nickname': None,
+                     'Suffix': None},
+            'DistrictAddress': {'Address1': '1 Main St', 'Address2': None, 'City': 'Atlanta', 'Email': None,
+                                'Fax': None, 'Phone': None, 'State': 'GA', 'Zip': '30334'},
+            'SessionsInService': {'LegislativeService': [{
+                'Session': {'Id': 27}, 'Party': 'Democrat' if member_id % 2 else 'Republican', 'LegId': member_id,
+                'ServiceId': member_id, 'Title': 'Representative',
+                'District': {'Type': 'House', 'Coverage': '', 'Post': None, 'Id': member_id, 'Number': member_id},
+                'CommitteeMemberships': {'CommitteeMembership': [
+                    {'Committee': {'Id': 100 + member_id % 3, 'Name': f"Committee {100 + member_id % 3}"}}]}}]}}
+
+
+def legislation(legislation_id):
+    filed = datetime(2020, 1, legislation_id % 28 + 1)
+    return {'Id': legislation_id, 'Caption': f"Caption {legislation_id}", 'ActVetoNumber': None,
+            'DocumentType': 'HB', 'LegislationType': 'Bill', 'Number': legislation_id, 'Suffix': None,
+            'Status': {'Code': 'HPF', 'Date': filed}, 'Footnotes': '', 'Summary': f"Summary {legislation_id}",
+            'StatusHistory': {'StatusListing': [{'Code': 'HPF', 'Date': filed, 'Description': 'Filed'}]},
+            'Versions': {'DocumentDescription': [{'Description': 'As introduced', 'Version': 1}]},
+            'Authors': {'Sponsorship': [{'MemberId': legislation_id % 5 + 1, 'Type': 'Author'},
+                                        {'MemberId': (legislation_id + 1) % 5 + 1, 'Type': 'CoAuthor'}]},
+            'Committees': {'CommitteeListing': [{'Id': 100 + legislation_id % 3}]}}
+
+
+def vote(vote_id):
+    return {'VoteId': vote_id, 'Day': 'Monday', 'Time': '10:00', 'Date': datetime(2020, 2, vote_id % 28 + 1, 10),
+            'Number': vote_id, 'Yeas': 3, 'Nays': 2, 'NotVoting': 0, 'Excused': 0, 'Caption': 'PASSED',
+            'Branch': 'House',
+            'Votes': {'MemberVoted': [{'Member': {'Id': member_id,
+                                                  'Name': {'First': f"First{member_id}", 'Last': f"Last{member_id}"}},
+                                       'MemberVoted': 'Yea' if (member_id + vote_id) % 2 else 'Nay'}
+                                      for member_id in range(1, 6)]}}
+
+
+def committee(committee_id, session_id):
+    return {'Id': committee_id, 'Code': f"C{committee_id}", 'Name': f"Committee {committee_id}", 'Type': 'House',
+            'Description': '', 'Staff': '', 'SubCommittees': None,
+            'Members': {'CommitteeMember': [{'Member': {'Id': member_id,
+                                                        'Name': {'First': f"First{member_id}",
+                                                                 'Last': f"Last{member_id}"}}}
+                                            for member_id in range(1, 6) if member_id % 3 == committee_id % 3]}}
+
+
+def schedule(session_id, chamber):
+    # Legislative days on the weekdays of January 13th - 31st, 2020
+    days = [datetime(2020, 1, day) for day in range(13, 32) if datetime(2020, 1, day).weekday() < 5]
+    return {'Years': {'LegislativeYear': [{'Year': 2020, 'Days': {'LegislativeDay': [
+        {'Date': day, 'Number': number, 'Branch': chamber} for number, day in enumerate(days, start=1)]}}]}}
+
+
+class FakeService:
+    """
+    Stands in for every zeep client: each operation returns canned payloads shaped like the service's, and calls
+    are counted per operation. Assign a function to an operation name to change its answer.
+    """
+
+    def __init__(self, bills: int = 20, members: int = 5):
+        self.calls = Counter()
+        self.bills = bills
+        self.members = members
+        self.answers = {
+            'GetYears': lambda: [
+                {'Number': 2020, 'Session': {'Id': 27, 'Description': '2019-2020 Regular Session', 'Library': ''}},
+                {'Number': 2018, 'Session': {'Id': 25, 'Description': '2017-2018 Regular Session', 'Library': ''}}],
+            'GetMembersBySession': lambda session_id: [
+                {'Id': member_id, 'Name': {'First': f"First{member_id}", 'Last': f"Last{member_id}"},
+                 'District': {'Type': 'House'}} for member_id in range(1, self.members + 1)],
+            'GetMembersByTypeAndSession': lambda member_type, session_id: [
+                {'Id': member_id, 'Name': {'First': f"First{member_id}", 'Last': f"Last{member_id}"}}
+                for member_id in range(1, self.members + 1)],
+            'GetMember': member,
+            'GetLegislationForSession': lambda session_id: [
+                {'Id': legislation_id, 'DocumentType': 'HB', 'Number': legislation_id}
+                for legislation_id in range(1, self.bills + 1)],
+            'GetLegislationDetail': legislation,
+            'GetLegislationDetailByDescription': lambda document_type, number: legislation(number),
+            'GetVotesForLegislation': lambda legislation_id: [
+                {'VoteId': legislation_id * 10 + index, 'Branch': 'House', 'Number': legislation_id * 10 + index}
+                for index in range(2)],
+            'GetVote': vote,
+            'GetCommitteesBySession': lambda session_id: [
+                {'Id': committee_id, 'Name': f"Committee {committee_id}", 'Code': f"C{committee_id}"}
+                for committee_id in (100, 101, 102)],
+            'GetCommitteeForSession': committee,
+            'GetSessionSchedule': schedule,
+        }
+
+    def __getattr__(self, operation):
+        answer = self.answers.get(operation)
+        if answer is None:
+            raise AttributeError(operation)
+
+        def call(*args):
+            self.calls[operation] += 1
+            return answer(*args)
+
+        return call
+
+    def __setattr__(self, name, value):
+        if name[:1].isupper():
+            self.answers[name] = value
+        else:
+            super().__setattr__(name, value)
+
+
+class FakeClient:
+    def __init__(self, service):
+        self.service = service
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = FakeService()
+    client = FakeClient(service)
+    monkeypatch.setattr(gga, 'get_client', lambda keyword: client)
+    monkeypatch.setattr(mirror, 'get_client', lambda keyword: client)
+    gga.default_entities.clear()
+    yield service
+    gga.default_entities.clear()
+
+
+@pytest.fixture
+def assembly(service):
+    return gga.GeneralAssembly()
+
+
+@pytest.fixture
+def session(assembly):
+    return assembly.get_session(session_id=27)
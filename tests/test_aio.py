@@ -0,0 +1,191 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip('httpx')
+
+from GGA import aio
+
+from conftest import FakeService
+
+
+class AsyncFakeService:
+    # Awaitable operations over a FakeService, each taking `delay` seconds
+    def __init__(self, service, delay = 0.001):
+        self.service = service
+        self.delay = delay
+
+    def __getattr__(self, operation):
+        call = getattr(self.service, operation)
+
+        async def run(*args):
+            await asyncio.sleep(self.delay)
+            return call(*args)
+
+        return run
+
+
+class AsyncFakeClient:
+    def __init__(self, service):
+        self.service = service
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def service():
+    return FakeService()
+
+
+def make_assembly(service, delay = 0.001, **options):
+    assembly = aio.AsyncGeneralAssembly(**options)
+    client = AsyncFakeClient(AsyncFakeService(service, delay=delay))
+
+    async def get_client(keyword):
+        return client
+
+    assembly.get_client = get_client
+    return assembly
+
+
+def test_limiter_caps_concurrency():
+    async def main():
+        limiter = aio.Limiter(concurrency=2)
+        running, peak = 0, 0
+
+        async def task():
+            nonlocal running, peak
+            await limiter.acquire()
+            try:
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.005)
+                running -= 1
+            finally:
+                limiter.release()
+
+        await asyncio.gather(*(task() for _ in range(6)))
+        return peak
+
+    assert run(main()) == 2
+
+
+def test_limiter_spaces_request_starts():
+    async def main():
+        limiter = aio.Limiter(concurrency=10, rate_limit=100)
+        started = []
+
+        async def task():
+            await limiter.acquire('host')
+            started.append(time.monotonic())
+            limiter.release()
+
+        await asyncio.gather(*(task() for _ in range(5)))
+        return started
+
+    started = run(main())
+    assert started[-1] - started[0] >= 0.035
+
+
+def test_cancelled_acquire_returns_its_permit():
+    async def main():
+        limiter = aio.Limiter(concurrency=2, rate_limit=1)
+        await limiter.acquire('host')
+        limiter.release()
+        # The next start is a second away: cancel while waiting for it
+        waiting = asyncio.ensure_future(limiter.acquire('host'))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        return limiter._semaphore._value
+
+    assert run(main()) == 2
+
+
+def test_cancelled_calls_return_their_permits(service):
+    async def main():
+        async with make_assembly(service, delay=0.05, concurrency=3) as assembly:
+            session = await assembly.get_session(session_id=27)
+            async for legislation in session.iter_legislation():
+                break
+            await asyncio.sleep(0.01)
+            permits = assembly.limiter._semaphore._value
+            # Still usable after the early stop
+            members = await session.all_members(hydrate=True)
+            return permits, len(members)
+
+    assert run(main()) == (3, 5)
+
+
+def test_details_need_fetch(service):
+    async def main():
+        async with make_assembly(service) as assembly:
+            session = await assembly.get_session(session_id=27)
+            member = (await session.all_members())[0]
+            with pytest.raises(aio.NotLoadedError):
+                member.party
+            assert not hasattr(member, 'party')
+            await member.fetch()
+            return member.party
+
+    assert run(main()) == 'Democrat'
+
+
+def test_sync_only_apis_are_unavailable(service):
+    async def main():
+        async with make_assembly(service) as assembly:
+            session = await assembly.get_session(session_id=27)
+            member = (await session.all_members())[0]
+            return [hasattr(session, 'search_legislation'), hasattr(session, 'refresh_legislation'),
+                    hasattr(member, 'legislation')]
+
+    assert run(main()) == [False, False, False]
+
+
+def test_entities_resolve_through_identity_map(service):
+    async def main():
+        async with make_assembly(service, delay=0.01) as assembly:
+            session = await assembly.get_session(session_id=27)
+            members = await session.all_members()
+            again = await session.all_members()
+            await asyncio.gather(*(member.fetch() for member in members + again))
+            legislation = await session.legislation()
+            for legis in legislation:
+                await legis.authors(hydrate=True)
+            return members[0] is again[0]
+
+    assert run(main())
+    # Concurrent fetches of one member share a request, and authors reuse the loaded members
+    assert service.calls['GetMember'] == 5
+
+
+def test_async_calendar(service):
+    async def main():
+        async with make_assembly(service) as assembly:
+            session = await assembly.get_session(session_id=27)
+            calendar = await session.calendar('House')
+            return len(calendar), calendar is await session.calendar('House')
+
+    assert run(main()) == (15, True)
+    assert service.calls['GetSessionSchedule'] == 1
+
+
+def test_lookups_match_names_like_sync(service):
+    async def main():
+        async with make_assembly(service) as assembly:
+            session = await assembly.get_session(session_id=27)
+            member = await session.get_member(member_name='last3, FIRST3')
+            same = await session.get_member(member_name='First3  Last3')
+            committee = await session.get_committee(committee_name='c101')
+            missing = await session.get_member(member_name='Nobody')
+            return member, same, committee, missing
+
+    member, same, committee, missing = run(main())
+    assert member.id == 3 and same is member and missing is None
+    assert (committee.id, committee.hydrated) == (101, True)
+    assert service.calls['GetMembersBySession'] == service.calls['GetCommitteesBySession'] == 1
+    assert service.calls['GetMember'] == 0
@@ -0,0 +1,127 @@
+import json
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from GGA import backfill, clients, crawl, mirror
+from GGA.transport import TransportPolicy
+
+from conftest import vote
+
+init_worker = backfill._init_worker
+everything = {'member': 5, 'committee': 3, 'legislation': 20, 'vote': 40}
+
+
+def written(path):
+    with open(path) as f:
+        return Counter((row['type'], row['id']) for row in map(json.loads, f))
+
+
+def kinds(path):
+    return Counter(kind for kind, entity_id in written(path).elements())
+
+
+@pytest.fixture(autouse=True)
+def in_threads(monkeypatch):
+    # Shards run in threads, so they share the fake service; the merge and checkpoint logic is the same
+    monkeypatch.setattr(backfill, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(backfill, '_init_worker', lambda memory_limit = None, rate_limit = None: None)
+
+
+@pytest.fixture
+def output(tmp_path):
+    return str(tmp_path / 'gga.ndjson')
+
+
+def test_plan_shards_sessions(session):
+    shards = backfill.plan([session], shard_size=8)
+    assert [shard.name for shard in shards] == ['27-people', '27-1-8', '27-9-16', '27-17-20']
+    assert [shard.name for shard in backfill.plan([session])] == ['27-session']
+
+
+def test_sharded_backfill_matches_crawl(service, output, tmp_path):
+    summary = backfill.backfill(output, session_ids=[27], processes=3, shard_size=6)
+    assert summary['errors'] == 0
+    assert kinds(output) == everything
+    assert max(written(output).values()) == 1
+    assert not os.path.exists(f"{output}.parts")
+
+    crawled = str(tmp_path / 'crawl.ndjson')
+    crawl.crawl(crawled, session_ids=[27])
+    assert set(written(output)) == set(written(crawled))
+
+
+def test_failed_shard_resumes(service, output):
+    def failing_vote(vote_id):
+        if vote_id == 71:
+            raise RuntimeError('service error')
+        return vote(vote_id)
+
+    service.GetVote = failing_vote
+    summary = backfill.backfill(output, session_ids=[27], processes=2, shard_size=5)
+    assert summary['errors'] == 1
+    assert kinds(output)['vote'] == 39
+
+    service.GetVote = vote
+    service.calls.clear()
+    summary = backfill.backfill(output, session_ids=[27], processes=2, shard_size=5)
+    assert summary['errors'] == 0
+    assert service.calls['GetVote'] == 1
+    assert service.calls['GetLegislationDetail'] == 0
+    assert kinds(output) == everything
+    assert max(written(output).values()) == 1
+
+
+def test_crash_after_checkpoint_keeps_output_consistent(service, output, monkeypatch):
+    # Stop right after a merged shard is checkpointed, before its part is removed
+    remove = backfill._remove
+
+    def crash(path):
+        if path.endswith('.ndjson') and '.parts' in path:
+            raise KeyboardInterrupt
+        remove(path)
+
+    monkeypatch.setattr(backfill, '_remove', crash)
+    with pytest.raises(KeyboardInterrupt):
+        backfill.backfill(output, session_ids=[27], processes=1, shard_size=10)
+    monkeypatch.setattr(backfill, '_remove', remove)
+
+    backfill.backfill(output, session_ids=[27], processes=1, shard_size=10)
+    assert kinds(output) == everything
+    assert max(written(output).values()) == 1
+    assert not os.path.exists(f"{output}.parts")
+
+
+def test_backfill_into_mirror(service, tmp_path):
+    path = str(tmp_path / 'gga.db')
+    backfill.backfill(path, session_ids=[27], processes=2, shard_size=7)
+    store = mirror.Mirror(path)
+    try:
+        assert store.lookup('GetLegislationDetail', (20,))['Caption'] == 'Caption 20'
+        assert len(store.lookup('GetLegislationForSession', (27,))) == 20
+        assert store.lookup('GetVote', (201,))['VoteId'] == 201
+    finally:
+        store.close()
+
+
+def test_rate_limit_is_shared_by_workers(service, output, monkeypatch):
+    shares = []
+    monkeypatch.setattr(backfill, '_init_worker',
+                        lambda memory_limit = None, rate_limit = None: shares.append(rate_limit))
+    monkeypatch.setattr(clients, 'transport_policy', TransportPolicy(rate_limit=12))
+    backfill.backfill(output, session_ids=[27], processes=4, shard_size=5)
+    assert shares and set(shares) == {3}
+
+
+def test_worker_throttles_to_its_share(monkeypatch):
+    monkeypatch.setattr(clients, 'transport_policy', TransportPolicy(rate_limit=12, burst=2))
+    init_worker(rate_limit=3)
+    assert (clients.transport_policy.limiter.rate, clients.transport_policy.limiter.burst) == (3, 2)
+
+
+def test_max_tasks_per_child_needs_python_3_11(output, monkeypatch):
+    monkeypatch.setattr(backfill.sys, 'version_info', (3, 10, 0))
+    with pytest.raises(RuntimeError, match='3.11'):
+        backfill.Backfill(output, max_tasks_per_child=2)
@@ -0,0 +1,121 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import conftest
+from GGA import cache, gga
+from GGA.cache import EntityCache
+from GGA.gga import GeneralAssembly, Legislation, Member, _entity
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_lru_evicts_least_recently_used():
+    entities = EntityCache(maxsize=2)
+    entities.put('a', 1)
+    entities.put('b', 2)
+    assert entities.get('a') == 1
+    entities.put('c', 3)
+    assert 'b' not in entities
+    assert entities.get('a') == 1 and entities.get('c') == 3
+    assert entities.evictions == 1
+    assert len(entities) == 2
+
+
+def test_ttl_expires_entries(clock):
+    entities = EntityCache(ttl=60)
+    entities.put('a', 1)
+    clock[0] += 59
+    assert entities.get('a') == 1
+    clock[0] += 2
+    assert entities.get('a') is None
+    assert entities.peek('a') is None
+    assert entities.values() == []
+
+
+def test_stats_count_hits_and_misses():
+    entities = EntityCache(maxsize=10)
+    entities.put('a', 1)
+    entities.get('a')
+    entities.get('a')
+    entities.get('b')
+    entities.peek('b')
+    stats = entities.stats
+    assert (stats['hits'], stats['misses'], stats['size']) == (2, 1, 1)
+    assert stats['hit_rate'] == pytest.approx(2 / 3)
+
+
+def test_version_moves_on_put_and_changed():
+    entities = EntityCache()
+    version = entities.version
+    entities.put('a', 1)
+    assert entities.version == version + 1
+    entities.changed()
+    assert entities.version == version + 2
+    entities.get('a')
+    entities.discard('a')
+    assert entities.version == version + 2
+
+
+def test_listings_share_entities(session):
+    members = session.all_members
+    assert session.get_member(member_id=members[0].id) is members[0]
+    legislation = session.legislation
+    assert _entity(Legislation, legislation[0].id, session=session) is legislation[0]
+
+
+def test_entities_are_fetched_once(service, session):
+    legislation = session.legislation
+    authors = {author.id for legis in legislation for author in legis.authors}
+    for legis in legislation:
+        for author in legis.authors:
+            author.name
+    assert service.calls['GetMember'] == len(authors)
+    assert service.calls['GetLegislationDetail'] == service.bills
+
+
+def test_stub_copies_hydrated_twin(service, session, assembly):
+    member = session.all_members[0]
+    member.hydrate()
+    # A second object for the same member, e.g. created before the first was registered
+    twin = Member(member.id, session=session)
+    assert twin.party == member.party
+    assert service.calls['GetMember'] == 1
+    assert assembly.entities.version > 0
+
+
+def test_assemblies_have_separate_identity_maps(service, assembly):
+    other = GeneralAssembly()
+    first = assembly.get_session(session_id=27).all_members[0]
+    second = other.get_session(session_id=27).all_members[0]
+    assert first is not second
+    first.hydrate()
+    second.hydrate()
+    assert service.calls['GetMember'] == 2
+
+
+def test_twin_lookup_leaves_stats_alone(service, session, assembly):
+    member = session.all_members[0]
+    stats = assembly.entities.stats
+    member.hydrate()
+    assert (assembly.entities.hits, assembly.entities.misses) == (stats['hits'], stats['misses'])
+
+
+def test_concurrent_loads_share_one_fetch(service, session):
+    def slow_member(member_id):
+        time.sleep(0.02)
+        return conftest.member(member_id)
+
+    service.GetMember = slow_member
+    member, twin = Member(1, session=session), Member(1, session=session)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(lambda entity: entity.hydrate(), [member, twin] * 3))
+    assert service.calls['GetMember'] == 1
+    assert twin.party == member.party
+    assert gga._loading == {}
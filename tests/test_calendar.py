@@ -0,0 +1,63 @@
+from datetime import date, datetime
+
+import pytest
+
+from conftest import vote
+
+
+@pytest.fixture
+def calendar(session):
+    return session.calendar('House')
+
+
+def test_days_are_sorted_and_numbered(calendar):
+    # Weekdays of January 13th - 31st, 2020
+    assert len(calendar) == 15
+    assert [day.day for day in calendar.days] == sorted(day.day for day in calendar.days)
+    assert calendar.day(1).day == date(2020, 1, 13)
+    assert calendar.day(15).day == date(2020, 1, 31)
+    assert calendar.day(16) is None
+
+
+def test_on_matches_exact_dates(calendar):
+    assert calendar.on(date(2020, 1, 14)).number == 2
+    assert calendar.on(datetime(2020, 1, 14, 16, 30)).number == 2
+    # A Saturday
+    assert calendar.on(date(2020, 1, 18)) is None
+    assert calendar.on(date(2019, 12, 31)) is None
+
+
+def test_between_includes_both_ends(calendar):
+    days = calendar.between(date(2020, 1, 17), date(2020, 1, 21))
+    assert [day.number for day in days] == [5, 6, 7]
+    assert calendar.days_between(date(2020, 1, 17), date(2020, 1, 21)) == 3
+    assert calendar.between(date(2020, 2, 1), date(2020, 2, 28)) == []
+
+
+def test_calendar_is_built_once(service, session, calendar):
+    assert session.calendar('House') is calendar
+    assert service.calls['GetSessionSchedule'] == 1
+
+
+def test_status_changes_join_loaded_legislation(session, calendar):
+    legislation = session.legislation
+    legislation[11].hydrate()
+    # Bill 12 was filed on January 13th, legislative day 1
+    assert calendar.status_changes_on(1) == [(legislation[11], legislation[11].statusHistory['StatusListing'][0])]
+    assert calendar.status_changes_on(date(2020, 1, 15)) == []
+
+
+def test_votes_join_loaded_votes(service, session, calendar):
+    service.GetVote = lambda vote_id: dict(vote(vote_id), Date=datetime(2020, 1, 14, 10))
+    assert calendar.votes_on(2) == []
+    legis = session.legislation[0]
+    votes = legis.votes
+    for vote_ in votes:
+        vote_.hydrate()
+    assert {vote_.id for vote_ in calendar.votes_on(2)} == {vote_.id for vote_ in votes}
+    assert calendar.votes_on(date(2020, 1, 14)) == calendar.votes_on(2)
+
+
+def test_unknown_day_number(calendar):
+    with pytest.raises(KeyError):
+        calendar.votes_on(40)
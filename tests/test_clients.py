@@ -0,0 +1,95 @@
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
+
+from GGA import clients
+from GGA.clients import WsdlCache
+from GGA.transport import GGATransport
+
+url = f"{clients.base}Members{clients.suffix}"
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    directory = tmp_path / 'snapshot'
+    directory.mkdir()
+    (directory / clients._snapshot_filename(url)).write_bytes(b'<snapshot/>')
+    return str(directory)
+
+
+@pytest.fixture
+def pooled(monkeypatch, tmp_path):
+    # Module state the tests below change, restored afterwards
+    for name in ('wsdl_cache_dir', 'wsdl_cache_ttl', 'snapshot_dir', 'wsdl_cache_enabled', '_transport',
+                 '_transport_installed'):
+        monkeypatch.setattr(clients, name, getattr(clients, name))
+    monkeypatch.setattr(clients, '_clients', {})
+    monkeypatch.setattr(clients, '_client_locks', {})
+    clients.configure_wsdl_cache(directory=str(tmp_path / 'cache'))
+    yield
+    clients.reset_clients()
+
+
+def age(path, url_, days):
+    connection = sqlite3.connect(path)
+    created = datetime.now(timezone.utc).timestamp() - days * 24 * 60 * 60
+    connection.execute("UPDATE request SET created = ? WHERE url = ?",
+                       (datetime.fromtimestamp(created, timezone.utc), url_))
+    connection.commit()
+    connection.close()
+
+
+def test_snapshot_is_used_before_the_network(tmp_path, snapshot):
+    cache = WsdlCache(path=str(tmp_path / 'wsdl.db'), timeout=60, snapshot=snapshot)
+    assert cache.get(url) == b'<snapshot/>'
+    assert cache.get(f"{clients.base}Votes{clients.suffix}") is None
+
+
+def test_expired_snapshot_document_goes_to_the_network(tmp_path, snapshot):
+    path = str(tmp_path / 'wsdl.db')
+    cache = WsdlCache(path=path, timeout=60, snapshot=snapshot)
+    cache.get(url)
+    age(path, url, days=1)
+    assert cache.get(url) is None
+    cache.add(url, b'<downloaded/>')
+    assert cache.get(url) == b'<downloaded/>'
+
+
+def test_configure_wsdl_cache_keeps_the_transport(pooled, tmp_path):
+    transport = clients.get_transport()
+    clients._clients['Members'] = object()
+    clients.configure_wsdl_cache(directory=str(tmp_path / 'elsewhere'), ttl=5)
+    assert clients.get_transport() is transport
+    assert clients._clients == {}
+    assert transport.cache._db_path.startswith(str(tmp_path / 'elsewhere'))
+    assert transport.cache._timeout == 5
+    clients.configure_wsdl_cache(enabled=False)
+    assert transport.cache is None
+
+
+def test_configure_wsdl_cache_leaves_installed_transports_alone(pooled):
+    transport = clients.use_transport(GGATransport(cache=None))
+    clients.configure_wsdl_cache(ttl=5)
+    assert clients.get_transport() is transport
+    assert transport.cache is None
+
+
+def test_concurrent_callers_share_one_wsdl_load(pooled, monkeypatch):
+    loads = []
+
+    class SlowClient:
+        def __init__(self, wsdl, transport = None):
+            loads.append(wsdl)
+            time.sleep(0.02)
+
+    monkeypatch.setattr(clients, 'Client', SlowClient)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pooled_clients = list(executor.map(clients.get_client, ['Members'] * 8 + ['Votes'] * 8))
+    assert sorted(loads) == [clients._make_client_url('Members'), clients._make_client_url('Votes')]
+    assert len({id(client) for client in pooled_clients}) == 2
+    # Later calls reuse the pooled client
+    assert clients.get_client('Members') is pooled_clients[0]
+    assert len(loads) == 2
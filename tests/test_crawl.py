@@ -0,0 +1,123 @@
+import json
+from collections import Counter
+
+import pytest
+
+from GGA import crawl, gga, mirror
+
+from conftest import legislation, vote
+
+
+def rows(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def kinds(path):
+    return Counter(row['type'] for row in rows(path))
+
+
+def assert_written_once(path):
+    written = Counter((row['type'], row['id']) for row in rows(path))
+    assert [key for key, count in written.items() if count > 1] == []
+
+
+@pytest.fixture
+def output(tmp_path):
+    return str(tmp_path / 'gga.ndjson')
+
+
+def test_crawl_writes_every_entity(service, output):
+    summary = crawl.crawl(output, session_ids=[27], workers=2)
+    assert kinds(output) == {'member': 5, 'committee': 3, 'legislation': 20, 'vote': 40}
+    assert summary['errors'] == 0
+    assert_written_once(output)
+    votes = [row for row in rows(output) if row['type'] == 'vote']
+    assert all(row['legislation_id'] == row['id'] // 10 for row in votes)
+    assert crawl.Checkpoint(f"{output}.checkpoint").complete(27)
+
+
+def test_completed_session_is_skipped(service, output):
+    crawl.crawl(output, session_ids=[27], workers=2)
+    calls = sum(service.calls.values())
+    size = len(rows(output))
+    crawl.crawl(output, session_ids=[27], workers=2)
+    assert sum(service.calls.values()) == calls + 1  # GetYears
+    assert len(rows(output)) == size
+
+
+def test_failures_are_retried_on_resume(service, output):
+    def failing_vote(vote_id):
+        if vote_id in (10, 51):
+            raise RuntimeError('service error')
+        return vote(vote_id)
+
+    service.GetVote = failing_vote
+    summary = crawl.crawl(output, session_ids=[27], workers=2)
+    assert summary['errors'] == 2
+    assert kinds(output)['vote'] == 38
+    assert not crawl.Checkpoint(f"{output}.checkpoint").complete(27)
+
+    service.GetVote = vote
+    service.calls.clear()
+    summary = crawl.crawl(output, session_ids=[27], workers=2)
+    assert summary['errors'] == 0
+    assert service.calls['GetVote'] == 2
+    assert service.calls['GetLegislationDetail'] == 0
+    assert kinds(output) == {'member': 5, 'committee': 3, 'legislation': 20, 'vote': 40}
+    assert_written_once(output)
+
+
+def test_interrupted_crawl_resumes_without_duplicates(service, output):
+    def interrupted(legislation_id):
+        if legislation_id == 12:
+            raise KeyboardInterrupt
+        return legislation(legislation_id)
+
+    service.GetLegislationDetail = interrupted
+    with pytest.raises(KeyboardInterrupt):
+        crawl.crawl(output, session_ids=[27], workers=2)
+    state = crawl.Checkpoint(f"{output}.checkpoint")
+    assert state.resumed and not state.complete(27)
+    written = kinds(output)['legislation']
+
+    service.GetLegislationDetail = legislation
+    service.calls.clear()
+    crawl.crawl(output, session_ids=[27], workers=2)
+    assert service.calls['GetLegislationDetail'] == 20 - written
+    assert kinds(output) == {'member': 5, 'committee': 3, 'legislation': 20, 'vote': 40}
+    assert_written_once(output)
+
+
+def test_crawl_into_mirror(service, tmp_path):
+    path = str(tmp_path / 'gga.db')
+    crawl.crawl(path, session_ids=[27], workers=2)
+    store = mirror.Mirror(path)
+    try:
+        assert store.lookup('GetLegislationDetail', (7,))['Caption'] == 'Caption 7'
+        assert len(store.lookup('GetVotesForLegislation', (7,))) == 2
+        assert len(store.lookup('GetMembersBySession', (27,))) == 5
+    finally:
+        store.close()
+
+
+def test_progress_counts_service_requests(service, output, tmp_path):
+    summary = crawl.crawl(output, session_ids=[27], workers=2)
+    assert summary['requests'] == sum(service.calls.values())
+
+    # Entities read from a mirror aren't requests
+    store = mirror.Mirror(str(tmp_path / 'gga.db'))
+    try:
+        store.sync_session(27)
+        service.calls.clear()
+        writer = crawl.writer_for(str(tmp_path / 'again.ndjson'))
+        crawler = crawl.Crawler(writer, crawl.Checkpoint(str(tmp_path / 'again.checkpoint')), workers=2,
+                                assembly=gga.GeneralAssembly(mirror=store))
+        try:
+            summary = crawler.run([27])
+        finally:
+            writer.close()
+    finally:
+        store.close()
+    assert summary['entities'] == 68
+    assert summary['requests'] == sum(service.calls.values()) == 1  # GetYears
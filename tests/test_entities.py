@@ -0,0 +1,79 @@
+import time
+
+import conftest
+from GGA import gga
+from GGA.gga import Member
+
+
+def test_stubs_load_on_first_detail_read(service, session):
+    members = session.all_members
+    member = members[2]
+    # Summary fields come with the listing
+    assert (member.firstName, member.lastName, member.chamber) == ('First3', 'Last3', 'House')
+    assert not member.hydrated
+    assert service.calls['GetMember'] == 0
+    assert member.party == 'Democrat'
+    assert service.calls['GetMember'] == 1
+    member.occupation, member.staff, member.title
+    assert service.calls['GetMember'] == 1
+    assert [other.hydrated for other in members] == [False, False, True, False, False]
+
+
+def test_repr_never_loads(service, session):
+    member = Member(1, session=session)
+    repr(member)
+    assert not member.hydrated and service.calls['GetMember'] == 0
+
+
+def test_window_batching_starts_with_the_second_read(service, session, monkeypatch):
+    monkeypatch.setattr(gga, 'batch_window', 4)
+    legislation = session.legislation
+    # A single lookup only loads that bill
+    legislation[0].summary
+    assert service.calls['GetLegislationDetail'] == 1
+    # Walking on: the bill and the next ones in its window load together
+    legislation[5].summary
+    assert service.calls['GetLegislationDetail'] == 5
+    assert [legis.hydrated for legis in legislation[4:10]] == [False, True, True, True, True, False]
+    legislation[6].summary
+    assert service.calls['GetLegislationDetail'] == 5
+
+
+def test_get_member_and_committee_only_load_the_match(service, session):
+    members = session.all_members
+    members[0].party
+    # The listing's batch is walking now, but a looked-up member still loads on its own
+    member = session.get_member(member_name='Last3, First3')
+    assert member is members[2]
+    member.party
+    assert service.calls['GetMember'] == 2
+    assert [other.hydrated for other in members] == [True, False, True, False, False]
+
+    committees = session.committees
+    committees[0].description
+    committee = session.get_committee(committe_name='c102')
+    committee.description
+    assert service.calls['GetCommitteeForSession'] == 2
+    assert [other.hydrated for other in committees] == [True, False, True]
+
+
+def test_stopping_iteration_cancels_pending_calls(service, session):
+    def slow_detail(legislation_id):
+        time.sleep(0.01)
+        return conftest.legislation(legislation_id)
+
+    service.GetLegislationDetail = slow_detail
+    iterator = session.iter_legislation(prefetch=4)
+    assert next(iterator).id == 1
+    iterator.close()
+    started = service.calls['GetLegislationDetail']
+    time.sleep(0.05)
+    # At most the calls already in flight finish; the rest of the session is never requested
+    assert service.calls['GetLegislationDetail'] == started <= 5
+
+
+def test_vote_records_carry_their_bill(service, session):
+    bill = session.legislation[2]
+    records = [vote.to_record() for vote in bill.votes]
+    assert [(record.id, record.legislationId, record.sessionId) for record in records] == [(30, 3, 27), (31, 3, 27)]
+    assert records[0].count.yays == 3
@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+
+from GGA.index import LegislationIndex, _schema, match_expression
+from GGA.records import LegislationRecord
+
+from conftest import legislation
+
+
+def record(legislation_id, session_id = 27, **fields):
+    return LegislationRecord.from_data(dict(legislation(legislation_id), **fields), session_id=session_id)
+
+
+@pytest.fixture
+def index():
+    index = LegislationIndex()
+    yield index
+    index.close()
+
+
+def test_add_many_is_idempotent(index):
+    records = [record(legislation_id) for legislation_id in range(1, 6)]
+    index.add_many(records)
+    index.add_many(records)
+    assert len(index) == 5
+    assert len(index.search('Caption 3')) == 1
+
+
+def test_add_many_is_idempotent_without_a_session(index):
+    # UNIQUE (legislation_id, session_id) never matches a NULL session id
+    index.add_many([record(1, session_id=None)])
+    index.add_many([record(1, session_id=None)])
+    index.add(record(1, session_id=None))
+    assert len(index) == 1
+    assert [hit.id for hit in index.search('Caption')] == [1]
+
+
+def test_same_bill_in_two_sessions(index):
+    index.add_many([record(1, session_id=25), record(1, session_id=27)])
+    assert len(index) == 2
+    assert [hit.sessionId for hit in index.search('Caption', session=25)] == [25]
+
+
+def test_reindexing_replaces_text(index):
+    index.add(record(1, Caption='Income tax credit'))
+    index.add(record(1, Caption='Fishing licenses'))
+    assert index.search('income') == []
+    assert [hit.caption for hit in index.search('fishing')] == ['Fishing licenses']
+
+
+def test_caption_outranks_footnotes(index):
+    index.add_many([record(1, Footnotes='wildlife'), record(2, Caption='Wildlife management')])
+    assert [hit.id for hit in index.search('wildlife')] == [2, 1]
+
+
+def test_status_matches_description_or_code(index):
+    index.add_many([record(1, Status={'Code': 'HPA', 'Description': 'House Passed/Adopted'}), record(2)])
+    assert [hit.id for hit in index.search('Caption', status='HPA')] == [1]
+    assert [hit.id for hit in index.search('Caption', status='House Passed/Adopted')] == [1]
+    assert [hit.id for hit in index.search('Caption', status='HPF')] == [2]
+
+
+def test_index_without_status_codes_is_upgraded(tmp_path):
+    path = str(tmp_path / 'index.db')
+    connection = sqlite3.connect(path)
+    connection.executescript(_schema.replace('    status_code TEXT,\n', ''))
+    connection.close()
+    index = LegislationIndex(path)
+    try:
+        index.add(record(1))
+        assert [hit.id for hit in index.search('Caption', status='HPF')] == [1]
+    finally:
+        index.close()
+
+
+def test_remove(index):
+    index.add_many([record(1), record(2, session_id=None)])
+    index.remove(1, session_id=27)
+    index.remove(2)
+    assert len(index) == 0
+    assert index.search('Caption') == []
+
+
+def test_attached_index_follows_hydration(session, index):
+    index.attach()
+    legis = session.legislation[0]
+    legis.hydrate()
+    assert [hit.id for hit in index.search('Caption 1', phrase=True)] == [legis.id]
+    index.detach()
+    session.legislation[1].hydrate()
+    assert len(index) == 1
+
+
+def test_match_expression_quotes_terms():
+    assert match_expression('tax "credit"') == '"tax" """credit"""'
+    assert match_expression('income  tax', phrase=True) == '"income tax"'
@@ -0,0 +1,58 @@
+import requests
+from lxml import etree
+from requests.adapters import BaseAdapter
+
+from GGA import instrument
+from GGA.instrument import trace
+from GGA.transport import GGATransport
+
+address = 'http://host/GGAServices/Members/Service.svc'
+envelope = etree.fromstring(b'<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>'
+                            b'<GetMember xmlns="http://tempuri.org/"><id>1</id></GetMember></s:Body></s:Envelope>')
+
+
+class Service(BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.url = request.url
+        response.status_code, response._content = 200, b'<answer>1</answer>'
+        return response
+
+    def close(self):
+        pass
+
+
+def make_transport():
+    session = requests.Session()
+    session.mount('http://', Service())
+    return GGATransport(session=session)
+
+
+class Client:
+    # Stands in for a pooled zeep client whose operations post through the transport
+    def __init__(self, transport_):
+        self.service = self
+        self.transport = transport_
+
+    def GetMember(self, member_id):
+        return self.transport.post_xml(address, envelope, {'SOAPAction': 'GetMember'}).content
+
+
+def test_direct_client_calls_are_traced_once():
+    transport_ = make_transport()
+    with trace() as t:
+        Client(transport_).service.GetMember(1)
+    assert t.operations == {'GetMember': 1}
+    assert t.requests == 1
+    event = t.events[0]
+    assert (event.keyword, event.args, event.response_bytes) == ('Members', (), len(b'<answer>1</answer>'))
+
+
+def test_instrumented_calls_are_not_counted_again():
+    transport_ = make_transport()
+    with trace() as t:
+        instrument.call(Client(transport_), 'Members', 'GetMember', 1)
+    assert t.operations == {'GetMember': 1}
+    assert t.requests == 1
+    # The transport filled in the sizes of the instrumented call's own event
+    assert t.events[0].args == (1,) and t.events[0].response_bytes == len(b'<answer>1</answer>')
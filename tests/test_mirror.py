@@ -0,0 +1,136 @@
+from datetime import datetime
+
+import pytest
+
+from GGA import gga, mirror
+from GGA.mirror import Mirror
+
+from conftest import legislation, member
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = Mirror(str(tmp_path / 'gga.db'), max_workers=2)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_600_000_000.0]
+    monkeypatch.setattr(mirror.time, 'time', lambda: now[0])
+    return now
+
+
+def moved(service, legislation_id):
+    # Bill legislation_id gets a new status, which shows in its listing entry too
+    listing, detail = service.answers['GetLegislationForSession'], service.answers['GetLegislationDetail']
+
+    def moved_listing(session_id):
+        return [dict(entry, Status='Passed') if entry['Id'] == legislation_id else entry
+                for entry in listing(session_id)]
+
+    def moved_detail(bill_id):
+        data = detail(bill_id)
+        if bill_id == legislation_id:
+            data['Status'] = {'Code': 'HPA', 'Description': 'Passed', 'Date': datetime(2020, 3, 2)}
+            data['StatusHistory']['StatusListing'].append({'Code': 'HPA', 'Date': datetime(2020, 3, 2),
+                                                           'Description': 'Passed'})
+        return data
+
+    service.GetLegislationForSession = moved_listing
+    service.GetLegislationDetail = moved_detail
+
+
+def test_sync_mirrors_every_session(service, store):
+    report = store.sync()
+    assert report.errors == []
+    assert store.query("SELECT COUNT(*) FROM legislation WHERE session_id = 27") == [(20,)]
+    assert store.query("SELECT COUNT(*) FROM votes WHERE caption IS NOT NULL") == [(40,)]
+    assert store.query("SELECT party FROM members WHERE id = 1") == [('Democrat',)]
+    assert store.query("SELECT COUNT(*) FROM committees WHERE session_id = 25") == [(3,)]
+    assert store.query("SELECT status_date FROM legislation WHERE id = 3") == [('2020-01-04T00:00:00',)]
+    assert report.requests == sum(service.calls.values())
+
+
+def test_resync_only_lists(service, store):
+    store.sync_session(27)
+    service.calls.clear()
+    report = store.sync_session(27)
+    assert sorted(service.calls) == ['GetCommitteesBySession', 'GetLegislationForSession', 'GetMembersBySession']
+    assert report.requests == 3 and report.skipped == 5 + 3 + 20
+
+
+def test_closed_session_is_not_read_again(service, store):
+    store.sync()
+    service.calls.clear()
+    store.sync(session_ids=[25])
+    assert dict(service.calls) == {'GetYears': 1}
+
+
+def test_changed_bill_is_refetched_with_new_votes(service, store):
+    store.sync_session(27)
+    service.calls.clear()
+    moved(service, 7)
+    votes = service.answers['GetVotesForLegislation']
+    service.GetVotesForLegislation = lambda legislation_id: votes(legislation_id) + [
+        {'VoteId': 79, 'Branch': 'House', 'Number': 79}]
+    store.sync_session(27)
+    assert service.calls['GetLegislationDetail'] == 1
+    assert service.calls['GetVotesForLegislation'] == 1
+    assert service.calls['GetVote'] == 1
+    assert store.query("SELECT status FROM legislation WHERE id = 7") == [('Passed',)]
+    assert store.query("SELECT legislation_id FROM votes WHERE id = 79") == [(7,)]
+
+
+def test_failed_refetch_is_retried(service, store):
+    store.sync_session(27)
+    moved(service, 7)
+    detail = service.answers['GetLegislationDetail']
+
+    def failing(legislation_id):
+        raise RuntimeError('service error')
+
+    service.GetLegislationDetail = failing
+    assert len(store.sync_session(27).errors) == 1
+    service.GetLegislationDetail = detail
+    service.calls.clear()
+    store.sync_session(27)
+    assert service.calls['GetLegislationDetail'] == 1
+    assert store.query("SELECT status FROM legislation WHERE id = 7") == [('Passed',)]
+
+
+def test_changed_member_is_refetched(service, store):
+    store.sync_session(27)
+    service.calls.clear()
+    summaries = service.answers['GetMembersBySession']
+    service.GetMembersBySession = lambda session_id: [dict(entry, District={'Type': 'Senate'}) if entry['Id'] == 2
+                                                      else entry for entry in summaries(session_id)]
+    service.members = 6
+    store.sync_session(27)
+    assert service.calls['GetMember'] == 2
+    assert service.calls['GetCommitteeForSession'] == 0
+
+
+def test_old_details_are_refetched_in_the_open_session(service, store, clock):
+    store.sync()
+    service.calls.clear()
+    clock[0] += store.max_age + 1
+    store.sync()
+    # Session 27 is open: its members, committees and bills are read again; closed session 25 is not
+    assert service.calls['GetMember'] == 5
+    assert service.calls['GetCommitteeForSession'] == 3
+    assert service.calls['GetLegislationDetail'] == 20
+    assert service.calls['GetVotesForLegislation'] == 0
+
+
+def test_offline_reads(service, store):
+    store.sync_session(27)
+    service.calls.clear()
+    assembly = gga.GeneralAssembly(mirror=store)
+    session = gga.Session(27, assembly=assembly)
+    bill = session.legislation[6]
+    assert bill.caption == legislation(bill.id)['Caption']
+    assert [author.lastName for author in bill.authors] == [member(bill.id % 5 + 1)['Name']['Last'],
+                                                            member((bill.id + 1) % 5 + 1)['Name']['Last']]
+    assert sum(service.calls.values()) == 0
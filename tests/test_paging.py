@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+
+from GGA import gga
+from GGA.gga import _Pages
+
+
+def listing(count):
+    return [{'Id': legislation_id, 'DocumentType': 'HB', 'Number': legislation_id, 'Caption': f"Caption {legislation_id}"}
+            for legislation_id in range(1, count + 1)]
+
+
+def test_pages_are_lazy():
+    requested = []
+
+    def fetch(page):
+        requested.append(page)
+        return [page * 10 + index for index in range(10)], None
+
+    pages = _Pages(fetch, page_size=10)
+    assert requested == []
+    items = iter(pages)
+    assert next(items) == 0
+    assert requested[0] == 0
+
+
+def test_pages_stop_on_short_page():
+    def fetch(page):
+        return list(range(page * 10, min(page * 10 + 10, 25))), None
+
+    pages = _Pages(fetch, page_size=10)
+    assert list(pages) == list(range(25))
+    assert pages.pages_fetched == 3
+
+
+def test_pages_stop_at_reported_total():
+    requested = []
+
+    def fetch(page):
+        requested.append(page)
+        return list(range(page * 10, page * 10 + 10)), 20
+
+    pages = _Pages(fetch, page_size=10)
+    assert len(list(pages)) == 20
+    assert pages.total == 20
+    assert requested == [0, 1]
+
+
+def test_pages_respect_limit():
+    pages = _Pages(lambda page: (list(range(page * 10, page * 10 + 10)), None), page_size=10, limit=15)
+    assert list(pages) == list(range(15))
+    assert pages.pages_fetched == 2
+
+
+def test_next_page_is_prefetched():
+    second_page = threading.Event()
+
+    def fetch(page):
+        if page == 1:
+            second_page.set()
+        return list(range(page * 10, page * 10 + 10)), None
+
+    items = iter(_Pages(fetch, page_size=10, limit=20))
+    next(items)
+    assert second_page.wait(timeout=5)
+
+
+def test_legislation_range_pages_with_inclusive_bounds(service):
+    bills = listing(30)
+    requested = []
+
+    def legislation_range(first, last):
+        requested.append((first, last))
+        return bills[first:last + 1]
+
+    service.GetLegislationRange = legislation_range
+    legislation = list(gga.get_legislation_range(3, 12, page_size=4))
+    assert [legis.id for legis in legislation] == list(range(4, 13))
+    assert requested == [(3, 6), (7, 10), (11, 11)]
+    assert legislation[0].caption == 'Caption 4'
+    assert service.calls['GetLegislationDetail'] == 0
+
+
+def test_search_reads_results_and_total(service):
+    bills = listing(23)
+    requests = []
+
+    def search(request):
+        requests.append(dict(request))
+        start = request['PageIndex'] * request['PageSize']
+        return {'Results': {'LegislationSearchResult': bills[start:start + request['PageSize']]}, 'TotalResults': 23}
+
+    service.GetLegislationSearchResultsPaged = search
+    pages = gga.search_legislation('tax', page_size=10, DocumentType='HB')
+    assert [legis.id for legis in pages] == list(range(1, 24))
+    assert pages.total == 23
+    assert requests[0] == {'Keyword': 'tax', 'PageIndex': 0, 'PageSize': 10, 'DocumentType': 'HB'}
+    assert len(requests) == 3
+
+
+def test_search_without_results(service):
+    service.GetLegislationSearchResultsPaged = lambda request: {'Results': None, 'TotalResults': 0}
+    pages = gga.search_legislation('nothing')
+    assert list(pages) == []
+    assert pages.total == 0
+
+
+def test_unexpected_response_shape_is_an_error(service):
+    service.GetLegislationSearchResultsPaged = lambda request: {'Items': []}
+    with pytest.raises(ValueError, match='_paged_fields'):
+        list(gga.search_legislation('tax'))
@@ -0,0 +1,83 @@
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from GGA import clients, replay
+from GGA.replay import ReplayMiss, ReplaySession
+
+wsdl = f"{clients.base}Members{clients.suffix}"
+address = f"{clients.base}Members/Service.svc"
+
+
+class Service(BaseAdapter):
+    # Answers documents and SOAP calls with their URL and body; GetFault fails with a 500
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = requests.Response()
+        response.url = request.url
+        fault = 'GetFault' in request.headers.get('SOAPAction', '')
+        response.status_code = 500 if fault else 200
+        body = request.body.decode('utf-8') if isinstance(request.body, bytes) else request.body or ''
+        response._content = f"<answer url='{request.url}'>{body}</answer>".encode('utf-8')
+        return response
+
+    def close(self):
+        pass
+
+
+def call(session, operation, body):
+    return session.request('POST', address, data=body.encode('utf-8'),
+                           headers={'SOAPAction': f'"http://tempuri.org/IService/{operation}"'})
+
+
+def record(directory):
+    service = Service()
+    session = ReplaySession(directory, mode='record')
+    session.mount('http://', service)
+    responses = [session.request('GET', wsdl).content,
+                 call(session, 'GetMember', '<id>1</id>').content,
+                 call(session, 'GetMember', '<id>2</id>').content,
+                 call(session, 'GetFault', '<id>1</id>').status_code]
+    return service, responses
+
+
+def test_record_then_replay(tmp_path):
+    service, recorded = record(str(tmp_path))
+    assert len(service.requests) == 4
+
+    session = ReplaySession(str(tmp_path))
+    session.mount('http://', Service())
+    replayed = [session.request('GET', wsdl).content,
+                call(session, 'GetMember', '<id>1</id>').content,
+                call(session, 'GetMember', '<id>2</id>').content,
+                call(session, 'GetFault', '<id>1</id>').status_code]
+    assert replayed == recorded and recorded[3] == 500
+    assert recorded[1] != recorded[2]
+    assert session.requests == {'wsdl': 1, 'GetMember': 2, 'GetFault': 1}
+    assert session.adapters['http://'].requests == []
+
+
+def test_unrecorded_request_misses(tmp_path):
+    record(str(tmp_path))
+    session = ReplaySession(str(tmp_path))
+    with pytest.raises(ReplayMiss):
+        call(session, 'GetMember', '<id>3</id>')
+
+
+def test_install_routes_the_shared_transport(tmp_path, monkeypatch):
+    service, recorded = record(str(tmp_path))
+    monkeypatch.setattr(clients, '_clients', {})
+    monkeypatch.setattr(clients, '_client_locks', {})
+    try:
+        session = replay.install(str(tmp_path))
+        transport = clients.get_transport()
+        assert transport.session is session and transport.cache is None
+        # Documents are replayed like any other request
+        assert transport.load(wsdl) == recorded[0]
+        assert session.requests == {'wsdl': 1}
+    finally:
+        clients.use_transport(None)
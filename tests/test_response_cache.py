@@ -0,0 +1,160 @@
+import pytest
+import requests
+from lxml import etree
+from requests.adapters import BaseAdapter
+
+from GGA import cache
+from GGA.cache import DiskResponseStore, ResponseCache, fresh, session_scope
+from GGA.transport import GGATransport
+
+address = 'http://host/GGAServices/Members/Service.svc'
+
+
+def envelope(operation, argument):
+    return etree.fromstring(f'<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>'
+                            f'<{operation} xmlns="http://tempuri.org/"><id>{argument}</id></{operation}>'
+                            f'</s:Body></s:Envelope>'.encode('utf-8'))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_600_000_000.0]
+    monkeypatch.setattr(cache.time, 'time', lambda: now[0])
+    return now
+
+
+class Service(BaseAdapter):
+    # Numbered answers, with an ETag; answers 304 to a request carrying the current ETag
+    def __init__(self):
+        super().__init__()
+        self.version = 1
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = requests.Response()
+        response.url = request.url
+        response.headers['ETag'] = f'"v{self.version}"'
+        if request.headers.get('If-None-Match') == f'"v{self.version}"':
+            response.status_code, response._content = 304, b''
+        else:
+            response.status_code, response._content = 200, f'<answer>{self.version}</answer>'.encode('utf-8')
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def service():
+    return Service()
+
+
+def make_transport(service, response_cache):
+    session = requests.Session()
+    session.mount('http://', service)
+    return GGATransport(session=session, response_cache=response_cache)
+
+
+def post(transport_, operation = 'GetMember', argument = 1):
+    return transport_.post_xml(address, envelope(operation, argument), {'SOAPAction': operation}).content
+
+
+def test_ttl_per_operation(clock):
+    responses = ResponseCache(ttls={'GetTitles': 0}, default_ttl=5)
+    assert responses.ttl('GetMember') == 24 * 60 * 60
+    assert responses.ttl('GetVote') is None
+    assert responses.ttl('GetTitles') == 0
+    assert responses.ttl('SomethingNew') == 5
+    responses.put('member', 'GetMember', b'x', 200, {})
+    responses.put('titles', 'GetTitles', b'x', 200, {})
+    assert responses.get('titles') is None
+    clock[0] += 24 * 60 * 60 - 1
+    assert not responses.get('member').expired
+    clock[0] += 2
+    assert responses.get('member').expired
+
+
+def test_closed_sessions_only_pin_session_scoped_operations(clock):
+    responses = ResponseCache()
+    responses.close_sessions([25])
+    assert responses.ttl('GetLegislationDetail', session_id=25) is None
+    assert responses.ttl('GetMembersBySession', session_id=25) is None
+    assert responses.ttl('GetLegislationDetail', session_id=27) == 60 * 60
+    # Members are fetched by id alone, the same request for every session
+    assert responses.ttl('GetMember', session_id=25) == 24 * 60 * 60
+
+
+def test_member_fetched_for_closed_session_expires(clock, service):
+    responses = ResponseCache()
+    responses.close_sessions([25])
+    transport_ = make_transport(service, responses)
+    with session_scope(25):
+        assert post(transport_) == b'<answer>1</answer>'
+    service.version = 2
+    clock[0] += 365 * 24 * 60 * 60
+    with session_scope(27):
+        assert post(transport_) == b'<answer>2</answer>'
+
+
+def test_closed_session_details_never_expire(clock, service):
+    responses = ResponseCache()
+    responses.close_sessions([25])
+    transport_ = make_transport(service, responses)
+    with session_scope(25):
+        post(transport_, 'GetLegislationDetail', 7)
+        service.version = 2
+        clock[0] += 365 * 24 * 60 * 60
+        assert post(transport_, 'GetLegislationDetail', 7) == b'<answer>1</answer>'
+    assert len(service.requests) == 1
+
+
+def test_fresh_responses_are_served_until_they_expire(clock, service):
+    responses = ResponseCache()
+    transport_ = make_transport(service, responses)
+    post(transport_)
+    post(transport_)
+    post(transport_, argument=2)
+    assert len(service.requests) == 2
+    assert (responses.hits, responses.misses) == (1, 2)
+
+
+def test_expired_entry_is_revalidated(clock, service):
+    responses = ResponseCache()
+    transport_ = make_transport(service, responses)
+    post(transport_)
+    clock[0] += 24 * 60 * 60 + 1
+    assert post(transport_) == b'<answer>1</answer>'
+    assert service.requests[-1].headers['If-None-Match'] == '"v1"'
+    assert responses.revalidated == 1
+    # The 304 renewed the entry
+    post(transport_)
+    assert len(service.requests) == 2
+
+
+def test_changed_response_replaces_entry(clock, service):
+    responses = ResponseCache()
+    transport_ = make_transport(service, responses)
+    post(transport_)
+    service.version = 2
+    clock[0] += 24 * 60 * 60 + 1
+    assert post(transport_) == b'<answer>2</answer>'
+    assert post(transport_) == b'<answer>2</answer>'
+    assert len(service.requests) == 2
+
+
+def test_fresh_context_revalidates(clock, service):
+    responses = ResponseCache()
+    transport_ = make_transport(service, responses)
+    post(transport_)
+    with fresh():
+        post(transport_)
+    assert len(service.requests) == 2
+    assert responses.revalidated == 1
+
+
+def test_disk_store_round_trip(tmp_path, clock):
+    responses = ResponseCache(store=DiskResponseStore(str(tmp_path / 'responses.db')))
+    responses.put('key', 'GetMember', b'<answer/>', 200, {'ETag': '"v1"'})
+    entry = ResponseCache(store=DiskResponseStore(str(tmp_path / 'responses.db'))).get('key')
+    assert (entry.content, entry.headers, entry.expired) == (b'<answer/>', {'ETag': '"v1"'}, False)
@@ -0,0 +1,99 @@
+import csv
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from GGA import rollcall
+from GGA.rollcall import NAY, YEA, RollCall
+
+from conftest import vote
+
+
+@pytest.fixture
+def roll_call(session):
+    return RollCall.build(session)
+
+
+def test_matrix(service, roll_call):
+    # Two roll calls per bill, every member voting on each
+    assert roll_call.shape == (5, 40)
+    assert roll_call.member_ids.tolist() == [1, 2, 3, 4, 5]
+    assert sorted(roll_call.vote_ids.tolist()) == sorted(bill * 10 + index for bill in range(1, 21)
+                                                         for index in range(2))
+    column = roll_call.vote_ids.tolist().index(30)
+    assert roll_call.matrix[:, column].tolist() == [YEA, NAY, YEA, NAY, YEA]
+    assert roll_call.legislation_ids[column] == 3
+    assert roll_call.member_row(2)[column] == NAY
+    assert service.calls['GetVote'] == 40
+
+
+def test_from_raw_payloads():
+    roll_call = RollCall.from_votes([vote(10), vote(11)], members=[{'Id': 5, 'Party': 'Democrat'}])
+    assert roll_call.member_ids.tolist() == [5, 1, 2, 3, 4]
+    assert roll_call.parties.tolist() == ['Democrat', None, None, None, None]
+    assert roll_call.legislation_ids.tolist() == [-1, -1]
+
+
+def test_attendance():
+    payload = vote(10)
+    payload['Votes']['MemberVoted'][0]['MemberVoted'] = 'Excused'
+    attendance = RollCall.from_votes([payload, vote(11)]).attendance()
+    assert attendance.tolist() == [0.5, 1, 1, 1, 1]
+
+
+def test_agreement(roll_call):
+    agreement = roll_call.agreement()
+    assert agreement[0, 2] == agreement[1, 3] == 1
+    assert agreement[0, 1] == 0
+    assert np.diag(agreement).tolist() == [1] * 5
+
+
+def test_party_line_scores_read_parties_from_details(service, roll_call):
+    # The session's member summaries carry no party, so each member's detail is fetched once
+    assert service.calls['GetMember'] == 5
+    assert roll_call.parties.tolist() == ['Democrat', 'Republican', 'Democrat', 'Republican', 'Democrat']
+    assert roll_call.party_line_votes().all()
+    assert roll_call.party_line_scores().tolist() == [1] * 5
+
+
+def test_summary_parties_skip_details(service, session):
+    summaries = service.GetMembersBySession
+    service.GetMembersBySession = lambda session_id: [dict(summary, Party='Independent')
+                                                      for summary in summaries(session_id)]
+    roll_call = RollCall.build(session)
+    assert service.calls['GetMember'] == 0
+    assert set(roll_call.parties.tolist()) == {'Independent'}
+    assert not roll_call.party_line_votes().any()
+
+
+def test_csv_export(roll_call, tmp_path):
+    path = tmp_path / 'votes.csv'
+    roll_call.to_csv(path, chunk_size=7)
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 200
+    assert {row['position'] for row in rows} == {'Yea', 'Nay'}
+    assert {(row['vote_id'], row['legislation_id']) for row in rows if row['member_id'] == '1'} >= {('30', '3')}
+
+
+def test_arrow_and_parquet_export(roll_call, tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+
+    roll_call.to_arrow(tmp_path / 'votes.arrow', chunk_size=7)
+    roll_call.to_parquet(tmp_path / 'votes.parquet', chunk_size=7)
+    table = pa.ipc.open_file(str(tmp_path / 'votes.arrow')).read_all()
+    assert table.num_rows == 200
+    assert set(table.column('position').to_pylist()) == {'Yea', 'Nay'}
+    parquet = pq.read_table(str(tmp_path / 'votes.parquet'))
+    assert parquet.num_rows == 200
+    assert parquet.column('vote_id').to_pylist() == table.column('vote_id').to_pylist()
+
+
+def test_export_without_pyarrow(roll_call, tmp_path, monkeypatch):
+    monkeypatch.setattr(rollcall, 'pa', None)
+    monkeypatch.setattr(rollcall, 'pq', None)
+    for export in (roll_call.to_arrow, roll_call.to_parquet):
+        with pytest.raises(RuntimeError, match='pyarrow'):
+            export(tmp_path / 'votes')
@@ -0,0 +1,44 @@
+import pytest
+
+pytest.importorskip('msgpack')
+
+from GGA import gga
+
+
+def walk(assembly):
+    # What a typical start-up touches: the session, its members and bills with their authors and votes
+    session = assembly.get_session(session_id=27)
+    parties = [member.party for member in session.all_members]
+    bills = [(legis.caption, legis.status, [author.name for author in legis.authors],
+              [vote.chamber for vote in legis.votes])
+             for legis in session.legislation[:5]]
+    return parties, bills
+
+
+def test_warm_start_makes_no_service_calls(service, assembly, tmp_path):
+    path = str(tmp_path / 'gga.snapshot')
+    cold = walk(assembly)
+    assert assembly.save_snapshot(path) > 0
+
+    service.calls.clear()
+    gga.default_entities.clear()
+    warm = gga.GeneralAssembly.load_snapshot(path)
+    assert walk(warm) == cold
+    assert sum(service.calls.values()) == 0
+
+
+def test_snapshot_falls_back_to_the_service(service, assembly, tmp_path):
+    path = str(tmp_path / 'gga.snapshot')
+    walk(assembly)
+    assembly.save_snapshot(path)
+
+    service.calls.clear()
+    warm = gga.GeneralAssembly.load_snapshot(path)
+    session = warm.get_session(session_id=27)
+    # Committees were never loaded before the snapshot was saved
+    committee = session.get_committee(committee_id=101)
+    assert committee.name == 'Committee 101'
+    assert committee.description == ''
+    assert service.calls['GetCommitteeForSession'] == 1
+    session.all_members[0].party
+    assert service.calls['GetMember'] == service.calls['GetMembersBySession'] == 0
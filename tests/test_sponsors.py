@@ -0,0 +1,46 @@
+from GGA import gga
+
+from conftest import legislation
+
+
+def sponsored(session, member_id):
+    return sorted(legis.id for legis in session.legislation_by_sponsor(member_id))
+
+
+def test_index_by_sponsor(service, session):
+    assert sponsored(session, 1) == [4, 5, 9, 10, 14, 15, 19, 20]
+    assert sum(len(bills) for bills in session.sponsor_index.values()) == 2 * service.bills
+    assert service.calls['GetLegislationDetail'] == service.bills
+
+
+def test_unchanged_index_is_not_rebuilt(service, session, monkeypatch):
+    session.sponsor_index
+    # Loading the bills moved the identity map on: the next use checks the indexed bills once
+    session.sponsor_index
+    walked = []
+    monkeypatch.setattr(gga, '_sponsor_ids', lambda legis: walked.append(legis.id) or [])
+    session.sponsor_index
+    session.legislation_by_sponsor(1)
+    assert walked == []
+
+
+def test_refresh_indexes_only_the_difference(service, session):
+    session.sponsor_index
+    service.bills = 21
+    session.refresh_legislation()
+    assert sponsored(session, 2) == [1, 5, 6, 10, 11, 15, 16, 20, 21]
+    assert service.calls['GetLegislationDetail'] == 21
+    service.bills = 19
+    session.refresh_legislation()
+    assert 20 not in sponsored(session, 1)
+
+
+def test_rehydrated_bill_is_reindexed(service, session):
+    assert 4 in sponsored(session, 1)
+    details = legislation(4)
+    details['Authors']['Sponsorship'] = [{'MemberId': 3, 'Type': 'Author'}]
+    bill = next(legis for legis in session.legislation if legis.id == 4)
+    bill._load(details)
+    assert 4 not in sponsored(session, 1)
+    assert 4 in sponsored(session, 3)
+    assert service.calls['GetLegislationDetail'] == service.bills
@@ -0,0 +1,161 @@
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from GGA import transport
+from GGA.transport import CircuitBreaker, CircuitOpenError, GGATransport, RateLimiter, TransportPolicy
+
+FAULT = (b'<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body><s:Fault>'
+         b'<faultcode>s:Client</faultcode><faultstring>No such bill</faultstring></s:Fault></s:Body></s:Envelope>')
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(transport.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(transport.time, 'sleep', clock.sleep)
+    return clock
+
+
+class Adapter(BaseAdapter):
+    # Answers each request with the next planned (status, body), or raises it when it is an exception
+    def __init__(self, plan):
+        super().__init__()
+        self.plan = list(plan)
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        answer = self.plan.pop(0)
+        if isinstance(answer, BaseException):
+            raise answer
+        response = requests.Response()
+        response.status_code, response._content = answer
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def make_transport(plan, **settings):
+    adapter = Adapter(plan)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    policy = TransportPolicy(backoff=0, **settings)
+    return adapter, policy, GGATransport(session=session, policy=policy)
+
+
+def post(transport_, operation='GetVote'):
+    return transport_.post('http://host/GGAServices/Votes/Service.svc', b'<request/>', {'SOAPAction': operation})
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.times_opened == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request('host')
+
+
+def test_breaker_half_open_allows_one_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.state == 'half-open'
+    breaker.before_request('host')
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request('host')
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    breaker.before_request('host')
+
+
+def test_breaker_failed_trial_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    breaker.before_request('host')
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.times_opened == 2
+
+
+def test_trial_released_on_unexpected_error(clock):
+    adapter, policy, transport_ = make_transport([requests.exceptions.ChunkedEncodingError('cut'), (200, b'<ok/>')],
+                                                 failure_threshold=1, reset_timeout=30, retries=0)
+    breaker = policy.breaker('host')
+    breaker.record_failure()
+    clock.now += 30
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        post(transport_)
+    assert breaker.state == 'open'
+    clock.now += 30
+    assert post(transport_).status_code == 200
+    assert breaker.state == 'closed'
+
+
+def test_retries_server_errors(clock):
+    adapter, policy, transport_ = make_transport([(503, b''), (503, b''), (200, b'<ok/>')], retries=3)
+    assert post(transport_).status_code == 200
+    assert adapter.sent == 3
+    assert policy.stats['retried'] == 2
+
+
+def test_soap_fault_is_not_retried(clock):
+    adapter, policy, transport_ = make_transport([(500, FAULT)], retries=3, failure_threshold=1)
+    assert post(transport_).status_code == 500
+    assert adapter.sent == 1
+    assert policy.breaker('host').state == 'closed'
+
+
+def test_non_idempotent_operations_are_not_retried(clock):
+    adapter, policy, transport_ = make_transport([(503, b''), (200, b'<ok/>')], retries=3)
+    assert post(transport_, operation='SetVote').status_code == 503
+    assert adapter.sent == 1
+
+
+def test_open_circuit_rejects_without_sending(clock):
+    adapter, policy, transport_ = make_transport([], failure_threshold=1)
+    policy.breaker('host').record_failure()
+    with pytest.raises(CircuitOpenError):
+        post(transport_)
+    assert adapter.sent == 0
+    assert policy.stats['rejected'] == 1
+
+
+def test_rate_limiter_bursts_then_spaces_requests(clock):
+    limiter = RateLimiter(rate=2, burst=3)
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.slept == []
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.slept == [pytest.approx(0.5), pytest.approx(0.5)]
+
+
+def test_rate_limiter_refills_while_idle(clock):
+    limiter = RateLimiter(rate=10, burst=2)
+    limiter.acquire()
+    limiter.acquire()
+    clock.now += 1
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.slept == []
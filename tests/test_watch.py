@@ -0,0 +1,154 @@
+from datetime import datetime
+
+import pytest
+
+from GGA.watch import MemberChange, NewLegislation, NewVote, StatusChange, Watcher
+
+from conftest import legislation, vote
+
+
+class Bills:
+    """
+    Mutable bill data behind the fake service: extra StatusHistory entries and vote listings per bill.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.statuses = {}
+        self.votes = {}
+        self.count = service.bills
+        self.failing_listings = set()
+        self.failing_votes = set()
+        # Whether listing entries reflect status changes; when not, only the sweep notices them
+        self.listed_status = True
+        service.GetLegislationForSession = self.listing
+        service.GetLegislationDetail = self.detail
+        service.GetVotesForLegislation = self.vote_listing
+        service.GetVote = self.vote
+
+    def listing(self, session_id):
+        return [{'Id': legislation_id, 'DocumentType': 'HB', 'Number': legislation_id,
+                 'Status': len(self.statuses.get(legislation_id, [])) if self.listed_status else None}
+                for legislation_id in range(1, self.count + 1)]
+
+    def detail(self, legislation_id):
+        data = legislation(legislation_id)
+        data['StatusHistory']['StatusListing'].extend(self.statuses.get(legislation_id, []))
+        return data
+
+    def vote_listing(self, legislation_id):
+        if legislation_id in self.failing_listings:
+            raise RuntimeError('service error')
+        return [{'VoteId': vote_id, 'Branch': 'House', 'Number': vote_id}
+                for vote_id in self.votes.get(legislation_id, [])]
+
+    def vote(self, vote_id):
+        if vote_id in self.failing_votes:
+            raise RuntimeError('service error')
+        return vote(vote_id)
+
+    def move(self, legislation_id, code, day, votes = ()):
+        self.statuses.setdefault(legislation_id, []).append(
+            {'Code': code, 'Date': datetime(2020, 3, day), 'Description': code})
+        self.votes.setdefault(legislation_id, []).extend(votes)
+
+
+@pytest.fixture
+def bills(service):
+    return Bills(service)
+
+
+@pytest.fixture
+def watcher(session, bills):
+    watcher = Watcher(session, sweep=0, members_every=0)
+    assert watcher.poll() == []
+    return watcher
+
+
+def of(events, kind):
+    return [event for event in events if isinstance(event, kind)]
+
+
+def test_first_poll_takes_every_baseline(service, watcher):
+    assert service.calls['GetLegislationDetail'] == service.bills
+    assert service.calls['GetVotesForLegislation'] == 0
+
+
+def test_quiet_poll_only_lists(service, watcher):
+    assert watcher.poll() == []
+    assert watcher.last_requests == 1
+
+
+def test_status_change_and_new_votes(watcher, bills):
+    bills.move(3, 'HPA', 2, votes=[301, 302])
+    events = watcher.poll()
+    assert [(event.id, event.code) for event in of(events, StatusChange)] == [(3, 'HPA')]
+    assert sorted(event.id for event in of(events, NewVote)) == [301, 302]
+    assert all(event.legislation.id == 3 for event in of(events, NewVote))
+    assert watcher.poll() == []
+
+
+def test_new_bill(watcher, bills):
+    bills.count += 1
+    events = watcher.poll()
+    assert [event.id for event in of(events, NewLegislation)] == [bills.count]
+    assert of(events, StatusChange) == []
+
+
+def test_change_before_first_sweep_is_reported(session, bills):
+    # Baselines are taken when a bill is first listed, not when the sweep first reaches it
+    bills.listed_status = False
+    watcher = Watcher(session, sweep=1, members_every=0)
+    watcher.poll()
+    bills.move(15, 'HPA', 2)
+    for _ in range(bills.count):
+        events = watcher.poll()
+        if events:
+            break
+    assert [(event.id, event.code) for event in of(events, StatusChange)] == [(15, 'HPA')]
+
+
+def test_failed_vote_listing_is_retried(watcher, bills):
+    bills.move(4, 'HPA', 2, votes=[401])
+    bills.failing_listings.add(4)
+    events = watcher.poll()
+    assert len(of(events, StatusChange)) == 1
+    assert of(events, NewVote) == []
+    assert of(watcher.poll(), NewVote) == []
+    bills.failing_listings.clear()
+    assert [event.id for event in of(watcher.poll(), NewVote)] == [401]
+    assert watcher.poll() == []
+
+
+def test_failed_vote_is_retried(watcher, bills):
+    bills.move(5, 'HPA', 2, votes=[501, 502])
+    bills.failing_votes.add(502)
+    assert [event.id for event in of(watcher.poll(), NewVote)] == [501]
+    bills.failing_votes.clear()
+    assert [event.id for event in of(watcher.poll(), NewVote)] == [502]
+    assert watcher.poll() == []
+
+
+def test_member_changes(service, session, bills):
+    watcher = Watcher(session, sweep=0, members_every=1)
+    watcher.poll()
+    service.members = 6
+    events = watcher.poll()
+    assert [(event.id, event.change) for event in of(events, MemberChange)] == [(6, 'added')]
+    service.members = 5
+    assert [(event.id, event.change) for event in of(watcher.poll(), MemberChange)] == [(6, 'removed')]
+
+
+def test_emit_initial_reports_every_bill(session, bills):
+    events = Watcher(session, sweep=0, members_every=0, emit_initial=True).poll()
+    assert len(of(events, NewLegislation)) == bills.count
+    assert of(events, StatusChange) == []
+
+
+def test_callback_receives_events(session, bills):
+    received = []
+    watcher = Watcher(session, sweep=0, members_every=0, callback=received.append)
+    watcher.poll()
+    bills.move(2, 'HPA', 2)
+    events = watcher.poll()
+    assert received == events and len(events) == 1